@@ -11,15 +11,15 @@ from PyQt5.QtWidgets import QSizePolicy, QWidget
 from recordclass import as_dataclass
 
 from base.gui.onProjectFilesDialogBase import OnProjectFilesDialogBase
-from base.model.documents import ErrorCounts, getErrorCounts, loadDocument
-from base.model.pathUtils import ArchiveFilePool, FilePathTpl, ZipFilePool, fileNameFromFilePath, toDisplayPath
+from base.model.documents import ErrorCounts, getErrorCounts
+from base.model.pathUtils import FilePathTpl, ZipFilePool, fileNameFromFilePath, toDisplayPath
+from base.model.project.problems import ProblemsAspect, checkFile
 from base.model.session import getSession
-from base.model.utils import GeneralError, Span, WrappedError
+from base.model.utils import GeneralError, Span
 from cat.GUI import SizePolicy
 from cat.GUI.components.treeBuilders import DataTreeBuilder
-from cat.utils import format_full_exc, override
+from cat.utils import override
 from cat.utils.formatters import SW, formatDictOnly
-from cat.utils.profiling import logError
 from gui.datapackEditorGUI import ContextMenuEntries, DatapackEditorGUI
 from gui.icons import icons
 
@@ -87,23 +87,6 @@ def errorStatsToStr(errorStats: ResultRoot) -> str:
 	return result
 
 
-def checkFile(filePath: FilePathTpl, archiveFilePool: ArchiveFilePool) -> Sequence[GeneralError]:
-	try:
-		document = loadDocument(filePath, archiveFilePool, observeFileSystem=False)
-		if getattr(document, 'schema', 123) is None:
-			# we have no schema, so we can only perform a syntax check.
-			if document.tree is None:
-				document.asyncParse.callNow()
-		else:
-			document.asyncValidate .callNow()
-		errors = document.errors
-		return errors
-	except Exception as e:
-		logError(f"filePath = {filePath!r}")
-		logError(format_full_exc())
-		return [WrappedError(e)]
-
-
 class CheckAllDialog(OnProjectFilesDialogBase):
 
 	def __init__(self, parent: Optional[QWidget] = None):
@@ -268,3 +251,5 @@ class CheckAllDialog(OnProjectFilesDialogBase):
 		errors = checkFile(filePath, pool)
 		counts = getErrorCounts(errors)
 		self.result.add(ErrorsResult(filePath, errors, counts))
+		if (problemsAspect := getSession().project.aspects.get(ProblemsAspect)) is not None:
+			problemsAspect.setProblems(filePath, errors)
@@ -16,6 +16,7 @@ from cat.utils import format_full_exc, override
 from cat.utils.collections_ import AddToDictDecorator, getIfKeyIssubclassOrEqual
 from cat.utils.formatters import indentMultilineStr
 from cat.utils.profiling import logError
+from base.gui.documentLexer import DocumentLexer
 from base.model.documents import TextDocument, Document, ParsedDocument
 from base.model.parsing.schemaStore import GLOBAL_SCHEMA_STORE
 from base.model.utils import LanguageId
@@ -182,13 +183,15 @@ class TextDocumentEditor(DocumentEditorBase[TextDocument]):
 			self._currentLexer = lexer
 		if hasattr(lexer, 'setDocument'):
 			lexer.setDocument(document)
+		# a DocumentLexer draws the errors itself, only redrawing those that changed:
+		drawsErrors = isinstance(lexer, DocumentLexer)
 
 		# document.strContent, document.highlightErrors, document.cursorPosition, document.forceLocate = drawCodeField(
 		document.strContent, document.highlightErrors, _, document.forceLocate = drawCodeField(
 			gui,
 			document.strContent,
 			lexer=lexer,
-			errors=document.errors,
+			errors=[] if drawsErrors else document.errors,
 			forceLocateElement=True,
 			currentCursorPos=document.cursorPosition,
 			selectionTo=document.selection[2:] if document.selection[0] != -1 else None,
@@ -204,6 +207,8 @@ class TextDocumentEditor(DocumentEditorBase[TextDocument]):
 			whitespaceVisibility=applicationSettings.appearance.whitespaceVisibility,
 			**kwargs
 		)
+		if drawsErrors:
+			lexer.updateErrorIndicators(document.highlightErrors)
 
 	def languageContextMenu(self, pos):
 		document = self.model()
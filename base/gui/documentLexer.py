@@ -5,17 +5,18 @@ from PyQt5.Qsci import QsciLexer, QsciLexerCustom, QsciScintilla
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QColor, QFont
 
+from base.gui.errorIndicators import ErrorIndicators
 from base.gui.styler import DEFAULT_STYLE_ID, StyleId, StylerCtx, getStyler
 from base.model import theme
 from base.model.documents import TextDocument
 from base.model.parsing.contextProvider import ContextProvider, getContextProvider
 from base.model.parsing.tree import Node
 from base.model.searchUtils import performFuzzyStrSearch
-from base.model.theme import GlobalStyles, Style, StyleFont
+from base.model.theme import GlobalStyles, Style, StyleFont, StyleLayout
+from base.model.tracing import TRACE_STYLE, traced
 from base.model.utils import GeneralError, LanguageId, MDStr, NULL_POSITION, Position, addStyle, formatMarkdown
 from cat.GUI.components.codeEditor import AutoCompletionTree, CEPosition, CallTipInfo, CodeEditor, MyQsciAPIs
 from cat.utils import HTMLStr, override
-from cat.utils.logging_ import logWarning
 from cat.utils.utils import CrashReportWrapped, runLaterSafe
 
 _SCI_STYLE_DEFAULT = StyleId(32)  # This style defines the attributes that all styles receive when the SCI_STYLECLEARALL message is used.
@@ -40,6 +41,9 @@ _CAT_SCI_ELEMENT_COLOR_IDS = {
 }
 
 
+_STYLE_LAYOUTS: dict[LanguageId, Optional[StyleLayout]] = {}
+
+
 def QFontFromStyleFont(styleFont: StyleFont) -> QFont:
 	qFont: QFont = QFont()
 	for field in fields(styleFont):
@@ -82,6 +86,7 @@ class DocumentLexer(QsciLexerCustom):  # this is an ABC, but there would be a me
 		# Initialize all style colors
 		self._document: Optional[TextDocument] = None
 		self._lastStylePos: int = 0
+		self._errorIndicators: ErrorIndicators = ErrorIndicators()
 		self._api: DocumentQsciAPIs = DocumentQsciAPIs(self)
 		self._api.prepare()
 		self.setAPIs(self._api)
@@ -113,28 +118,26 @@ class DocumentLexer(QsciLexerCustom):  # this is an ABC, but there would be a me
 		if languageId is None:
 			return styleMap
 
-		styles = scheme.getStyles2(languageId)
-		if styles is None:
+		layout = self._getStyleLayout(languageId)
+		if layout is None:
 			return styleMap
 
-		styler = getStyler(languageId, StylerCtxQScintilla(DEFAULT_STYLE_ID, 0, 0, self))
-		if styler is None:
+		styleTable = theme.getStyleTable(scheme, languageId, layout)
+		if styleTable is None:
 			return styleMap
 
-		for innerLanguage, styler in styler.innerStylers.items():
-			innerStyles = styles.getInnerLanguageStyles(innerLanguage)
-			if innerStyles is None:
-				continue
-			for name, styleId in styler.localStyles.items():
-				style = innerStyles.get(name)
-				if style is None:
-					logWarning(f"Theme '{scheme.name}' is missing style '{name}' for language '{innerLanguage}'")
-					style = styleMap[_SCI_STYLE_DEFAULT - _SCI_STYLE_FIRST_USER_STYLE]
-				# elif styleId == DEFAULT_STYLE_ID:
-				# 	style = scheme.globalStyles.defaultStyle | style
-				styleMap[styleId] = style
+		for styleId, style in enumerate(styleTable):
+			if style is not None:
+				styleMap[StyleId(styleId)] = style
 		return styleMap
 
+	def _getStyleLayout(self, languageId: LanguageId) -> Optional[StyleLayout]:
+		"""the layout only depends on the registered stylers, so it is only computed once per language."""
+		if (layout := _STYLE_LAYOUTS.get(languageId, ...)) is ...:
+			styler = getStyler(languageId, StylerCtxQScintilla(DEFAULT_STYLE_ID, 0, 0, self))
+			layout = _STYLE_LAYOUTS[languageId] = styler.styleLayout if styler is not None else None
+		return layout
+
 	def addGlobalStyles(self, globalStyles: GlobalStyles, styleMap: dict[int, Style]):
 		revOffset = -_SCI_STYLE_FIRST_USER_STYLE
 		styleMap[DEFAULT_STYLE_ID] = globalStyles.defaultStyle
@@ -239,9 +242,17 @@ class DocumentLexer(QsciLexerCustom):  # this is an ABC, but there would be a me
 		return self._document
 
 	def setDocument(self, document: Optional[TextDocument]) -> None:
+		if document is not self._document:
+			self._errorIndicators.clear()
 		self._document = document
 		# self.initStyles(self.getStyles())
 
+	def updateErrorIndicators(self, highlightErrors: bool) -> None:
+		"""draws the errors of the document into the editor. Only the errors that changed since the last call are redrawn."""
+		self._errorIndicators.setEditor(self.editor())
+		doc = self.document()
+		self._errorIndicators.update(doc.errors if doc is not None and highlightErrors else ())
+
 	def description(self, p_int):
 		return ''
 
@@ -251,6 +262,7 @@ class DocumentLexer(QsciLexerCustom):  # this is an ABC, but there would be a me
 
 	# @TimedMethod(objectName=lambda self: self.document().fileName if self.document() is not None else 'None')
 	# @ProfiledFunction()
+	@traced(TRACE_STYLE, file=lambda self, start, end: doc.filePath if (doc := self.document()) is not None else None)
 	def styleText(self, start: int, end: int):
 		# text: bytes = self.getText()
 		# start = 0
@@ -0,0 +1,209 @@
+"""
+Draws the errors of a document as indicators into a QScintilla editor.
+
+Instead of redrawing all indicators whenever the errors change, the previously drawn errors are remembered (keyed by
+span and message) and only the difference is applied. Only errors on the visible lines (plus a margin) are drawn.
+The indicator colors are taken from the error, warning, info & hint styles of the current color scheme.
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Optional, Sequence
+
+from PyQt5.Qsci import QsciScintilla
+from PyQt5.QtGui import QColor
+
+from base.model import theme
+from base.model.theme import GlobalStyles, Style
+from base.model.utils import GeneralError
+
+_ErrorKey = tuple[int, int, str, str]
+"""(start index, end index, message, style)"""
+
+_INDICATOR_IDS: dict[str, int] = {
+	'error': 20,
+	'warning': 21,
+	'info': 22,
+	'hint': 23,
+}
+
+_INDICATOR_STYLES: dict[str, str] = {
+	'error': 'errorStyle',
+	'warning': 'warningStyle',
+	'info': 'infoStyle',
+	'hint': 'hintStyle',
+}
+"""style -> name of the GlobalStyles field the indicator color is taken from"""
+
+VISIBLE_LINES_MARGIN: int = 50
+"""number of lines above and below the visible lines for which errors are drawn as well"""
+
+
+def _indicatorId(style: str) -> int:
+	return _INDICATOR_IDS.get(style, _INDICATOR_IDS['error'])
+
+
+def _errorKey(error: GeneralError) -> _ErrorKey:
+	return error.span.start.index, error.span.end.index, error.message, error.style
+
+
+def _movePos(pos: int, position: int, length: int, isInsert: bool, isStart: bool) -> int:
+	if isInsert:
+		# text inserted directly at the start of an indicator pushes it back; at its end it does not extend it:
+		return pos + length if pos > position or (isStart and pos == position) else pos
+	if pos <= position:
+		return pos
+	return pos - length if pos >= position + length else position
+
+
+def _sciColor(c: QColor) -> int:
+	return c.red() + (c.green() << 8) + (c.blue() << 16)
+
+
+def _indicatorColor(globalStyles: GlobalStyles, style: str) -> QColor:
+	indicatorStyle: Style = getattr(globalStyles, _INDICATOR_STYLES[style])
+	if indicatorStyle.foreground is not None:
+		return indicatorStyle.foreground
+	return getattr(GlobalStyles(), _INDICATOR_STYLES[style]).foreground
+
+
+@dataclass
+class ErrorIndicators:
+	"""
+	keeps the error indicators of one editor up to date. call update(...) whenever the errors change; scrolling is
+	handled automatically.
+	"""
+	_editor: Optional[QsciScintilla] = field(default=None, init=False)
+	_globalStyles: Optional[GlobalStyles] = field(default=None, init=False)
+	"""the styles the indicator colors were last taken from"""
+	_errors: Sequence[GeneralError] = field(default=(), init=False)
+	_drawn: dict[_ErrorKey, tuple[int, int]] = field(default_factory=dict, init=False)
+	"""the errors that are currently drawn: key -> (start, end)"""
+
+	def editor(self) -> Optional[QsciScintilla]:
+		return self._editor
+
+	def setEditor(self, editor: Optional[QsciScintilla]) -> None:
+		if editor is self._editor:
+			return
+		if self._editor is not None:
+			self._editor.SCN_MODIFIED.disconnect(self._onModified)
+			self._editor.SCN_UPDATEUI.disconnect(self._onUpdateUI)
+		self._editor = editor
+		self._globalStyles = None
+		self._drawn.clear()
+		if editor is not None:
+			for style, indicatorId in _INDICATOR_IDS.items():
+				editor.SendScintilla(QsciScintilla.SCI_INDICSETSTYLE, indicatorId, QsciScintilla.INDIC_DOTS if style == 'hint' else QsciScintilla.INDIC_SQUIGGLEPIXMAP)
+			self._updateColors()
+			editor.SCN_MODIFIED.connect(self._onModified)
+			editor.SCN_UPDATEUI.connect(self._onUpdateUI)
+
+	def _updateColors(self) -> None:
+		"""sets the indicator colors, if the color scheme changed since they were last set."""
+		editor = self._editor
+		globalStyles = theme.currentColorScheme().globalStyles
+		if editor is None or globalStyles is self._globalStyles:
+			return
+		self._globalStyles = globalStyles
+		for style, indicatorId in _INDICATOR_IDS.items():
+			editor.SendScintilla(QsciScintilla.SCI_INDICSETFORE, indicatorId, _sciColor(_indicatorColor(globalStyles, style)))
+
+	def clear(self) -> None:
+		"""removes all error indicators from the editor, e.g. when a different document is shown."""
+		self._drawn.clear()
+		self._errors = ()
+		editor = self._editor
+		if editor is None:
+			return
+		length = editor.SendScintilla(QsciScintilla.SCI_GETLENGTH)
+		for indicatorId in _INDICATOR_IDS.values():
+			editor.SendScintilla(QsciScintilla.SCI_SETINDICATORCURRENT, indicatorId)
+			editor.SendScintilla(QsciScintilla.SCI_INDICATORCLEARRANGE, 0, length)
+
+	def _onModified(self, position: int, modificationType: int, text, length: int, *args) -> None:
+		# Scintilla moves the indicators along with the text, so the remembered ranges have to move too:
+		isInsert = bool(modificationType & QsciScintilla.SC_MOD_INSERTTEXT)
+		if not self._drawn or not (isInsert or modificationType & QsciScintilla.SC_MOD_DELETETEXT):
+			return
+		drawn = {}
+		for (start, end, message, style), (drawnStart, drawnEnd) in self._drawn.items():
+			key = (_movePos(start, position, length, isInsert, True), _movePos(end, position, length, isInsert, False), message, style)
+			drawn[key] = _movePos(drawnStart, position, length, isInsert, True), _movePos(drawnEnd, position, length, isInsert, False)
+		self._drawn = drawn
+
+	def _onUpdateUI(self, updated: int) -> None:
+		if updated & QsciScintilla.SC_UPDATE_V_SCROLL:
+			self._draw()
+
+	def _visibleRange(self, editor: QsciScintilla) -> tuple[int, int]:
+		send = editor.SendScintilla
+		firstVisible = send(QsciScintilla.SCI_GETFIRSTVISIBLELINE)
+		linesOnScreen = send(QsciScintilla.SCI_LINESONSCREEN)
+		firstLine = send(QsciScintilla.SCI_DOCLINEFROMVISIBLE, firstVisible)
+		lastLine = send(QsciScintilla.SCI_DOCLINEFROMVISIBLE, firstVisible + linesOnScreen)
+		lineCount = send(QsciScintilla.SCI_GETLINECOUNT)
+		firstLine = max(0, firstLine - VISIBLE_LINES_MARGIN)
+		lastLine = min(lineCount - 1, lastLine + VISIBLE_LINES_MARGIN)
+		return send(QsciScintilla.SCI_POSITIONFROMLINE, firstLine), send(QsciScintilla.SCI_GETLINEENDPOSITION, lastLine)
+
+	def update(self, errors: Sequence[GeneralError]) -> None:
+		"""
+		draws errors into the editor. Only errors that were not drawn before are added and only errors that are no
+		longer in errors (or no longer near the visible lines) are removed.
+		"""
+		self._errors = errors
+		self._updateColors()
+		self._draw()
+
+	def _draw(self) -> None:
+		editor = self._editor
+		if editor is None:
+			return
+		rangeStart, rangeEnd = self._visibleRange(editor)
+		length = editor.SendScintilla(QsciScintilla.SCI_GETLENGTH)
+
+		wanted: dict[_ErrorKey, tuple[int, int]] = {}
+		for error in self._errors:
+			key = _errorKey(error)
+			start, end = key[0], key[1]
+			if end < rangeStart or start > rangeEnd or start >= length:
+				continue
+			wanted[key] = start, min(max(end, start + 1), length)
+
+		drawn = self._drawn
+		removed = [(key, span) for key, span in drawn.items() if key not in wanted]
+		added = [(key, span) for key, span in wanted.items() if key not in drawn]
+		if not removed and not added:
+			return
+
+		toClear: defaultdict[int, list[tuple[int, int]]] = defaultdict(list)
+		toFill: defaultdict[int, list[tuple[int, int]]] = defaultdict(list)
+		for key, span in removed:
+			toClear[_indicatorId(key[3])].append(span)
+			del drawn[key]
+		for key, span in added:
+			toFill[_indicatorId(key[3])].append(span)
+			drawn[key] = span
+		if toClear:
+			# clearing a range also clears other errors of the same indicator that overlap it, so these are redrawn:
+			for key, (start, end) in drawn.items():
+				if (cleared := toClear.get(_indicatorId(key[3]))) and any(start < cEnd and cStart < end for cStart, cEnd in cleared):
+					toFill[_indicatorId(key[3])].append((start, end))
+
+		send = editor.SendScintilla
+		for indicatorId, spans in toClear.items():
+			send(QsciScintilla.SCI_SETINDICATORCURRENT, indicatorId)
+			for start, end in spans:
+				send(QsciScintilla.SCI_INDICATORCLEARRANGE, start, max(end - start, 1))
+		for indicatorId, spans in toFill.items():
+			send(QsciScintilla.SCI_SETINDICATORCURRENT, indicatorId)
+			for start, end in spans:
+				send(QsciScintilla.SCI_INDICATORFILLRANGE, start, end - start)
+
+
+__all__ = [
+	'VISIBLE_LINES_MARGIN',
+	'ErrorIndicators',
+]
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Optional
+
+from PyQt5.QtWidgets import QWidget
+
+from base.gui.onProjectFilesDialogBase import OnProjectFilesDialogBase
+from base.model.formatting import formatDiff, formatFile, previewFormatFile
+from base.model.pathUtils import FilePathTpl, ZipFilePool, fileNameFromFilePath, toDisplayPath
+from base.model.session import getSession
+from cat.GUI.components.treeBuilders import DataListBuilder
+from cat.utils import override
+from gui.datapackEditorGUI import ContextMenuEntries, DatapackEditorGUI
+from gui.icons import icons
+
+
+@dataclass
+class FormatResult:
+	changedFiles: list[FilePathTpl] = field(default_factory=list)
+	unchangedCount: int = 0
+	skippedCount: int = 0
+	"""files that have no formatter, have syntax errors or are inside of archives."""
+	failedFiles: list[tuple[FilePathTpl, OSError]] = field(default_factory=list)
+	diffs: dict[FilePathTpl, str] = field(default_factory=dict)
+	"""the changes that would be made to each file during a dry run."""
+
+	def clear(self) -> None:
+		self.changedFiles.clear()
+		self.diffs.clear()
+		self.unchangedCount = 0
+		self.skippedCount = 0
+		self.failedFiles.clear()
+
+
+class FormatAllDialog(OnProjectFilesDialogBase):
+
+	def __init__(self, parent: Optional[QWidget] = None):
+		super().__init__(GUICls=DatapackEditorGUI, parent=parent)
+		self.result: FormatResult = FormatResult()
+		self.dryRun: bool = False
+		self.setWindowTitle('Format Files')
+
+	@override
+	def optionsGUI(self, gui: DatapackEditorGUI):
+		pass
+
+	@override
+	def resultsSummaryGUI(self, gui: DatapackEditorGUI) -> None:
+		with gui.vPanel(windowPanel=True):
+			with gui.hLayout():
+				self.addProgressBar(gui)
+				self.dryRun = gui.toggleLeft(self.dryRun, 'Dry run', tip="Only show the changes, without changing any files.")
+				if gui.button('Preview Changes' if self.dryRun else 'Format Files', default=True):
+					self.run()
+				if self.result.diffs:
+					if gui.button(icon=icons.file_code, tip='Show all Changes', default=False):
+						self._showDiff(gui, "Format Files: all Changes", '\n'.join(self.result.diffs.values()))
+			result = self.result
+			gui.label(
+				f'{self.processedFilesCount} / {self.allFilesCount} files processed: '
+				f'{len(result.changedFiles)} {"to be formatted" if result.diffs else "formatted"}, '
+				f'{result.unchangedCount} unchanged, {result.skippedCount} skipped, {len(result.failedFiles)} failed.'
+			)
+
+	@override
+	def resetUserInterface(self):
+		super().resetUserInterface()
+		self.result.clear()
+
+	@staticmethod
+	def _showDiff(gui: DatapackEditorGUI, title: str, diff: str) -> None:
+		gui.askUserInput(title, diff, lambda g, v: g.codeField(diff))
+
+	def _onDoubleClick(self, filePath: FilePathTpl, gui: DatapackEditorGUI) -> None:
+		if (diff := self.result.diffs.get(filePath)) is not None:
+			self._showDiff(gui, f"Format Files: {fileNameFromFilePath(filePath)}", diff)
+		else:
+			getSession().tryOpenOrSelectDocument(filePath)
+
+	@override
+	def resultsGUI(self, gui: DatapackEditorGUI) -> None:
+		def onContextMenu(filePath: FilePathTpl, column: int):
+			with gui.popupMenu(atMousePosition=True) as menu:
+				if (diff := self.result.diffs.get(filePath)) is not None:
+					menu.addItem('show Changes', lambda: self._showDiff(gui, f"Format Files: {fileNameFromFilePath(filePath)}", diff))
+					menu.addSeparator()
+				menu.addItems(ContextMenuEntries.fileItems(filePath, getSession().tryOpenOrSelectDocument))
+
+		errors = {filePath: str(e) for filePath, e in self.result.failedFiles}
+		gui.tree(
+			DataListBuilder(
+				self.result.changedFiles + list(errors),
+				labelMaker=lambda x, i: fileNameFromFilePath(x) if i == 0 else errors.get(x, toDisplayPath(x)),
+				iconMaker=lambda x, i: icons.errorColored if i == 0 and x in errors else None,
+				toolTipMaker=lambda x, i: toDisplayPath(x),
+				columnCount=2,
+				onDoubleClick=lambda x: self._onDoubleClick(x, gui),
+				onContextMenu=onContextMenu,
+				onCopy=lambda x: toDisplayPath(x),
+			),
+			headerVisible=False,
+		)
+
+	@override
+	def prepareRun(self) -> tuple[bool, None]:
+		return True, None
+
+	@override
+	def finishedRun(self, fromPrepareRun: None) -> None:
+		pass
+
+	@override
+	def processFile(self, filePath: FilePathTpl, pool: ZipFilePool, fromPrepareRun: None):
+		if self.dryRun:
+			self._previewFile(filePath, pool)
+			return
+		try:
+			changed = formatFile(filePath, pool)
+		except OSError as e:
+			self.result.failedFiles.append((filePath, e))
+			return
+		if changed is None:
+			self.result.skippedCount += 1
+		elif changed:
+			self.result.changedFiles.append(filePath)
+		else:
+			self.result.unchangedCount += 1
+
+	def _previewFile(self, filePath: FilePathTpl, pool: ZipFilePool) -> None:
+		try:
+			contents = previewFormatFile(filePath, pool)
+		except OSError as e:
+			self.result.failedFiles.append((filePath, e))
+			return
+		if contents is None:
+			self.result.skippedCount += 1
+		elif contents[0] != contents[1]:
+			self.result.changedFiles.append(filePath)
+			self.result.diffs[filePath] = formatDiff(filePath, *contents)
+		else:
+			self.result.unchangedCount += 1
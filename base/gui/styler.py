@@ -10,6 +10,7 @@ from cat.utils.collections_ import AddToDictDecorator
 from cat.utils.graphs import collectAndSemiTopolSortAllNodes3
 from cat.utils.logging_ import logError
 from base.model.parsing.tree import Node
+from base.model.theme import StyleLayout
 from base.model.utils import LanguageId
 
 _TNode = TypeVar('_TNode', bound=Node)
@@ -93,6 +94,15 @@ class CatStyler(Generic[_TNode], ABC):
 				allStylesIds[f'{language}:{name}'] = styleId
 		return allStylesIds
 
+	@property
+	def styleLayout(self) -> StyleLayout:
+		""":return: (language, styleName, styleId) for all styles of this styler and its inner stylers."""
+		return tuple(
+			(language, name, styleId)
+			for language, styler in self.innerStylers.items()
+			for name, styleId in styler.localStyles.items()
+		)
+
 	def __enter__(self) -> None:
 		self.ctx.defaultStyles.append(self.ctx.defaultStyle)
 		self.ctx.defaultStyle = self.offset
@@ -157,6 +157,76 @@ class DebugSettings(SerializableDataclass):
 	)
 
 
+@dataclass()
+class DocumentSettings(SerializableDataclass):
+
+	releaseTreesAfter: float = field(
+		default=10.,
+		metadata=catMeta(
+			kwargs=dict(
+				label='Release Syntax Trees After',
+				tip="Documents that have not been shown for this long drop their syntax tree to save memory. It is recreated when needed.",
+				min=1, max=24 * 60, step=1.0, decimals=0, suffix=' min'
+			),
+		)
+	)
+
+	treeMemoryBudget: int = field(
+		default=256,
+		metadata=catMeta(
+			kwargs=dict(
+				label='Syntax Tree Memory Budget',
+				tip="If the syntax trees of documents that are not shown take up more memory than this, the least recently shown ones are released early.",
+				min=16, max=16 * 1024, step=16, suffix=' MB'
+			),
+		)
+	)
+
+	fileWatcherAlwaysPoll: bool = field(
+		default=False,
+		metadata=catMeta(
+			kwargs=dict(
+				label='File Watcher: Always Poll',
+				tip="Detect changes on disk by periodically scanning the opened folders instead of relying on the notifications of the operating system, which e.g. never arrive for some network drives. DPE switches to polling automatically, when the operating system runs out of file watches. Applies to folders that are opened afterwards.",
+			),
+			decorators=[pd.ToggleSwitch()]
+		)
+	)
+
+	fileWatcherPollingInterval: float = field(
+		default=2.,
+		metadata=catMeta(
+			kwargs=dict(
+				label='File Watcher: Polling Interval',
+				tip="How often folders that are watched by polling are scanned for changes.",
+				min=0.5, max=60, step=0.5, decimals=1, suffix=' s'
+			),
+		)
+	)
+
+	formatLineWidth: int = field(
+		default=80,
+		metadata=catMeta(
+			kwargs=dict(
+				label='Format: Line Width',
+				tip="When formatting a document, short lists (e.g. arrays) are kept on a single line, if they fit into this many columns.",
+				min=20, max=400, step=1
+			),
+		)
+	)
+
+	formatSortKeys: bool = field(
+		default=True,
+		metadata=catMeta(
+			kwargs=dict(
+				label='Format: Sort Keys',
+				tip="When formatting a document, sort the keys of objects in the order they are defined by the schema. Unknown keys are moved to the end.",
+			),
+			decorators=[pd.ToggleSwitch()]
+		)
+	)
+
+
 @final
 class AboutQt:
 	"""
@@ -215,6 +285,7 @@ class SettingsAspect(Aspect, SerializableDataclass, ABC):
 class ApplicationSettings(SerializableDataclassWithAspects[SettingsAspect]):
 
 	appearance: AppearanceSettings = field(default_factory=AppearanceSettings, metadata=catMeta(kwargs=dict(label='Appearance')))
+	documents: DocumentSettings = field(default_factory=DocumentSettings, metadata=catMeta(kwargs=dict(label='Documents')))
 	debugging: DebugSettings = field(default_factory=DebugSettings, metadata=catMeta(kwargs=dict(label='Debugging')))
 	about: AboutSettings = field(default_factory=AboutSettings, metadata=catMeta(kwargs=dict(label='About')))
 
@@ -281,6 +352,7 @@ def loadApplicationSettings():
 
 __all__ = (
 	'AppearanceSettings',
+	'DocumentSettings',
 	'DebugSettings',
 	'AboutSettings',
 	'SettingsAspect',
@@ -1,3 +1,4 @@
+import functools as ft
 import re
 from collections import defaultdict
 from dataclasses import dataclass, field
@@ -55,16 +56,70 @@ class SchemaMapping:
 
 _schemaMappings: dict[LanguageId, list[SchemaMapping]] = defaultdict(list)
 
+_GLOBAL_FLAGS_PATTERN: re.Pattern[str] = re.compile(r'^\(\?[aiLmsux]+\)')
+_MAPPING_CACHE_SIZE: int = 4096
+
+
+@dataclass
+class _CompiledSchemaMappings:
+	"""
+	All mappings of a language combined into a single regex `(A)|(B)|...`. fullmatch(...) tries the alternatives in
+	order, so the first mapping that matches wins, just like when trying them one by one.
+	"""
+	mappings: list[SchemaMapping]
+	pattern: Optional[re.Pattern[str]] = field(init=False)
+	"""None, if the patterns cannot be combined. Then they are tried one by one."""
+	mappingsByGroup: dict[int, SchemaMapping] = field(init=False)
+
+	def __post_init__(self):
+		self.mappingsByGroup = {}
+		self.pattern = None
+		flags = {mapping.pattern.flags for mapping in self.mappings}
+		if len(flags) != 1:
+			return
+		alternatives = []
+		groupIndex = 1
+		for mapping in self.mappings:
+			alternatives.append(f'({_GLOBAL_FLAGS_PATTERN.sub("", mapping.pattern.pattern)})')
+			self.mappingsByGroup[groupIndex] = mapping
+			groupIndex += 1 + mapping.pattern.groups
+		try:
+			self.pattern = re.compile('|'.join(alternatives), flags.pop())
+		except re.error:  # e.g. duplicate group names
+			self.mappingsByGroup.clear()
+
+	def match(self, virtualPath: str) -> Optional[SchemaMapping]:
+		if self.pattern is None:
+			for mapping in self.mappings:
+				if mapping.pattern.fullmatch(virtualPath) is not None:
+					return mapping
+			return None
+		if (match := self.pattern.fullmatch(virtualPath)) is None:
+			return None
+		# the group of the mapping encloses all other groups of that alternative, so it is always the last one closed:
+		return self.mappingsByGroup[match.lastindex]
+
+
+_compiledSchemaMappings: dict[LanguageId, _CompiledSchemaMappings] = {}
+
 
 def addSchemaMapping(language: LanguageId, mapping: SchemaMapping):
 	_schemaMappings[language].append(mapping)
+	_compiledSchemaMappings.pop(language, None)
+	_getSchemaMapping.cache_clear()
+
+
+@ft.lru_cache(maxsize=_MAPPING_CACHE_SIZE)
+def _getSchemaMapping(virtualPath: str, language: LanguageId) -> Optional[SchemaMapping]:
+	if (compiled := _compiledSchemaMappings.get(language)) is None:
+		if (mappings := _schemaMappings.get(language)) is None:
+			return None
+		compiled = _compiledSchemaMappings[language] = _CompiledSchemaMappings(mappings)
+	return compiled.match(virtualPath)
 
 
 def getSchemaMapping(path: FilePathTpl, language: LanguageId) -> Optional[SchemaMapping]:
-	if (mappings := _schemaMappings.get(language)) is not None:
-		for mapping in mappings:
-			if mapping.pattern.fullmatch(path[1]) is not None:
-				return mapping
+	return _getSchemaMapping(path[1], language)
 
 
 @overload
@@ -5,6 +5,7 @@ from __future__ import annotations
 
 from abc import abstractmethod
 from dataclasses import dataclass, field
+import time
 from typing import NewType, Optional, Callable, Iterator, cast, Sequence, ClassVar
 
 from cat.Serializable.serializableDataclasses import SerializableDataclass, catMeta
@@ -12,12 +13,24 @@ from cat.utils import override
 from cat.utils.collections_ import Stack
 from cat.utils.profiling import logInfo
 from cat.utils.signals import CatSignal
+from cat.utils.utils import DeferredCallOnceMethod
+from base.model.applicationSettings import getApplicationSettings
 from base.model.utils import Span
 from base.model.pathUtils import FilePath, toDisplayPath
 from base.model.documents import Document, DocumentTypeDescription, loadDocument
 
 WindowId = NewType('WindowId', str)
 
+_RELEASE_TREES_INTERVAL: int = 60_000
+"""ms. between two checks for trees that can be released."""
+_TREE_SIZE_PER_BYTE: int = 48
+"""rough estimate of how many bytes of memory a syntax tree needs per byte of source text."""
+
+
+def estimateTreeSize(document: Document) -> int:
+	""":return: an estimate of the memory used by the tree of document in bytes."""
+	return len(document.content or b'') * _TREE_SIZE_PER_BYTE if document.hasTree else 0
+
 
 @dataclass(unsafe_hash=True, frozen=True)
 class ViewId:
@@ -238,6 +251,12 @@ class View(ViewBase):
 		old = self.selectedDocument
 		if doc is not old or forceUpdate:
 			self.selectedDocument = doc
+			now = time.monotonic()
+			for d in (old, doc):
+				if d is not None:
+					d.lastShown = now
+			self._ensureManagerIsSet()
+			self.manager.releaseInactiveTrees()
 			if self.isCurrent:
 				self.manager.onSelectedDocumentChanged.emit()
 			self.onSelectedDocumentChanged.emit()
@@ -454,5 +473,35 @@ class DocumentsManager(SerializableDataclass):
 		for view in self.views:
 			yield from view.documents
 
+	# memory:
+
+	@DeferredCallOnceMethod(delay=_RELEASE_TREES_INTERVAL)
+	def releaseInactiveTrees(self) -> None:
+		"""
+		releases the trees of documents that are not shown in any view, if they have not been shown for
+		`DocumentSettings.releaseTreesAfter` minutes, or if all these trees together exceed `DocumentSettings.treeMemoryBudget`.
+		The least recently shown documents are released first.
+		"""
+		settings = getApplicationSettings().documents
+		shown = {view.selectedDocument for view in self.views}
+		inactive = sorted(
+			(doc for doc in self.allOpenedDocuments() if doc not in shown and doc.hasTree),
+			key=lambda d: d.lastShown
+		)
+		releaseBefore = time.monotonic() - settings.releaseTreesAfter * 60
+		budget = settings.treeMemoryBudget * 1024 * 1024
+		totalSize = sum(estimateTreeSize(doc) for doc in inactive)
+
+		kept = 0
+		for doc in inactive:
+			size = estimateTreeSize(doc)
+			if (doc.lastShown < releaseBefore or totalSize > budget) and doc.releaseTree():
+				totalSize -= size
+			else:
+				kept += 1
+		if kept:
+			# check again later, when they might have become idle:
+			self.releaseInactiveTrees()
+
 	def __hash__(self):
 		return hash(id(self)) + 17948351
@@ -13,6 +13,9 @@ from base.model.parsing.contextProvider import getContextProvider, parseNPrepare
 from base.model.parsing.schemaStore import GLOBAL_SCHEMA_STORE
 from base.model.parsing.tree import Node, Schema
 from base.model.pathUtils import ArchiveFilePool, FilePath, ZipFilePool, fileNameFromFilePath, loadTextFile, toDisplayPath, unitePath, unitePathTpl
+from base.model.project.project import indexSnapshot
+from base.model.project.references import recordReferences, storeReferences
+from base.model.undoMementos import MakesTextDeltaMementoIfDiff
 from base.model.utils import GeneralError, LanguageId, Position, WrappedError
 from cat import undoRedo
 from cat.GUI import propertyDecorators as pd
@@ -23,6 +26,7 @@ from cat.undoRedo import MakeMementoIfDiffFunc, UndoRedoStack2
 from cat.utils import utils
 from cat.utils.logging_ import logWarning
 from cat.utils.profiling import TimedMethod, logError, logInfo
+from base.model.tracing import TRACE_VALIDATE, traced
 from cat.utils.signals import CatSignal
 from cat.utils.utils import runLaterSafe
 
@@ -400,7 +404,40 @@ class Document(SerializableDataclass):
 
 	_originalContent: Optional[_TTarget] = field(default=None, metadata=catMeta(decorators=[pd.NoUI()]))
 
-	tree: Optional[Node] = field(default=None, repr=False, metadata=catMeta(serialize=False))
+	_tree: Optional[Node] = field(default=None, repr=False, metadata=catMeta(serialize=False))
+	_isTreeReleased: bool = field(default=False, repr=False, metadata=catMeta(serialize=False))
+
+	@property
+	def tree(self) -> Optional[Node]:
+		if self._isTreeReleased:
+			# the errors have been kept, so only the tree has to be restored:
+			self._isTreeReleased = False
+			self._tree, _ = self.parse(self.content)
+		return self._tree
+
+	@tree.setter
+	def tree(self, newVal: Optional[Node]) -> None:
+		self._tree = newVal
+		self._isTreeReleased = False
+
+	@property
+	def hasTree(self) -> bool:
+		"""Whether the tree is currently in memory. Unlike `tree`, this never parses the document."""
+		return self._tree is not None
+
+	def releaseTree(self) -> bool:
+		"""
+		drops the tree to save memory. It is parsed again the next time it is accessed. The errors are kept.
+		:return: True, if the tree was released.
+		"""
+		if self._tree is None or self.asyncParse.isPending or self.asyncValidate.isPending:
+			return False
+		self._tree = None
+		self._isTreeReleased = True
+		return True
+
+	lastShown: float = field(default=0., repr=False, metadata=catMeta(serialize=False))
+	"""time.monotonic() of when the document was last selected in a view. Used to decide which trees can be released."""
 
 	def contentOnSet(self, newVal: bytes, oldVal: Optional[bytes]) -> None:
 		if not self._undoRedoStackInitialized:
@@ -603,7 +640,8 @@ class TextDocument(Document):
 
 	def __post_init__(self):
 		super(TextDocument, self).__post_init__()
-		self._initUndoRedoStack(undoRedo.makesSnapshotMementoIfDiff)
+		# only store the changed part of the content for each step, not the whole content:
+		self._initUndoRedoStack(MakesTextDeltaMementoIfDiff())
 
 	_content: bytes = field(
 		default=b'',
@@ -709,13 +747,16 @@ class ParsedDocument(TextDocument):
 			return None, [WrappedError(e, style='info')]
 
 	@TimedMethod(enabled=True)
+	@traced(TRACE_VALIDATE, file=lambda self: self.filePath)
 	def validate(self) -> Sequence[GeneralError]:
 		errors = []
 		try:
 			if (tree := self.tree) is not None:
 				ctxProvider = getContextProvider(tree, self.content)
 				if ctxProvider is not None:
-					ctxProvider.validateTree(errors)
+					with recordReferences() as references, indexSnapshot():
+						ctxProvider.validateTree(errors)
+					storeReferences(self.filePath, references)
 			return errors
 		except Exception as e:
 			logError(e)
@@ -1,13 +1,27 @@
+import enum
+import errno
 import os
+import stat
 import threading
+import time
+from abc import ABC, abstractmethod
 from collections import defaultdict
-from typing import Optional, Mapping
+from contextlib import contextmanager
+from typing import Iterator, Optional, Mapping, Union
 
-from watchdog.events import FileSystemEventHandler, FileSystemEvent
+from watchdog.events import FileSystemEventHandler, FileSystemEvent, EVENT_TYPE_CREATED, EVENT_TYPE_DELETED, EVENT_TYPE_MODIFIED, EVENT_TYPE_MOVED, \
+	DirCreatedEvent, DirDeletedEvent, DirMovedEvent, FileCreatedEvent, FileDeletedEvent, FileModifiedEvent, FileMovedEvent
 from watchdog.observers import Observer
-from watchdog.observers.api import ObservedWatch
+from watchdog.observers.api import BaseObserver, EventEmitter, ObservedWatch
 
-from cat.utils.logging_ import logInfo, logDebug
+from base.model.applicationSettings import getApplicationSettings
+from cat.utils.logging_ import logInfo, logDebug, logWarning
+
+_WATCH_LIMIT_ERRNOS: tuple[int, ...] = (errno.ENOSPC, errno.EMFILE)
+"""raised by the inotify observer, if the watch limit (fs.inotify.max_user_watches) or instance limit is reached."""
+
+DEFAULT_POLLING_INTERVAL: float = 2.
+"""in seconds"""
 
 
 class _Watches:
@@ -28,6 +42,9 @@ class _Watches:
 		self._byPath[path][handlerId] = handler
 		self._byId[handlerId][path] = handler
 
+	def allHandlers(self) -> list[FileSystemEventHandler]:
+		return [handler for handlers in self._byPath.values() for handler in handlers.values()]
+
 	def pop(self, handlerId: str, path: str) -> Optional[FileSystemEventHandler]:
 		handler = self._byPath[path].pop(handlerId, None)
 		self._byId[handlerId].pop(path, None)
@@ -47,12 +64,353 @@ class _CombinedEventHandler(FileSystemEventHandler):
 				handler.dispatch(event)
 
 
+class ChangeKind(enum.Enum):
+	created = enum.auto()
+	modified = enum.auto()
+	deleted = enum.auto()
+
+
+_COALESCED_CHANGE_KINDS: dict[tuple[ChangeKind, ChangeKind], Optional[ChangeKind]] = {
+	# (previous, new): coalesced
+	(ChangeKind.created, ChangeKind.created): ChangeKind.created,
+	(ChangeKind.created, ChangeKind.modified): ChangeKind.created,
+	(ChangeKind.created, ChangeKind.deleted): None,  # create + delete cancel each other out.
+	(ChangeKind.modified, ChangeKind.created): ChangeKind.modified,
+	(ChangeKind.modified, ChangeKind.modified): ChangeKind.modified,
+	(ChangeKind.modified, ChangeKind.deleted): ChangeKind.deleted,
+	(ChangeKind.deleted, ChangeKind.created): ChangeKind.modified,  # e.g.: save-via-rename
+	(ChangeKind.deleted, ChangeKind.modified): ChangeKind.modified,
+	(ChangeKind.deleted, ChangeKind.deleted): ChangeKind.deleted,
+}
+
+PendingChanges = dict[tuple[str, bool], ChangeKind]
+"""(path, isDirectory) -> coalesced ChangeKind"""
+
+
+class CoalescingEventHandler(FileSystemEventHandler, ABC):
+	"""
+	Collects file system events and coalesces them per path (last-writer-wins, a create followed by a delete cancels out).
+	Moves are split into a delete of the source path and a create of the destination path.
+	Once no new events arrived for :attr:`delay` seconds (or at the latest after :attr:`maxDelay` seconds) all pending
+	changes are handed to :meth:`processChanges` in one batch. Modifications of directories are ignored, as they only
+	mean that a direct child has changed, which has its own event.
+	"""
+
+	def __init__(self, delay: float = 0.25, maxDelay: float = 2.0):
+		super().__init__()
+		self.delay: float = delay
+		self.maxDelay: float = maxDelay
+		self._pending: PendingChanges = {}
+		self._pendingLock = threading.Lock()
+		self._timer: Optional[threading.Timer] = None
+		self._firstPendingTime: float = 0.
+		self._holdCount: int = 0
+
+	def dispatch(self, event: FileSystemEvent):
+		eventType = event.event_type
+		isDir = event.is_directory
+		with self._pendingLock:
+			if eventType == EVENT_TYPE_MOVED:
+				self._coalesce(event.src_path, isDir, ChangeKind.deleted)
+				self._coalesce(event.dest_path, isDir, ChangeKind.created)
+			elif eventType == EVENT_TYPE_CREATED:
+				self._coalesce(event.src_path, isDir, ChangeKind.created)
+			elif eventType == EVENT_TYPE_DELETED:
+				self._coalesce(event.src_path, isDir, ChangeKind.deleted)
+			elif eventType == EVENT_TYPE_MODIFIED and not isDir:
+				self._coalesce(event.src_path, isDir, ChangeKind.modified)
+			else:
+				return  # opened, closed, directory modified, ...
+			self._restartTimer()
+
+	def _coalesce(self, path: str, isDir: bool, kind: ChangeKind) -> None:
+		key = (path, isDir)
+		previous = self._pending.get(key)
+		if previous is not None:
+			kind = _COALESCED_CHANGE_KINDS[(previous, kind)]
+		if kind is None:
+			del self._pending[key]
+		else:
+			self._pending[key] = kind
+
+	def _restartTimer(self) -> None:
+		if self._holdCount:
+			return  # release() will restart the timer.
+		now = time.monotonic()
+		if self._timer is not None:
+			if now - self._firstPendingTime >= self.maxDelay:
+				return  # don't starve under a constant stream of events. the running timer will fire soon enough.
+			self._timer.cancel()
+		else:
+			self._firstPendingTime = now
+		self._timer = threading.Timer(self.delay, self.flush)
+		self._timer.daemon = True
+		self._timer.start()
+
+	def flush(self) -> None:
+		"""processes all pending changes immediately."""
+		with self._pendingLock:
+			if self._timer is not None:
+				self._timer.cancel()
+				self._timer = None
+			pending, self._pending = self._pending, {}
+		if pending:
+			self.processChanges(pending)
+
+	def hold(self) -> None:
+		"""
+		keeps collecting changes without processing them until release() is called as often as hold(). Useful when
+		many files are changed at once on purpose, so all of them are processed in a single batch afterwards.
+		"""
+		with self._pendingLock:
+			self._holdCount += 1
+			if self._timer is not None:
+				self._timer.cancel()
+				self._timer = None
+
+	def release(self) -> None:
+		with self._pendingLock:
+			self._holdCount -= 1
+			if not self._holdCount and self._pending:
+				self._restartTimer()
+
+	def discardPending(self) -> None:
+		"""drops all pending changes without processing them."""
+		with self._pendingLock:
+			if self._timer is not None:
+				self._timer.cancel()
+				self._timer = None
+			self._pending.clear()
+
+	@abstractmethod
+	def processChanges(self, changes: PendingChanges) -> None:
+		"""
+		called with a batch of coalesced changes. Might be called from any thread.
+		"""
+		pass
+
+
+_FileState = tuple[int, int, int]
+"""(mtime in ns, size, inode)"""
+
+_MoveKey = tuple[int, int]
+"""(inode, size). Used to recognize a deleted and a created path as the same file."""
+
+
+class _DirSnapshot:
+	__slots__ = ('mtime', 'inode', 'files', 'dirs')
+
+	def __init__(self, mtime: int, inode: int):
+		self.mtime: int = mtime
+		"""in ns. -1 forces the directory to be listed again during the next scan."""
+		self.inode: int = inode
+		self.files: dict[str, _FileState] = {}
+		self.dirs: dict[str, _DirSnapshot] = {}
+
+
+class _SnapshotDiff:
+	__slots__ = ('created', 'deleted', 'modified')
+
+	def __init__(self):
+		self.created: list[tuple[str, bool, _MoveKey]] = []
+		"""(path, isDirectory, moveKey)"""
+		self.deleted: list[tuple[str, bool, _MoveKey]] = []
+		"""(path, isDirectory, moveKey)"""
+		self.modified: list[str] = []
+
+	def events(self) -> list[FileSystemEvent]:
+		createdByKey = {(isDir, key): path for path, isDir, key in self.created if key[0]}
+		movedTo: set[str] = set()
+		events: list[FileSystemEvent] = []
+		for path, isDir, key in self.deleted:
+			dest = createdByKey.pop((isDir, key), None) if key[0] else None
+			if dest is not None:
+				movedTo.add(dest)
+				events.append(DirMovedEvent(path, dest) if isDir else FileMovedEvent(path, dest))
+			else:
+				events.append(DirDeletedEvent(path) if isDir else FileDeletedEvent(path))
+		for path, isDir, key in self.created:
+			if path not in movedTo:
+				events.append(DirCreatedEvent(path) if isDir else FileCreatedEvent(path))
+		events.extend(FileModifiedEvent(path) for path in self.modified)
+		return events
+
+
+def _statKnownEntries(dirPath: str, old: _DirSnapshot) -> Optional[tuple[dict[str, _FileState], dict[str, tuple[int, int]]]]:
+	"""
+	stats all entries of a directory that has not changed since old was taken.
+	:return: None, if the entries don't match old anymore (the directory has to be listed again).
+	"""
+	files: dict[str, _FileState] = {}
+	dirs: dict[str, tuple[int, int]] = {}
+	try:
+		for name, (_, _, inode) in old.files.items():
+			st = os.lstat(os.path.join(dirPath, name))
+			if stat.S_ISDIR(st.st_mode):
+				return None
+			files[name] = (st.st_mtime_ns, st.st_size, inode)
+		for name, subDir in old.dirs.items():
+			st = os.lstat(os.path.join(dirPath, name))
+			if not stat.S_ISDIR(st.st_mode):
+				return None
+			dirs[name] = (st.st_mtime_ns, subDir.inode)
+	except FileNotFoundError:
+		return None
+	return files, dirs
+
+
+def _listEntries(dirPath: str) -> tuple[dict[str, _FileState], dict[str, tuple[int, int]]]:  # throws OSError
+	""":return: (files, dirs). Symbolic links are not followed."""
+	files: dict[str, _FileState] = {}
+	dirs: dict[str, tuple[int, int]] = {}
+	with os.scandir(dirPath) as scanner:
+		entry: os.DirEntry
+		for entry in scanner:
+			st = entry.stat(follow_symlinks=False)
+			if entry.is_dir(follow_symlinks=False):
+				dirs[entry.name] = (st.st_mtime_ns, entry.inode())
+			else:
+				files[entry.name] = (st.st_mtime_ns, st.st_size, entry.inode())
+	return files, dirs
+
+
+def _scanDirectory(path: str, st: os.stat_result, old: Optional[_DirSnapshot], diff: Optional[_SnapshotDiff]) -> _DirSnapshot:
+	"""
+	takes a snapshot of the directory at path and adds all changes since old to diff.
+	Only the top-most directory of a created subtree is reported.
+	"""
+	result = _DirSnapshot(st.st_mtime_ns, st.st_ino)
+	toScan: list[tuple[str, Optional[_DirSnapshot], _DirSnapshot, Optional[_SnapshotDiff]]] = [(path, old, result, diff)]
+	while toScan:
+		dirPath, old, new, diff = toScan.pop()
+		entries = None
+		if old is not None and old.mtime == new.mtime:
+			# nothing was added, removed or renamed, but files might have been changed in place:
+			entries = _statKnownEntries(dirPath, old)
+		if entries is None:
+			try:
+				entries = _listEntries(dirPath)
+			except OSError as e:
+				# e.g. the directory was deleted after its parent has been listed. Its parent will be listed again next time.
+				logDebug(e)
+				if old is not None:
+					new.files, new.dirs = old.files, old.dirs
+				new.mtime = -1
+				continue
+		files, dirs = entries
+		new.files = files
+		oldFiles = old.files if old is not None else {}
+		oldDirs = old.dirs if old is not None else {}
+		if diff is not None:
+			for name, state in files.items():
+				oldState = oldFiles.get(name)
+				if oldState is None:
+					diff.created.append((os.path.join(dirPath, name), False, (state[2], state[1])))
+				elif oldState[:2] != state[:2]:
+					diff.modified.append(os.path.join(dirPath, name))
+			for name, oldState in oldFiles.items():
+				if name not in files:
+					diff.deleted.append((os.path.join(dirPath, name), False, (oldState[2], oldState[1])))
+			for name, oldSubDir in oldDirs.items():
+				if name not in dirs:
+					diff.deleted.append((os.path.join(dirPath, name), True, (oldSubDir.inode, 0)))
+		for name, (mtime, inode) in dirs.items():
+			subPath = os.path.join(dirPath, name)
+			oldSubDir = oldDirs.get(name)
+			subDiff = diff
+			if oldSubDir is None and diff is not None:
+				diff.created.append((subPath, True, (inode, 0)))
+				subDiff = None
+			subDir = new.dirs[name] = _DirSnapshot(mtime, inode)
+			toScan.append((subPath, oldSubDir, subDir, subDiff))
+	return result
+
+
+class _PollingEmitter(EventEmitter):
+	"""
+	Detects changes by comparing a snapshot of the watched path with the previous one every `timeout` seconds.
+	A directory is only listed again, if its modification time has changed. Otherwise, only the entries it contained
+	before are stat'ed, because modifying a file in place does not touch the mtime of its directory.
+	Paths that were deleted and created with the same inode (and size) during the same interval are reported as moved.
+	"""
+
+	def __init__(self, event_queue, watch, timeout=DEFAULT_POLLING_INTERVAL, **kwargs):
+		super().__init__(event_queue, watch, timeout, **kwargs)
+		self._snapshot: Union[_DirSnapshot, _FileState, None] = None
+
+	def on_thread_start(self):
+		self._snapshot = self._takeSnapshot(None, None)
+
+	def queue_events(self, timeout):
+		if self.stopped_event.wait(timeout):
+			return
+		diff = _SnapshotDiff()
+		self._snapshot = self._takeSnapshot(self._snapshot, diff)
+		for event in diff.events():
+			self.queue_event(event)
+
+	def _takeSnapshot(self, old: Union[_DirSnapshot, _FileState, None], diff: Optional[_SnapshotDiff]) -> Union[_DirSnapshot, _FileState, None]:
+		path = self.watch.path
+		try:
+			st = os.stat(path)
+		except OSError:
+			st = None
+		isDir = st is not None and stat.S_ISDIR(st.st_mode)
+		if diff is not None:
+			wasDir = isinstance(old, _DirSnapshot)
+			if old is not None and (st is None or isDir != wasDir):
+				diff.deleted.append((path, wasDir, (0, 0)))
+				old = None
+			if old is None and st is not None:
+				diff.created.append((path, isDir, (0, 0)))
+				diff = None
+		if st is None:
+			return None
+		if isDir:
+			return _scanDirectory(path, st, old, diff)
+		state = (st.st_mtime_ns, st.st_size, st.st_ino)
+		if diff is not None and old[:2] != state[:2]:
+			diff.modified.append(path)
+		return state
+
+
+class PollingObserver(BaseObserver):
+	"""
+	An observer that does not need any support by the operating system. Used for network drives, which often don't
+	send any notifications, and when the operating system runs out of watches.
+	"""
+
+	def __init__(self, interval: float = DEFAULT_POLLING_INTERVAL):
+		super().__init__(emitter_class=_PollingEmitter, timeout=interval)
+
+	@property
+	def interval(self) -> float:
+		"""in seconds"""
+		return self.timeout
+
+	@interval.setter
+	def interval(self, value: float) -> None:
+		with self._lock:
+			self._timeout = value
+			for emitter in self._emitters:
+				emitter._timeout = value
+
+
 class FilesystemObserver:
 	def __init__(self):
 		self.__observer = Observer()
+		self.__pollingObserver: Optional[PollingObserver] = None
+		self._observerByPath: dict[str, BaseObserver] = {}
+		self._isNativeWatchLimitReached: bool = False
+		self._isStarted: bool = False
 		self._handlers: _Watches = _Watches()
 		self._lock = threading.RLock()
 
+	@property
+	def lock(self) -> threading.RLock:
+		"""guards all modifications of the project index that are caused by file system events."""
+		return self._lock
+
 	def _getKey(self, path: str) -> str:
 		return os.path.normpath(path)
 
@@ -68,6 +426,19 @@ class FilesystemObserver:
 		with self._lock:
 			self._unschedule(handlerId, self._getKey(path))
 
+	@contextmanager
+	def holdEvents(self) -> Iterator[None]:
+		"""holds back the changes of all CoalescingEventHandlers while the context is active (see CoalescingEventHandler.hold())."""
+		with self._lock:
+			handlers = [handler for handler in self._handlers.allHandlers() if isinstance(handler, CoalescingEventHandler)]
+		for handler in handlers:
+			handler.hold()
+		try:
+			yield
+		finally:
+			for handler in handlers:
+				handler.release()
+
 	def _reschedule(self, handlerId: str, oldPath: str, newPath: str, handler: FileSystemEventHandler):
 		if oldPath != newPath:
 			self._unschedule(handlerId, oldPath)
@@ -85,40 +456,92 @@ class FilesystemObserver:
 
 	def _schedule(self, handlerId: str, path: str, handler: FileSystemEventHandler):
 		self._handlers.set(handlerId, path, handler)
-		if not self.__observer._handlers.get(ObservedWatch(path, True), None):
+		if path not in self._observerByPath:
+			event_handler = _CombinedEventHandler(path, self._handlers)
 			try:
-				event_handler = _CombinedEventHandler(path, self._handlers)
-				self.__observer.schedule(event_handler, path, True)
+				if getApplicationSettings().documents.fileWatcherAlwaysPoll or self._isNativeWatchLimitReached:
+					self._schedulePolling(event_handler, path)
+				else:
+					self._scheduleNative(event_handler, path)
 			except FileNotFoundError as e:
 				logDebug(e)
 			except OSError as e:
 				logInfo(e)
 
+	def _scheduleNative(self, event_handler: FileSystemEventHandler, path: str):
+		try:
+			self.__observer.schedule(event_handler, path, True)
+		except OSError as e:
+			self.__observer._handlers.pop(ObservedWatch(path, True), None)  # watchdog keeps the handler, even if scheduling failed.
+			if e.errno not in _WATCH_LIMIT_ERRNOS:
+				raise
+			self._isNativeWatchLimitReached = True
+			logWarning(f"The operating system ran out of file watches ({e}). Polling '{path}' and all folders opened afterwards for changes instead.")
+			self._schedulePolling(event_handler, path)
+		else:
+			self._observerByPath[path] = self.__observer
+
+	def _schedulePolling(self, event_handler: FileSystemEventHandler, path: str):
+		if not os.path.exists(path):
+			raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), path)
+		interval = getApplicationSettings().documents.fileWatcherPollingInterval
+		if self.__pollingObserver is None:
+			self.__pollingObserver = PollingObserver(interval)
+			if self._isStarted:
+				self.__pollingObserver.start()
+		else:
+			self.__pollingObserver.interval = interval
+		self.__pollingObserver.schedule(event_handler, path, True)
+		self._observerByPath[path] = self.__pollingObserver
+
 	def _unschedule(self, handlerId: str, path: str):
 		handler = self._handlers.pop(handlerId, path)
+		if isinstance(handler, CoalescingEventHandler):
+			handler.discardPending()
 		if handler is not None:
 			if not self._handlers.getByPath(path):
-				observedWatch = ObservedWatch(path, True)
-				if observedWatch in self.__observer._emitter_for_watch:
-					self.__observer.unschedule(observedWatch)
-				self.__observer._handlers.pop(observedWatch, None)  # safety net, necessary when path was invalid while scheduling.
+				observer = self._observerByPath.pop(path, None)
+				if observer is not None:
+					observedWatch = ObservedWatch(path, True)
+					if observedWatch in observer._emitter_for_watch:
+						observer.unschedule(observedWatch)
+					observer._handlers.pop(observedWatch, None)  # safety net
+
+	def isPolled(self, path: str) -> bool:
+		""":return: True, if changes of path are detected by polling instead of notifications of the operating system."""
+		with self._lock:
+			observer = self._observerByPath.get(self._getKey(path))
+			return observer is not None and observer is self.__pollingObserver
+
+	def _observers(self) -> list[BaseObserver]:
+		return [self.__observer] if self.__pollingObserver is None else [self.__observer, self.__pollingObserver]
 
 	def __del__(self):
 		with self._lock:
-			if self.__observer.is_alive():
-				self.__observer.stop()
+			for observer in self._observers():
+				if observer.is_alive():
+					observer.stop()
 
 	def __enter__(self):
 		with self._lock:
-			self.__observer.start()
+			self._isStarted = True
+			for observer in self._observers():
+				observer.start()
 
 	def __exit__(self, exc_type, exc_val, exc_tb):
 		with self._lock:
-			self.__observer.stop()
+			self._isStarted = False
+			for observer in self._observers():
+				observer.stop()
 
 
 FILESYSTEM_OBSERVER: FilesystemObserver = FilesystemObserver()  # only one observer per application!
 
 __all__ = [
+	'ChangeKind',
+	'PendingChanges',
+	'CoalescingEventHandler',
+	'DEFAULT_POLLING_INTERVAL',
+	'PollingObserver',
 	'FILESYSTEM_OBSERVER'
 ]
\ No newline at end of file
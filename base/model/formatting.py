@@ -0,0 +1,143 @@
+"""
+Formatting of documents. Formatters are registered per language and work directly on the syntax tree (and the text it
+was parsed from), so comments and the original spelling of values can be kept.
+"""
+from __future__ import annotations
+
+import difflib
+import os
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from base.model.applicationSettings import getApplicationSettings
+from base.model.documents import IndentationSettings, ParsedDocument, loadDocument
+from base.model.parsing.bytesUtils import bytesToStr
+from base.model.parsing.tree import Node
+from base.model.pathUtils import ArchiveFilePool, FilePathTpl, toDisplayPath
+from base.model.session import getSession
+from base.model.utils import LanguageId
+from cat.utils.collections_ import AddToDictDecorator
+
+
+@dataclass(frozen=True)
+class FormatOptions:
+	indentation: IndentationSettings
+	lineWidth: int = 80
+	sortKeys: bool = True
+
+	@property
+	def indent(self) -> bytes:
+		return b' ' * self.indentation.tabWidth if self.indentation.useSpaces else b'\t'
+
+	@classmethod
+	def forDocument(cls, document: ParsedDocument) -> FormatOptions:
+		settings = getApplicationSettings().documents
+		return cls(document.indentationSettings, settings.formatLineWidth, settings.formatSortKeys)
+
+
+Formatter = Callable[[Node, bytes, FormatOptions], bytes]
+"""(tree, text, options) -> formattedText. tree must have been parsed from text without any errors."""
+
+_formatters: dict[LanguageId, Formatter] = {}
+formatter = AddToDictDecorator(_formatters)
+"""registers a Formatter for a language, e.g. `@formatter(JSON_ID)`"""
+
+
+def getFormatter(language: LanguageId) -> Optional[Formatter]:
+	return _formatters.get(language)
+
+
+def canFormat(document: ParsedDocument) -> bool:
+	return isinstance(document, ParsedDocument) and getFormatter(LanguageId(document.language)) is not None
+
+
+def formatText(document: ParsedDocument) -> Optional[bytes]:
+	"""
+	:return: the formatted content of document, or None if it cannot be formatted (no formatter for its language, or it
+	has syntax errors).
+	"""
+	if (formatter_ := getFormatter(LanguageId(document.language))) is None:
+		return None
+	# parse again, because the tree of an opened document can be behind its content:
+	content = document.content
+	tree, errors = document.parse(content)
+	if tree is None or any(error.style == 'error' for error in errors):
+		return None
+	return formatter_(tree, content, FormatOptions.forDocument(document))
+
+
+def formatDocument(document: ParsedDocument) -> bool:
+	"""
+	formats an opened document. The change can be undone like any other edit.
+	:return: True, if the document could be formatted.
+	"""
+	formatted = formatText(document)
+	if formatted is None:
+		return False
+	if formatted != document.content:
+		document.content = formatted
+		document.asyncParseNValidate()
+	return True
+
+
+def formatFile(filePath: FilePathTpl, archiveFilePool: ArchiveFilePool) -> Optional[bool]:  # throws OSError
+	"""
+	formats a file of the project. Opened documents are formatted in the editor (and not saved), all other files are
+	written to disk directly.
+	:return: True, if the file has been changed, False if it already was formatted, None if it cannot be formatted.
+	"""
+	if (document := getSession().documents.getDocument(filePath)) is not None:
+		oldContent = document.content
+		if not isinstance(document, ParsedDocument) or not formatDocument(document):
+			return None
+		return document.content != oldContent
+
+	if not os.path.isdir(filePath[0]):
+		return None  # files inside of archives are never changed.
+	document = loadDocument(filePath, archiveFilePool, observeFileSystem=False)
+	if not isinstance(document, ParsedDocument) or (formatted := formatText(document)) is None:
+		return None
+	if formatted == document.content:
+		return False
+	document.content = formatted
+	document.saveToFile()
+	return True
+
+
+def previewFormatFile(filePath: FilePathTpl, archiveFilePool: ArchiveFilePool) -> Optional[tuple[bytes, bytes]]:  # throws OSError
+	"""
+	like formatFile(...), but neither the file nor an opened document is changed.
+	:return: (oldContent, formattedContent), or None if the file cannot be formatted.
+	"""
+	if (document := getSession().documents.getDocument(filePath)) is None:
+		if not os.path.isdir(filePath[0]):
+			return None
+		document = loadDocument(filePath, archiveFilePool, observeFileSystem=False)
+	if not isinstance(document, ParsedDocument) or (formatted := formatText(document)) is None:
+		return None
+	return document.content, formatted
+
+
+def formatDiff(filePath: FilePathTpl, oldContent: bytes, newContent: bytes) -> str:
+	""":return: the changes between oldContent and newContent as a unified diff."""
+	displayPath = toDisplayPath(filePath)
+	return ''.join(difflib.unified_diff(
+		bytesToStr(oldContent).splitlines(keepends=True),
+		bytesToStr(newContent).splitlines(keepends=True),
+		fromfile=displayPath,
+		tofile=displayPath,
+	))
+
+
+__all__ = [
+	'FormatOptions',
+	'Formatter',
+	'formatter',
+	'getFormatter',
+	'canFormat',
+	'formatText',
+	'formatDocument',
+	'formatFile',
+	'previewFormatFile',
+	'formatDiff',
+]
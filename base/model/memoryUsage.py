@@ -0,0 +1,248 @@
+"""
+Estimates how much memory the big data structures of DPE retain (syntax trees, undo stacks, indices, schemas, ...).
+
+Subsystems register a MemoryProvider which returns the objects they own. The size of each object is estimated by walking
+everything reachable from it with sys.getsizeof(...). Huge containers are only sampled, and objects that belong to
+another subsystem (e.g. the schemas referenced by a syntax tree) can be excluded. Optionally, the allocations recorded by
+tracemalloc can be grouped by the package that made them.
+"""
+from __future__ import annotations
+
+import json
+import os
+import sys
+import tracemalloc
+from collections import defaultdict, deque
+from dataclasses import asdict, dataclass, field
+from types import BuiltinFunctionType, FunctionType, MethodType, ModuleType
+from typing import Any, Callable, Iterable, NamedTuple, Optional
+from weakref import ReferenceType
+
+from base.model.parsing.tree import Schema
+from cat.utils.collections_ import AddToDictDecorator
+
+_SAMPLE_THRESHOLD: int = 2000
+"""containers with more items than this are sampled."""
+_SAMPLE_SIZE: int = 200
+
+_NOT_WALKED_TYPES: tuple[type, ...] = (type, ModuleType, FunctionType, BuiltinFunctionType, MethodType, ReferenceType)
+_ATOMIC_TYPES: tuple[type, ...] = (str, bytes, bytearray, int, float, complex, bool, type(None), range)
+
+
+class MemoryRoot(NamedTuple):
+	name: str
+	obj: Any
+	shared: tuple[type, ...] = ()
+	"""instances of these types belong to another subsystem and are not counted."""
+
+
+MemoryProvider = Callable[[], Iterable[MemoryRoot]]
+
+_memoryProviders: dict[str, MemoryProvider] = {}
+memoryProvider = AddToDictDecorator(_memoryProviders)
+"""registers a MemoryProvider for a subsystem, e.g. `@memoryProvider('documents')`"""
+
+
+@dataclass
+class SizeEstimate:
+	size: int = 0
+	"""in bytes"""
+	objectCount: int = 0
+	isSampled: bool = False
+
+
+def _referents(obj: Any) -> Iterable[Any]:
+	if isinstance(obj, dict):
+		yield from obj.keys()
+		yield from obj.values()
+		return
+	if isinstance(obj, (list, tuple, set, frozenset, deque)):
+		yield from obj
+		return
+	if (objDict := getattr(obj, '__dict__', None)) is not None and isinstance(objDict, dict):
+		yield objDict
+	for cls in type(obj).__mro__:
+		for slot in cls.__dict__.get('__slots__', ()):
+			if slot not in ('__dict__', '__weakref__') and (value := getattr(obj, slot, None)) is not None:
+				yield value
+
+
+def deepSizeOf(
+		obj: Any,
+		*,
+		shared: tuple[type, ...] = (),
+		sampleThreshold: int = _SAMPLE_THRESHOLD,
+		sampleSize: int = _SAMPLE_SIZE
+) -> SizeEstimate:
+	"""
+	estimates the size of obj and everything reachable from it. Every object is counted only once. Of containers with
+	more than sampleThreshold items only sampleSize items are walked, and their sizes are extrapolated.
+	"""
+	result = SizeEstimate()
+	seen: set[int] = set()
+	size = 0.
+	count = 0.
+	# (object, weight) pairs. weight > 1 for items of sampled containers:
+	toVisit: list[tuple[Any, float]] = [(obj, 1.)]
+	while toVisit:
+		current, weight = toVisit.pop()
+		if id(current) in seen:
+			continue
+		seen.add(id(current))
+		if isinstance(current, _NOT_WALKED_TYPES) or (current is not obj and shared and isinstance(current, shared)):
+			continue
+		size += sys.getsizeof(current, 0) * weight
+		count += weight
+		if isinstance(current, _ATOMIC_TYPES):
+			continue
+		referents = _referents(current)
+		if isinstance(current, (dict, list, tuple, set, frozenset, deque)) and (length := len(current)) > sampleThreshold:
+			referents = list(referents)
+			step = max(1, len(referents) // sampleSize)
+			referents = referents[::step]
+			weight *= length * (2 if isinstance(current, dict) else 1) / len(referents)
+			result.isSampled = True
+		toVisit.extend((referent, weight) for referent in referents)
+	result.size = int(size)
+	result.objectCount = int(count)
+	return result
+
+
+@dataclass
+class MemoryEntry:
+	subsystem: str
+	name: str
+	size: int
+	objectCount: int
+	isEstimate: bool
+	"""True, if parts of the structure have been sampled."""
+
+
+@dataclass
+class MemoryReport:
+	entries: list[MemoryEntry] = field(default_factory=list)
+	allocationsByPackage: Optional[dict[str, int]] = None
+	"""bytes currently allocated per package, if allocations are traced (see startTracingAllocations())."""
+
+	def sizeBySubsystem(self) -> dict[str, int]:
+		result: dict[str, int] = defaultdict(int)
+		for entry in self.entries:
+			result[entry.subsystem] += entry.size
+		return dict(result)
+
+	def toJson(self) -> dict[str, Any]:
+		return dict(
+			subsystems=self.sizeBySubsystem(),
+			entries=[asdict(entry) for entry in self.entries],
+			allocationsByPackage=self.allocationsByPackage,
+		)
+
+
+def startTracingAllocations(frames: int = 1) -> None:
+	"""starts tracemalloc. This makes DPE noticeably slower and should only be used for debugging."""
+	if not tracemalloc.is_tracing():
+		tracemalloc.start(frames)
+
+
+def stopTracingAllocations() -> None:
+	tracemalloc.stop()
+
+
+def isTracingAllocations() -> bool:
+	return tracemalloc.is_tracing()
+
+
+_SOURCE_ROOT: str = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_PLUGIN_DIRS: tuple[str, ...] = ('corePlugins', 'plugins')
+
+
+def _packageForFile(fileName: str) -> str:
+	fileName = os.path.abspath(fileName)
+	if fileName.startswith(_SOURCE_ROOT + os.sep):
+		parts = os.path.relpath(fileName, _SOURCE_ROOT).split(os.sep)
+		if parts[0] in _PLUGIN_DIRS and len(parts) > 2:
+			return f'{parts[0]}/{parts[1]}'
+		return parts[0] if len(parts) > 1 else parts[0].removesuffix('.py')
+	parts = fileName.split(os.sep)
+	if 'site-packages' in parts and (index := parts.index('site-packages')) + 1 < len(parts):
+		return parts[index + 1].removesuffix('.py')
+	return '<python>'
+
+
+def allocationsByPackage(snapshot: Optional[tracemalloc.Snapshot] = None) -> dict[str, int]:
+	""":return: the bytes allocated per package, largest first. The package of plugins is e.g. 'corePlugins/json'."""
+	if snapshot is None:
+		snapshot = tracemalloc.take_snapshot()
+	result: dict[str, int] = defaultdict(int)
+	for stat in snapshot.statistics('filename'):
+		result[_packageForFile(stat.traceback[0].filename)] += stat.size
+	return dict(sorted(result.items(), key=lambda item: item[1], reverse=True))
+
+
+def buildMemoryReport(subsystems: Optional[Iterable[str]] = None) -> MemoryReport:
+	""":param subsystems: the subsystems to measure. All registered subsystems are measured, if None."""
+	report = MemoryReport()
+	for subsystem in (subsystems if subsystems is not None else _memoryProviders):
+		for root in _memoryProviders[subsystem]():
+			estimate = deepSizeOf(root.obj, shared=root.shared)
+			report.entries.append(MemoryEntry(subsystem, root.name, estimate.size, estimate.objectCount, estimate.isSampled))
+	if isTracingAllocations():
+		report.allocationsByPackage = allocationsByPackage()
+	return report
+
+
+def writeMemoryReport(filePath: str, subsystems: Optional[Iterable[str]] = None) -> MemoryReport:  # throws OSError
+	report = buildMemoryReport(subsystems)
+	with open(filePath, 'w', encoding='utf-8') as f:
+		json.dump(report.toJson(), f, indent=2)
+	return report
+
+
+@memoryProvider('documents')
+def _documentTrees() -> Iterable[MemoryRoot]:
+	from base.model.session import getSession
+	for document in getSession().documents.allOpenedDocuments():
+		# document.tree would parse released trees again:
+		if document.hasTree:
+			yield MemoryRoot(document.fileName, document._tree, (Schema,))
+
+
+@memoryProvider('undo')
+def _undoStacks() -> Iterable[MemoryRoot]:
+	from base.model.session import getSession
+	for document in getSession().documents.allOpenedDocuments():
+		if document.undoRedoStack is not None:
+			# the stack references the document itself, which is not part of the undo history:
+			yield MemoryRoot(document.fileName, document.undoRedoStack, (type(document),))
+
+
+@memoryProvider('index')
+def _indices() -> Iterable[MemoryRoot]:
+	from base.model.project.project import Root
+	from base.model.session import getSession
+	for root in getSession().project.allRoots:
+		yield MemoryRoot(root.name, root.indexBundles, (Root, Schema))
+
+
+@memoryProvider('schemas')
+def _schemas() -> Iterable[MemoryRoot]:
+	from base.model.parsing.schemaStore import GLOBAL_SCHEMA_STORE
+	for language, store in GLOBAL_SCHEMA_STORE._schemaStores.items():
+		yield MemoryRoot(language, store)
+
+
+__all__ = [
+	'MemoryRoot',
+	'MemoryProvider',
+	'memoryProvider',
+	'SizeEstimate',
+	'deepSizeOf',
+	'MemoryEntry',
+	'MemoryReport',
+	'startTracingAllocations',
+	'stopTracingAllocations',
+	'isTracingAllocations',
+	'allocationsByPackage',
+	'buildMemoryReport',
+	'writeMemoryReport',
+]
@@ -10,6 +10,7 @@ from cat.utils.logging_ import logWarning
 from base.model.parsing.parser import ParserBase, parse, IndexMapper
 from base.model.parsing.tree import Node, Schema
 from base.model.pathUtils import FilePath
+from base.model.tracing import TRACE_PARSE, TRACE_VALIDATE, traced
 from base.model.utils import LanguageId, MDStr, MessageLike, SemanticsError, Span, Position, GeneralError, formatAsError
 
 _TNode = TypeVar('_TNode', bound=Node)
@@ -251,6 +252,7 @@ def prepareTree(node: Node, text: bytes, filePath: FilePath, errorsIO: list[Gene
 		ctxProvider.prepareTree(filePath, errorsIO)
 
 
+@traced(TRACE_PARSE, file=lambda text, *, filePath, **kwargs: filePath)
 def parseNPrepare(
 		text: bytes,
 		*,
@@ -281,6 +283,7 @@ def parseNPrepare(
 	return node, errors, parser
 
 
+@traced(TRACE_VALIDATE)
 def validateTree(node: Node, text: bytes, errorsIO: list[GeneralError]) -> None:
 	if (ctxProvider := getContextProvider(node, text)) is not None:
 		ctxProvider.validateTree(errorsIO)
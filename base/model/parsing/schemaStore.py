@@ -1,6 +1,7 @@
+import threading
 from collections import defaultdict
 from dataclasses import dataclass, field
-from typing import Optional, TypeVar, Type, Generic, Mapping, overload
+from typing import Callable, Iterator, NamedTuple, Optional, TypeVar, Type, Generic, Mapping, overload
 
 from base.model.parsing.tree import Schema
 from base.model.utils import LanguageId
@@ -8,21 +9,59 @@ from base.model.utils import LanguageId
 
 _TSchema = TypeVar('_TSchema', bound=Schema)
 
+SchemaFactory = Callable[[], Optional[_TSchema]]
+
+
+class LazySchema(NamedTuple):
+	"""
+	A schema that is only built when it is requested for the first time.
+	Allows plugins to register expensive schemas without importing or building them at startup.
+	"""
+	language: LanguageId
+	factory: SchemaFactory
+
 
 @dataclass(frozen=True)
 class SchemaStore(Generic[_TSchema]):
 	# _registeredSchemas: dict[str, dict[str, _TSchema]] = field(default_factory=lambda: defaultdict(dict))
 	_registeredSchemas2: dict[str, _TSchema] = field(default_factory=dict)
+	_schemaFactories: dict[str, SchemaFactory[_TSchema]] = field(default_factory=dict)
+	_lock: threading.RLock = field(default_factory=threading.RLock, repr=False, compare=False)
+	"""held while a schema is built or the store is modified. Reentrant, because a factory might request other schemas."""
 
 	def get(self, name: str) -> Optional[_TSchema]:
 		# ns, _, name = name.rpartition(':')
 		# return self._registeredSchemas.get(ns, {}).get(name)
+		schema = self._registeredSchemas2.get(name)
+		if schema is None and name in self._schemaFactories:
+			with self._lock:
+				# another thread might have built it in the meantime:
+				schema = self._registeredSchemas2.get(name)
+				if schema is None and (factory := self._schemaFactories.get(name)) is not None:
+					schema = factory()  # if this raises, the factory is kept, so the schema can be requested again.
+					if schema is not None:
+						self._registeredSchemas2[name] = schema
+					# factories that return None will never build a schema, so their name is dropped as well:
+					if self._schemaFactories.get(name) is factory:
+						del self._schemaFactories[name]
+		return schema
+
+	def getIfBuilt(self, name: str) -> Optional[_TSchema]:
+		""":return: the schema, if it is registered and has already been built. Never calls a factory."""
 		return self._registeredSchemas2.get(name)
 
 	def registerSchema(self, name: str, schema: _TSchema):
 		# ns, _, name = name.rpartition(':')
 		# self._registeredSchemas[ns][name] = schema
-		self._registeredSchemas2[name] = schema
+		with self._lock:
+			self._registeredSchemas2[name] = schema
+			self._schemaFactories.pop(name, None)
+
+	def registerSchemaFactory(self, name: str, factory: SchemaFactory[_TSchema]):
+		"""registers a schema, that will be built by calling factory when it's requested for the first time."""
+		with self._lock:
+			self._registeredSchemas2.pop(name, None)
+			self._schemaFactories[name] = factory
 
 	def unregisterSchema(self, name: str):
 		# ns, _, name = name.rpartition(':')
@@ -31,11 +70,39 @@ class SchemaStore(Generic[_TSchema]):
 		# 	byName.pop(name, None)
 		# 	if not byName:
 		# 		self._registeredSchemas.pop(ns)
-		self._registeredSchemas2.pop(name, None)
+		# an unbuilt factory is simply dropped:
+		with self._lock:
+			self._registeredSchemas2.pop(name, None)
+			self._schemaFactories.pop(name, None)
 
 	# def unregisterNamespace(self, ns: str):
 	# 	self._registeredSchemas.pop(ns, None)
 
+	def allNames(self) -> list[str]:
+		# copied without the lock, so listing the names doesn't wait for a schema that is being built:
+		registered = list(self._registeredSchemas2)
+		factories = list(self._schemaFactories)
+		return [*registered, *(n for n in factories if n not in self._registeredSchemas2)]
+
+
+class _SchemaStoreView(Mapping[str, _TSchema], Generic[_TSchema]):
+	"""a read-only view of a SchemaStore. Lazy schemas are only built when they are accessed."""
+	__slots__ = ('_store',)
+
+	def __init__(self, store: SchemaStore[_TSchema]):
+		self._store: SchemaStore[_TSchema] = store
+
+	def __getitem__(self, name: str) -> _TSchema:
+		if (schema := self._store.get(name)) is None:
+			raise KeyError(name)
+		return schema
+
+	def __len__(self) -> int:
+		return len(self._store.allNames())
+
+	def __iter__(self) -> Iterator[str]:
+		return iter(self._store.allNames())
+
 
 @dataclass(frozen=True)
 class GlobalSchemaStore:
@@ -53,12 +120,23 @@ class GlobalSchemaStore:
 			language = languageSchemaCls.language
 		return self._schemaStores[language].get(name)
 
+	def getIfBuilt(self, name: str, languageSchemaCls: LanguageId | Type[_TSchema]) -> Optional[Schema]:
+		""":return: the schema, if it is registered and has already been built. Lazy schemas are never built by this."""
+		if isinstance(languageSchemaCls, str):
+			language = languageSchemaCls
+		else:
+			language = languageSchemaCls.language
+		return self._schemaStores[language].getIfBuilt(name)
+
 	def getAllForLanguage(self, language: LanguageId) -> Mapping[str, Schema]:
-		return self._schemaStores[language]._registeredSchemas2
+		return _SchemaStoreView(self._schemaStores[language])
 
 	def registerSchema(self, name: str, schema: Schema):
 		self._schemaStores[schema.language].registerSchema(name, schema)
 
+	def registerLazySchema(self, name: str, lazySchema: LazySchema):
+		self._schemaStores[lazySchema.language].registerSchemaFactory(name, lazySchema.factory)
+
 	def unregisterSchema(self, name: str, languageSchemaCls: LanguageId | Type[_TSchema]):
 		if isinstance(languageSchemaCls, str):
 			language = languageSchemaCls
@@ -73,6 +151,8 @@ class GlobalSchemaStore:
 GLOBAL_SCHEMA_STORE: GlobalSchemaStore = GlobalSchemaStore()
 
 __all__ = [
+	'SchemaFactory',
+	'LazySchema',
 	'SchemaStore',
 	'GlobalSchemaStore',
 	'GLOBAL_SCHEMA_STORE',
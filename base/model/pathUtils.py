@@ -425,6 +425,21 @@ def loadBinaryFile(filePath: FilePath, archiveFilePool: ArchiveFilePool) -> byte
 	return contents
 
 
+def openBinaryFile(filePath: FilePath, archiveFilePool: ArchiveFilePool) -> BufferedIOBase:
+	"""
+	opens a file for reading without loading it completely. The caller is responsible for closing the returned file
+	(best use a ``with`` statement). Useful, if only the beginning of a file is needed.
+	"""
+	if isinstance(filePath, (str, bytes)):
+		# path is a normal file:
+		return open(filePath, 'rb')
+	elif os.path.isdir(filePath[0]):
+		return open(f'{filePath[0]}/{filePath[1]}', 'rb')
+	else:
+		# path contains a .jar file:
+		return archiveFilePool.readFileInArchive(filePath[0], filePath[1])
+
+
 class SearchPath(NamedTuple):
 	path: str
 	divider: str
@@ -443,6 +458,17 @@ def getMTimeForFilePath(filePath: FilePath) -> float:
 	return os.path.getmtime(fullFilePath)
 
 
+def doesFileExist(filePath: FilePath) -> bool:
+	if isinstance(filePath, (str, bytes)):
+		# path is a normal file:
+		return os.path.isfile(filePath)
+	elif os.path.isdir(filePath[0]):
+		return os.path.isfile(f'{filePath[0]}/{filePath[1]}')
+	else:
+		# path contains a .jar file. Archives are not observed, so their contents exist as long as the archive does:
+		return os.path.isfile(filePath[0])
+
+
 __all__ = [
 	'FilePathStr',
 	'FilePathTpl',
@@ -476,6 +502,8 @@ __all__ = [
 	'ZipFilePool',
 	'loadTextFile',
 	'loadBinaryFile',
+	'openBinaryFile',
 	'SearchPath',
 	'getMTimeForFilePath',
+	'doesFileExist',
 ]
\ No newline at end of file
@@ -1,14 +1,25 @@
+"""
+Indices map keys to data and remember the source files every entry came from, so all entries of a file can be discarded
+when it changes.
+
+Indices are versioned: `copy()` creates the next version, which shares everything with the previous one and copies
+entries, per-source dicts and buckets of its containers only when they are modified (copy-on-write). So creating and
+updating a version costs O(√n) for the containers and O(changes) for the entries, not O(n). A version that has been
+copied or published (see `freeze()`) must not be modified anymore, so readers that hold on to it always see a
+consistent state. See `Root.updateIndices()`.
+"""
 from __future__ import annotations
 
+import copy as _copy
 from abc import ABC
+from bisect import bisect_left, insort
 from collections import defaultdict
 from dataclasses import dataclass, field, fields
-from typing import Collection, Generic, TypeVar, Hashable, Iterator, Mapping
+from typing import Collection, Generic, ItemsView, Optional, TypeVar, Hashable, Iterator, Mapping, MutableMapping, ValuesView
 
 from recordclass import as_dataclass
 
 from base.model.pathUtils import FilePathTpl
-from cat.utils import CachedProperty
 
 _TT = TypeVar('_TT')
 _TD = TypeVar('_TD')
@@ -17,6 +28,8 @@ _TK = TypeVar('_TK', bound=Hashable)
 _TV_co = TypeVar('_TV_co', covariant=True)
 _TK_co = TypeVar('_TK_co', bound=Hashable, covariant=True)
 _TCol = TypeVar('_TCol', bound=Collection)
+_TIndexLike = TypeVar('_TIndexLike', bound='IndexLike')
+_TIndexBundle = TypeVar('_TIndexBundle', bound='IndexBundle')
 
 
 @as_dataclass()
@@ -39,40 +52,312 @@ class IndexLike(Mapping[_TK, _TV], Generic[_TK, _TV], ABC):
 	def discardDirectory(self, source: FilePathTpl) -> None:
 		...
 
+	def sourcesInDirectory(self, directory: FilePathTpl) -> list[FilePathTpl]:
+		...
+
 	def clear(self) -> None:
 		...
 
+	def copy(self: _TIndexLike) -> _TIndexLike:
+		""":return: the next version of this index. This index must not be modified afterwards."""
+		...
+
+	def freeze(self) -> None:
+		"""marks this index as published. It must not be modified anymore."""
+		...
+
+
+def _prefixRange(sortedPaths: list[str], prefix: str) -> tuple[int, int]:
+	"""returns the (start, stop) indices of all paths in sortedPaths that start with prefix."""
+	start = bisect_left(sortedPaths, prefix)
+	if not prefix:
+		return start, len(sortedPaths)
+	stop = bisect_left(sortedPaths, prefix[:-1] + chr(ord(prefix[-1]) + 1), start)
+	return start, stop
+
+
+_MIN_BUCKETS: int = 8
+_SORTED_CHUNK_SIZE: int = 512
+"""chunks of a _CowSortedList are split, when they grow larger than twice this size."""
+
+
+class _CowDict(MutableMapping[_TK, _TV], Generic[_TK, _TV]):
+	"""
+	a dict that is split into buckets by the hash of its keys. copy() only copies the list of buckets, a bucket is
+	copied when it is modified for the first time after that. The number of buckets grows with √n, so copying and the
+	first modification of a bucket both cost O(√n).
+	"""
+	__slots__ = ('_buckets', '_owned', '_len')
+
+	def __init__(self):
+		self._buckets: list[dict[_TK, _TV]] = [{} for _ in range(_MIN_BUCKETS)]
+		self._owned: bytearray = bytearray(b'\x01' * _MIN_BUCKETS)
+		"""whether self owns a bucket, or shares it with other versions"""
+		self._len: int = 0
+
+	def copy(self) -> _CowDict[_TK, _TV]:
+		""":return: a copy, that shares all buckets with this dict. Neither of them owns the buckets afterwards."""
+		result = _CowDict.__new__(_CowDict)
+		result._buckets = list(self._buckets)
+		result._owned = bytearray(len(self._buckets))
+		result._len = self._len
+		self._owned = bytearray(len(self._buckets))
+		return result
+
+	def _bucket(self, key: _TK) -> dict[_TK, _TV]:
+		return self._buckets[hash(key) & (len(self._buckets) - 1)]
+
+	def _ownBucket(self, key: _TK) -> dict[_TK, _TV]:
+		idx = hash(key) & (len(self._buckets) - 1)
+		if not self._owned[idx]:
+			self._buckets[idx] = dict(self._buckets[idx])
+			self._owned[idx] = 1
+		return self._buckets[idx]
+
+	def _grow(self) -> None:
+		count = len(self._buckets) * 2
+		buckets: list[dict[_TK, _TV]] = [{} for _ in range(count)]
+		for bucket in self._buckets:
+			for key, value in bucket.items():
+				buckets[hash(key) & (count - 1)][key] = value
+		self._buckets = buckets
+		self._owned = bytearray(b'\x01' * count)
+
+	def __getitem__(self, key: _TK) -> _TV:
+		return self._bucket(key)[key]
+
+	def get(self, key: _TK, default: _TD = None) -> _TV | _TD:
+		return self._bucket(key).get(key, default)
+
+	def __contains__(self, key: _TK) -> bool:
+		return key in self._bucket(key)
+
+	def __setitem__(self, key: _TK, value: _TV) -> None:
+		bucket = self._ownBucket(key)
+		if key not in bucket:
+			self._len += 1
+		bucket[key] = value
+		if self._len > len(self._buckets) ** 2:
+			self._grow()
+
+	def __delitem__(self, key: _TK) -> None:
+		if key not in self._bucket(key):
+			raise KeyError(key)
+		del self._ownBucket(key)[key]
+		self._len -= 1
+
+	def pop(self, key: _TK, default: _TD = ...) -> _TV | _TD:
+		if key not in self._bucket(key):
+			if default is ...:
+				raise KeyError(key)
+			return default
+		self._len -= 1
+		return self._ownBucket(key).pop(key)
+
+	def __len__(self) -> int:
+		return self._len
+
+	def __iter__(self) -> Iterator[_TK]:
+		for bucket in self._buckets:
+			yield from bucket
+
+	def values(self) -> ValuesView[_TV]:
+		return _CowDictValuesView(self)
+
+	def items(self) -> ItemsView[_TK, _TV]:
+		return _CowDictItemsView(self)
+
+	def __repr__(self):
+		return f'{self.__class__.__name__}({dict(self.items())!r})'
+
+
+class _CowDictValuesView(ValuesView[_TV]):
+	def __iter__(self) -> Iterator[_TV]:
+		for bucket in self._mapping._buckets:
+			yield from bucket.values()
+
+
+class _CowDictItemsView(ItemsView[_TK, _TV]):
+	def __iter__(self) -> Iterator[tuple[_TK, _TV]]:
+		for bucket in self._mapping._buckets:
+			yield from bucket.items()
+
+
+class _CowSortedList:
+	"""
+	a sorted list of strings, that is split into chunks. copy() only copies the list of chunks, a chunk is copied when it
+	is modified for the first time after that.
+	"""
+	__slots__ = ('_chunks', '_maxes', '_owned')
+
+	def __init__(self):
+		self._chunks: list[list[str]] = []
+		self._maxes: list[str] = []
+		"""the last (largest) value of every chunk"""
+		self._owned: bytearray = bytearray()
+
+	def copy(self) -> _CowSortedList:
+		""":return: a copy, that shares all chunks with this list. Neither of them owns the chunks afterwards."""
+		result = _CowSortedList.__new__(_CowSortedList)
+		result._chunks = list(self._chunks)
+		result._maxes = list(self._maxes)
+		result._owned = bytearray(len(self._chunks))
+		self._owned = bytearray(len(self._chunks))
+		return result
+
+	def _ownChunk(self, idx: int) -> list[str]:
+		if not self._owned[idx]:
+			self._chunks[idx] = list(self._chunks[idx])
+			self._owned[idx] = 1
+		return self._chunks[idx]
+
+	def add(self, value: str) -> None:
+		if not self._chunks:
+			self._chunks.append([value])
+			self._maxes.append(value)
+			self._owned.append(1)
+			return
+		idx = min(bisect_left(self._maxes, value), len(self._maxes) - 1)
+		chunk = self._ownChunk(idx)
+		insort(chunk, value)
+		self._maxes[idx] = chunk[-1]
+		if len(chunk) > 2 * _SORTED_CHUNK_SIZE:
+			self._chunks[idx:idx + 1] = chunk[:_SORTED_CHUNK_SIZE], chunk[_SORTED_CHUNK_SIZE:]
+			self._maxes[idx:idx + 1] = chunk[_SORTED_CHUNK_SIZE - 1], chunk[-1]
+			self._owned[idx:idx + 1] = b'\x01\x01'
+
+	def discard(self, value: str) -> None:
+		idx = bisect_left(self._maxes, value)
+		if idx == len(self._maxes):
+			return
+		pos = bisect_left(self._chunks[idx], value)
+		if pos == len(self._chunks[idx]) or self._chunks[idx][pos] != value:
+			return
+		chunk = self._ownChunk(idx)
+		del chunk[pos]
+		if chunk:
+			self._maxes[idx] = chunk[-1]
+		else:
+			del self._chunks[idx]
+			del self._maxes[idx]
+			del self._owned[idx]
+
+	def withPrefix(self, prefix: str) -> list[str]:
+		""":return: all values that start with prefix, in order."""
+		result: list[str] = []
+		for idx in range(bisect_left(self._maxes, prefix), len(self._chunks)):
+			chunk = self._chunks[idx]
+			start, stop = _prefixRange(chunk, prefix)
+			result.extend(chunk[start:stop])
+			if stop < len(chunk):
+				break
+		return result
+
+	def __bool__(self) -> bool:
+		return bool(self._chunks)
+
 
 @dataclass
 class Index(IndexLike[_TK, _TV], Generic[_TK, _TV]):
 
-	byId: dict[_TK, IndexEntry[_TK, _TV]] = field(default_factory=dict)
-	bySource: dict[FilePathTpl, dict[_TK, IndexEntry[_TK, _TV]]] = field(default_factory=lambda: defaultdict(dict))
+	byId: _CowDict[_TK, IndexEntry[_TK, _TV]] = field(default_factory=_CowDict)
+	bySource: _CowDict[FilePathTpl, dict[_TK, IndexEntry[_TK, _TV]]] = field(default_factory=_CowDict)
+	_sortedSources: dict[str, _CowSortedList] = field(default_factory=dict, init=False, repr=False, compare=False)
+	"""all sources in bySource, grouped by source[0] and sorted by source[1], so all sources within a directory can be found with a binary search."""
+	_ownedKeys: Optional[set[_TK]] = field(default=None, init=False, repr=False, compare=False)
+	"""the keys of the entries that have been copied by this version. None, if this version owns everything (it is not a copy)."""
+	_ownedSources: Optional[set[FilePathTpl]] = field(default=None, init=False, repr=False, compare=False)
+	_ownedRoots: Optional[set[str]] = field(default=None, init=False, repr=False, compare=False)
+	"""the roots whose list in _sortedSources has been copied by this version."""
+	_isFrozen: bool = field(default=False, init=False, repr=False, compare=False)
+
+	def freeze(self) -> None:
+		self._isFrozen = True
+
+	def copy(self) -> Index[_TK, _TV]:
+		""":return: the next version of this index, that shares all entries with this one until they are modified. This index must not be modified afterwards."""
+		result = Index(self.byId.copy(), self.bySource.copy())
+		result._sortedSources = dict(self._sortedSources)  # one entry per root
+		result._ownedKeys = set()
+		result._ownedSources = set()
+		result._ownedRoots = set()
+		return result
+
+	def _ownEntry(self, entry: IndexEntry[_TK, _TV]) -> IndexEntry[_TK, _TV]:
+		if self._ownedKeys is None or entry.key in self._ownedKeys:
+			return entry
+		entry = IndexEntry(entry.key, entry.data, set(entry.sources))
+		self.byId[entry.key] = entry
+		self._ownedKeys.add(entry.key)
+		for source in entry.sources:
+			self._ownSource(source)[entry.key] = entry
+		return entry
+
+	def _ownSource(self, source: FilePathTpl) -> dict[_TK, IndexEntry[_TK, _TV]]:
+		fromSource = self.bySource.get(source)
+		if fromSource is None:
+			fromSource = self.bySource[source] = {}
+		elif self._ownedSources is not None and source not in self._ownedSources:
+			fromSource = self.bySource[source] = dict(fromSource)
+		else:
+			return fromSource
+		if self._ownedSources is not None:
+			self._ownedSources.add(source)
+		return fromSource
+
+	def _ownSortedSources(self, root: str) -> _CowSortedList:
+		sortedSources = self._sortedSources.get(root)
+		if sortedSources is None:
+			sortedSources = self._sortedSources[root] = _CowSortedList()
+		elif self._ownedRoots is not None and root not in self._ownedRoots:
+			sortedSources = self._sortedSources[root] = sortedSources.copy()
+		else:
+			return sortedSources
+		if self._ownedRoots is not None:
+			self._ownedRoots.add(root)
+		return sortedSources
 
 	def add(self, key: _TK, source: FilePathTpl, data: _TV) -> _TV:
+		assert not self._isFrozen, "a published index must not be modified. Use Root.updateIndices()."
 		entry = self.byId.get(key)
 		if entry is None:
 			entry = IndexEntry(key, data, set())
 			self.byId[key] = entry
+			if self._ownedKeys is not None:
+				self._ownedKeys.add(key)
 		else:
+			entry = self._ownEntry(entry)
 			entry.data = data
 		entry.sources.add(source)
-		self.bySource[source][key] = entry
+		if source not in self.bySource:
+			self._ownSortedSources(source[0]).add(source[1])
+		self._ownSource(source)[key] = entry
 		return entry.data
 
 	def discard(self, key: _TK, source: FilePathTpl) -> None:
+		assert not self._isFrozen, "a published index must not be modified. Use Root.updateIndices()."
 		entry = self.byId.get(key)
 		if entry is not None:
+			entry = self._ownEntry(entry)
 			entry.sources.discard(source)
 			if not entry.sources:
 				del self.byId[key]
 
-		fromSource = self.bySource.get(source)
-		if fromSource is not None:
+		if source in self.bySource:
+			fromSource = self._ownSource(source)
 			entry2 = fromSource.pop(key, None)
 			assert entry2 is entry
 			if not fromSource:
 				del self.bySource[source]
+				self._removeSortedSource(source)
+
+	def _removeSortedSource(self, source: FilePathTpl) -> None:
+		if not self._sortedSources.get(source[0]):
+			return
+		sortedSources = self._ownSortedSources(source[0])
+		sortedSources.discard(source[1])
+		if not sortedSources:
+			del self._sortedSources[source[0]]
 
 	def discardSource(self, source: FilePathTpl) -> None:
 		fromSource = self.bySource.get(source)
@@ -82,14 +367,24 @@ class Index(IndexLike[_TK, _TV], Generic[_TK, _TV]):
 				self.discard(key, source)
 
 	def discardDirectory(self, source: FilePathTpl) -> None:
-		for src, entries in self.bySource.copy().items():
-			if src[0] == source[0] and src[1].startswith(source[1]):
-				for key in entries.copy().keys():
-					self.discard(key, src)
+		for src in self.sourcesInDirectory(source):
+			self.discardSource(src)
+
+	def sourcesInDirectory(self, directory: FilePathTpl) -> list[FilePathTpl]:
+		""":return: all sources, whose path starts with directory[1]. Costs O(log n + size of the subtree)."""
+		sortedSources = self._sortedSources.get(directory[0])
+		if not sortedSources:
+			return []
+		root = directory[0]
+		return [(root, path) for path in sortedSources.withPrefix(directory[1])]
 
 	def clear(self):
-		self.byId.clear()
-		self.bySource.clear()
+		# previous versions might share the containers, so they are replaced instead of cleared:
+		self.byId = _CowDict()
+		self.bySource = _CowDict()
+		self._sortedSources = {}
+		self._ownedKeys = self._ownedSources = self._ownedRoots = None
+		self._isFrozen = False
 
 	def __len__(self):
 		return len(self.byId)
@@ -118,18 +413,35 @@ class Index(IndexLike[_TK, _TV], Generic[_TK, _TV]):
 		return iter(self.byId)
 
 
+_INDEX_FIELD_NAMES: dict[type, tuple[str, ...]] = {}
+
+
+def _getIndexFieldNames(cls: type[IndexBundle]) -> tuple[str, ...]:
+	if (names := _INDEX_FIELD_NAMES.get(cls)) is None:
+		names = _INDEX_FIELD_NAMES[cls] = tuple(
+			f.name for f in fields(cls)
+			if (dpe := f.metadata.get('dpe')) is not None and dpe.get('isIndex')
+		)
+	return names
+
+
 @dataclass
 class IndexBundle(ABC):
 
-	@CachedProperty
+	@property
 	def subIndicesByName(self) -> dict[str, Index | IndexBundle]:
-		indices = {}
-		for f in fields(self):
-			if (dpe := f.metadata.get('dpe')) is None:
-				continue
-			if dpe.get('isIndex'):
-				indices[f.name] = getattr(self, f.name)
-		return indices
+		return {name: getattr(self, name) for name in _getIndexFieldNames(type(self))}
+
+	def copy(self: _TIndexBundle) -> _TIndexBundle:
+		""":return: the next version of this bundle, see IndexLike.copy(). This bundle must not be modified afterwards."""
+		result = _copy.copy(self)
+		for name, idx in self.subIndicesByName.items():
+			setattr(result, name, idx.copy())
+		return result
+
+	def freeze(self) -> None:
+		for idx in self.subIndicesByName.values():
+			idx.freeze()
 
 	def clear(self) -> None:
 		for idx in self.subIndicesByName.values():
@@ -143,29 +455,68 @@ class IndexBundle(ABC):
 		for idx in self.subIndicesByName.values():
 			idx.discardDirectory(source)
 
+	def sourcesInDirectory(self, directory: FilePathTpl) -> list[FilePathTpl]:
+		sources: dict[FilePathTpl, None] = {}  # an ordered set
+		for idx in self.subIndicesByName.values():
+			sources.update(dict.fromkeys(idx.sourcesInDirectory(directory)))
+		return list(sources)
+
 
 @dataclass
 class DeepIndex(IndexLike[tuple[str, _TK], _TV], Generic[_TK, _TV]):
 
 	indices: defaultdict[str, Index[_TK, _TV]] = field(default_factory=lambda: defaultdict(Index))
+	_ownedPaths: Optional[set[str]] = field(default=None, init=False, repr=False, compare=False)
+	"""the paths of the sub-indices that have been copied by this version. None, if this version owns everything (it is not a copy)."""
+	_isFrozen: bool = field(default=False, init=False, repr=False, compare=False)
+
+	def freeze(self) -> None:
+		self._isFrozen = True
+		for index in self.indices.values():
+			index.freeze()
+
+	def copy(self) -> DeepIndex[_TK, _TV]:
+		""":return: the next version of this index. Sub-indices are copied when they are modified. This index must not be modified afterwards."""
+		# there is one sub-index per resource folder (functions, tags/blocks, ...), not per entry, so this copy is cheap:
+		result = DeepIndex(defaultdict(Index, self.indices))
+		result._ownedPaths = set()
+		return result
+
+	def _ownIndex(self, path: str) -> Index[_TK, _TV]:
+		if self._ownedPaths is None or path in self._ownedPaths:
+			return self.indices[path]
+		index = self.indices.get(path)
+		index = self.indices[path] = index.copy() if index is not None else Index()
+		self._ownedPaths.add(path)
+		return index
 
 	def add(self, key: tuple[str, _TK], source: FilePathTpl, data: _TV) -> _TV:
-		return self.indices[key[0]].add(key[1], source, data)
+		return self._ownIndex(key[0]).add(key[1], source, data)
 
 	def discard(self, key: tuple[str, _TK], source: FilePathTpl) -> None:
-		if (index := self.indices.get(key[0])) is not None:
-			index.discard(key[1], source)
+		if key[0] in self.indices:
+			self._ownIndex(key[0]).discard(key[1], source)
 
 	def discardSource(self, source: FilePathTpl) -> None:
-		for index in self.indices.values():
-			index.discardSource(source)
+		for path, index in list(self.indices.items()):
+			if source in index.bySource:
+				self._ownIndex(path).discardSource(source)
 
 	def discardDirectory(self, source: FilePathTpl) -> None:
+		for path, index in list(self.indices.items()):
+			if index.sourcesInDirectory(source):
+				self._ownIndex(path).discardDirectory(source)
+
+	def sourcesInDirectory(self, directory: FilePathTpl) -> list[FilePathTpl]:
+		sources: dict[FilePathTpl, None] = {}  # an ordered set
 		for index in self.indices.values():
-			index.discardDirectory(source)
+			sources.update(dict.fromkeys(index.sourcesInDirectory(directory)))
+		return list(sources)
 
 	def clear(self):
-		self.indices.clear()
+		self.indices = defaultdict(Index)
+		self._ownedPaths = None
+		self._isFrozen = False
 
 	def __len__(self):
 		return sum(map(len, self.indices))
@@ -181,7 +532,13 @@ class DeepIndex(IndexLike[tuple[str, _TK], _TV], Generic[_TK, _TV]):
 		return default
 
 	def getIndex(self, path: str) -> Index[_TK, _TT]:
-		return self.indices[path]
+		if self._isFrozen:
+			if (index := self.indices.get(path)) is None:
+				index = Index()
+				index.freeze()
+			return index
+		# the caller might modify the index:
+		return self._ownIndex(path)
 
 	def __contains__(self, key: tuple[str, _TK]) -> bool:
 		if (index := self.indices.get(key[0])) is not None:
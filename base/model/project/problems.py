@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Optional, Sequence
+
+from recordclass import as_dataclass
+
+from base.model.aspect import AspectType
+from base.model.documents import ErrorCounts, getDocumentTypeForFilePath, getErrorCounts, loadDocument
+from base.model.pathUtils import ArchiveFilePool, FilePathTpl, ZipFilePool, doesFileExist
+from base.model.project.index import Index
+from base.model.project.project import AnalyzeFilesAspectPart, FileChanges, FileEntry, IndexBundleAspect, Project, ProjectAspect, ProjectRoot, Root
+from base.model.session import getSession
+from base.model.utils import GeneralError, WrappedError
+from cat.GUI import propertyDecorators as pd
+from cat.Serializable.serializableDataclasses import catMeta
+from cat.utils import format_full_exc
+from cat.utils.profiling import logError
+from cat.utils.utils import runLaterSafe
+
+
+_VALIDATION_TIME_SLICE: float = 0.05
+"""max. time in seconds spent validating files in the background, before control is given back to the event loop."""
+
+
+@as_dataclass()
+class FileProblems:
+	file: FilePathTpl
+	errors: Sequence[GeneralError]
+	counts: ErrorCounts
+
+
+def checkFile(filePath: FilePathTpl, archiveFilePool: ArchiveFilePool) -> Sequence[GeneralError]:
+	try:
+		document = loadDocument(filePath, archiveFilePool, observeFileSystem=False)
+		if getattr(document, 'schema', 123) is None:
+			# we have no schema, so we can only perform a syntax check.
+			if document.tree is None:
+				document.asyncParse.callNow()
+		else:
+			document.asyncValidate .callNow()
+		errors = document.errors
+		return errors
+	except Exception as e:
+		logError(f"filePath = {filePath!r}")
+		logError(format_full_exc())
+		return [WrappedError(e)]
+
+
+@dataclass
+class ProblemsIndex(IndexBundleAspect):
+	"""
+	The errors of all files of a root that have been validated and have at least one error, warning or hint.
+	Because it is an index bundle, the entries of deleted and changed files are discarded automatically.
+	"""
+	@classmethod
+	def getAspectType(cls) -> AspectType:
+		return AspectType('dpe:problems_index')
+
+	files: Index[str, FileProblems] = field(default_factory=Index, init=False, metadata=dict(dpe=dict(isIndex=True)))
+
+
+@dataclass
+class ProblemsAspect(ProjectAspect):
+	"""
+	A project-wide error store. All files of the project roots are validated in the background (in small time slices on
+	the GUI thread) when a root is analyzed, e.g. when the project is loaded, and again whenever they change on disk.
+	Their errors are kept in the ProblemsIndex of their root, whether they are opened or not.
+	"""
+
+	@classmethod
+	def getAspectType(cls) -> AspectType:
+		return AspectType('dpe:problems')
+
+	def __post_init__(self):
+		self.analyzeFilesPart = AnalyzeFilesProblemsAspectPart(self)
+
+	_pending: dict[FilePathTpl, None] = field(default_factory=dict, init=False, metadata=catMeta(serialize=False, decorators=[pd.NoUI()]))  # an ordered set
+	_pendingLock: threading.Lock = field(default_factory=threading.Lock, init=False, metadata=catMeta(serialize=False, decorators=[pd.NoUI()]))
+	_project: Optional[Project] = field(default=None, init=False, metadata=catMeta(serialize=False, decorators=[pd.NoUI()]))
+
+	def onProjectLoaded(self, project: Project) -> None:
+		self._project = project
+		# the files of the roots have been scheduled while the project was set up:
+		with self._pendingLock:
+			hasPending = bool(self._pending)
+		if hasPending:
+			runLaterSafe(0, self._processPending)
+
+	def onCloseProject(self, project: Project) -> None:
+		with self._pendingLock:
+			self._pending.clear()
+		self._project = None
+
+	def onFilesChanged(self, root: Root, changes: FileChanges, project: Project) -> None:
+		# this is called from the file system observer thread, so the actual work is done by _processPending() on the GUI thread.
+		# files referencing a resource that appeared or disappeared are scheduled by the ReferencesAspect.
+		if changes.deleted or changes.deletedDirectories:
+			runLaterSafe(0, getSession().emitProblemsChanged)  # problems of deleted files have already been discarded.
+		self.scheduleValidation([*changes.created, *changes.modified])
+
+	def scheduleValidation(self, paths: Sequence[FilePathTpl]) -> None:
+		"""schedule files for validation in the background. Thread safe."""
+		paths = [p for p in paths if getDocumentTypeForFilePath(p) is not None and doesFileExist(p)]
+		if not paths:
+			return
+		with self._pendingLock:
+			wasIdle = not self._pending
+			for path in paths:
+				self._pending[path] = None
+		if wasIdle:
+			runLaterSafe(0, self._processPending)
+
+	def _popPending(self) -> Optional[FilePathTpl]:
+		with self._pendingLock:
+			if not self._pending:
+				return None
+			path = next(iter(self._pending))
+			del self._pending[path]
+			return path
+
+	def _processPending(self) -> None:
+		if self._project is None:
+			return
+		endTime = time.perf_counter() + _VALIDATION_TIME_SLICE
+		with ZipFilePool() as pool:
+			while (path := self._popPending()) is not None:
+				if not doesFileExist(path):
+					continue  # deleted while it was pending. Its problems have already been discarded.
+				self.setProblems(path, checkFile(path, pool))
+				if time.perf_counter() > endTime:
+					break
+		with self._pendingLock:
+			hasMore = bool(self._pending)
+		if hasMore:
+			runLaterSafe(0, self._processPending)
+
+	def _getRoot(self, filePath: FilePathTpl) -> Optional[Root]:
+		if self._project is None:
+			return None
+		for root in self._project.roots:
+			if root.normalizedLocation == filePath[0]:
+				return root
+		return None
+
+	def setProblems(self, filePath: FilePathTpl, errors: Sequence[GeneralError]) -> None:
+		root = self._getRoot(filePath)
+		if root is None:
+			return  # not part of the project (anymore)
+		with root.updateIndices() as indexBundles:
+			index = indexBundles.setdefault(ProblemsIndex).files
+			old = index.get(filePath[1])
+			index.discardSource(filePath)
+			if errors:
+				index.add(filePath[1], filePath, FileProblems(filePath, errors, getErrorCounts(errors)))
+		if old is not None or errors:
+			getSession().emitProblemsChanged()
+
+	def getProblems(self, filePath: FilePathTpl) -> Optional[FileProblems]:
+		root = self._getRoot(filePath)
+		if root is None or (index := root.indexBundles.get(ProblemsIndex)) is None:
+			return None
+		return index.files.get(filePath[1])
+
+	def allFileProblems(self) -> list[FileProblems]:
+		if self._project is None:
+			return []
+		# published index versions are never modified, so no lock is needed:
+		return [
+			fileProblems
+			for root in self._project.roots
+			if (index := root.indexBundles.get(ProblemsIndex)) is not None
+			for fileProblems in index.files.values()
+		]
+
+	@property
+	def totalCounts(self) -> ErrorCounts:
+		counts = ErrorCounts()
+		for fileProblems in self.allFileProblems():
+			counts += fileProblems.counts
+		return counts
+
+	@property
+	def pendingCount(self) -> int:
+		return len(self._pending)
+
+
+@dataclass
+class AnalyzeFilesProblemsAspectPart(AnalyzeFilesAspectPart[ProblemsAspect]):
+
+	def analyzeFile(self, root: Root, fileEntry: FileEntry, pool: ArchiveFilePool) -> None:
+		# analyzing a root rebuilds all of its index bundles, including the ProblemsIndex, so its files have to be validated again:
+		if isinstance(root, ProjectRoot):
+			self.aspect.scheduleValidation([fileEntry.fullPath])
+
+
+__all__ = [
+	'FileProblems',
+	'checkFile',
+	'ProblemsIndex',
+	'ProblemsAspect',
+]
@@ -1,16 +1,20 @@
 from __future__ import annotations
 
+import threading
 from abc import ABC, abstractmethod
 from collections import defaultdict
+from contextlib import contextmanager
 from dataclasses import dataclass, field
-from typing import Generic, Optional, Sequence, TypeVar, final
+from itertools import count
+from typing import Generic, Iterator, Optional, Sequence, TypeVar, final
 
 from recordclass import as_dataclass
 
-from base.model.aspect import Aspect, AspectDict, SerializableDataclassWithAspects
+from base.model.aspect import Aspect, AspectDict, AspectType, SerializableDataclassWithAspects
 from base.model.pathUtils import ArchiveFilePool, FilePathStr, FilePathTpl, normalizeDirSeparatorsStr
 from base.model.project.index import IndexBundle
 from base.model.searchUtils import SplitStrs, splitStringForSearch
+from base.model.tracing import TRACE_PROJECT, traceSpan, traced
 from base.model.utils import GeneralError, MDStr, NULL_SPAN, SemanticsError, Span
 from cat.GUI import propertyDecorators as pd
 from cat.Serializable.serializableDataclasses import SerializableDataclass, catMeta
@@ -113,6 +117,22 @@ class ProjectInfoAspectPart(ProjectAspectPart[_TProjectAspect], Generic[_TProjec
 		return [e for es in self._errorsByType.values() for e in es]
 
 
+@dataclass(slots=True)
+class FileChanges:
+	"""
+	A batch of (coalesced) file system changes inside a single root.
+	Files inside a deleted directory are not listed in deleted, only the directory itself is in deletedDirectories.
+	"""
+	created: list[FilePathTpl] = field(default_factory=list)
+	modified: list[FilePathTpl] = field(default_factory=list)
+	deleted: list[FilePathTpl] = field(default_factory=list)
+	deletedDirectories: list[FilePathTpl] = field(default_factory=list)
+
+	@property
+	def hasAddedOrRemovedFiles(self) -> bool:
+		return bool(self.created or self.deleted or self.deletedDirectories)
+
+
 @dataclass
 class ProjectAspect(Aspect, SerializableDataclass, ABC):
 
@@ -134,6 +154,14 @@ class ProjectAspect(Aspect, SerializableDataclass, ABC):
 		"""
 		pass
 
+	def onFilesChanged(self, root: Root, changes: FileChanges, project: Project) -> None:
+		"""
+		always enabled.
+		Called after a batch of file system changes inside root has been applied to the index bundles of root.
+		Might be called from a non-GUI thread.
+		"""
+		pass
+
 
 @dataclass
 class Project(SerializableDataclassWithAspects[ProjectAspect], ABC):
@@ -177,6 +205,11 @@ class Project(SerializableDataclassWithAspects[ProjectAspect], ABC):
 	def allRoots(self) -> list[Root]:
 		return self.roots + self.deepDependencies
 
+	@property
+	def indexGenerations(self) -> tuple[int, ...]:
+		"""the indexGeneration of all roots. Changes whenever any index of the project changes, so it can be used as a cache key."""
+		return tuple(root.indexGeneration for root in self.allRoots)
+
 	def getAllProjectErrors(self) -> Sequence[GeneralError]:
 		return [e for a in self.aspects if a.projectInfoPart is not None for e in a.projectInfoPart.getCurrentErrors()] + self.dependencyProblems
 
@@ -218,11 +251,13 @@ class Project(SerializableDataclassWithAspects[ProjectAspect], ABC):
 	def analyzeRoot(self, root: Root, aspects: list[AnalyzeRootsAspectPart] = ...):
 		if aspects is ...:
 			aspects = [a.analyzeRootsPart for a in self.aspects if a.analyzeRootsPart is not None]
-		for idxBundle in root.indexBundles:
-			idxBundle.clear()
-		for a in aspects:
-			a.analyzeRoot(root, self)
+		with traceSpan('Project.analyzeRoot', TRACE_PROJECT, root=root.name), root.updateIndices() as indexBundles:
+			for idxBundle in indexBundles:
+				idxBundle.clear()
+			for a in aspects:
+				a.analyzeRoot(root, self)
 
+	@traced(TRACE_PROJECT)
 	def setup(self):
 		""" only call once!"""
 		_fillProjectAspects(self.aspects)
@@ -249,6 +284,7 @@ class Project(SerializableDataclassWithAspects[ProjectAspect], ABC):
 def resolveDependencies(project: Project, aspects: list[DependenciesAspectPart]) -> tuple[list[Root], list[GeneralError]]:
 	# just a cache:
 	dependencyDict: dict[str, Optional[Root]] = {rt.identifier: rt for rt in project.roots}
+	resolutionInfos: dict[str, Optional[str]] = {}
 	# seenDependencies: set[str] = set()
 	errorsByRoot: dict[str, list[GeneralError]] = defaultdict(list)
 
@@ -265,8 +301,10 @@ def resolveDependencies(project: Project, aspects: list[DependenciesAspectPart])
 				root.dependencies.append(dep)
 				if dep.identifier not in dependencyDict:
 					dep.resolved = aspect.resolveDependency(dep)
+					resolutionInfos[dep.identifier] = dep.resolutionInfo
 				else:
 					dep.resolved = dependencyDict[dep.identifier]
+					dep.resolutionInfo = resolutionInfos.get(dep.identifier)
 				if dep.resolved is not None:
 					dependencyDict[dep.identifier] = dep.resolved
 					dependencyRoots.append(dep.resolved)
@@ -304,6 +342,8 @@ class DependencyDescr:
 	mandatory: bool
 	span: Optional[Span] = None
 	resolved: Optional[Root] = None
+	resolutionInfo: Optional[str] = None
+	"""explains why the dependency was resolved to resolved (or why it is missing). Shown in the dependencies panel."""
 
 
 @dataclass
@@ -311,6 +351,81 @@ class IndexBundleAspect(Aspect, IndexBundle, ABC):
 	pass
 
 
+@dataclass
+class _PublishedIndexBundles(AspectDict[IndexBundleAspect]):
+	"""a published version of the index bundles of a root. Readers must use get(...), bundles are only added to drafts."""
+
+	def _set(self, aspect: IndexBundleAspect) -> IndexBundleAspect:
+		assert False, "index bundles can only be added within Root.updateIndices(). Use get(...) to read them."
+		return super()._set(aspect)
+
+
+@dataclass
+class _IndexBundlesDraft(AspectDict[IndexBundleAspect]):
+	"""the next version of the index bundles of a root. Bundles of the previous version are copied when they are accessed."""
+	_copied: set[AspectType] = field(default_factory=set, init=False)
+
+	@classmethod
+	def basedOn(cls, published: AspectDict[IndexBundleAspect]) -> _IndexBundlesDraft:
+		draft = cls(IndexBundleAspect)
+		draft._aspects = dict(published._aspects)
+		return draft
+
+	def _get(self, aspectType: AspectType) -> Optional[IndexBundleAspect]:
+		aspect = self._aspects.get(aspectType)
+		if aspect is not None and aspectType not in self._copied:
+			aspect = self._set(aspect.copy())
+		return aspect
+
+	def _set(self, aspect: IndexBundleAspect) -> IndexBundleAspect:
+		self._copied.add(aspect.getAspectType())
+		return super()._set(aspect)
+
+	def __iter__(self) -> Iterator[IndexBundleAspect]:
+		for aspectType in list(self._aspects):
+			yield self._get(aspectType)
+
+	def publish(self) -> _PublishedIndexBundles:
+		published = _PublishedIndexBundles(IndexBundleAspect)
+		published._aspects = self._aspects
+		# bundles that have not been copied are still frozen from the previous version:
+		for aspectType in self._copied:
+			self._aspects[aspectType].freeze()
+		return published
+
+
+class _IndexThreadState(threading.local):
+	def __init__(self):
+		self.drafts: dict[int, _IndexBundlesDraft] = {}
+		"""id(root) -> the draft this thread is building for root"""
+		self.snapshots: Optional[dict[int, tuple[int, AspectDict[IndexBundleAspect]]]] = None
+		"""id(root) -> (generation, version of the index bundles) of root, that this thread sees during indexSnapshot()"""
+
+
+_INDEX_THREAD_STATE = _IndexThreadState()
+_INDEX_WRITE_LOCK = threading.RLock()
+"""serializes all writers, so no changes get lost"""
+_INDEX_GENERATIONS = count(1)
+
+
+@contextmanager
+def indexSnapshot() -> Iterator[None]:
+	"""
+	pins the index bundles of all roots for the current thread: every root returns the same version of its indexBundles
+	until the end of the with block, even if a new version has been published in the meantime. Roots are pinned on
+	first access. Use it for everything that reads the indices more than once, like validating a file.
+	"""
+	state = _INDEX_THREAD_STATE
+	if state.snapshots is not None:
+		yield  # nested
+		return
+	state.snapshots = {}
+	try:
+		yield
+	finally:
+		state.snapshots = None
+
+
 @dataclass
 class Root(SerializableDataclass):
 	_name: str = field(metadata=catMeta(serializedName='name'))
@@ -318,7 +433,64 @@ class Root(SerializableDataclass):
 	_identifier: str = field(default='', metadata=catMeta(serializedName='identifier'))
 	"""Used for unique identification, of the root. Two DependencyDescr objects with the same identifier ALWAYS point o the same Root."""
 	dependencies: list[DependencyDescr] = field(default_factory=list, metadata=catMeta(serialize=False))
-	indexBundles: AspectDict[IndexBundleAspect] = field(default_factory=lambda: AspectDict(IndexBundleAspect), metadata=catMeta(serialize=False))
+	_indexBundles: AspectDict[IndexBundleAspect] = field(default_factory=lambda: _PublishedIndexBundles(IndexBundleAspect), metadata=catMeta(serialize=False))
+	_indexGeneration: int = field(default=0, init=False, compare=False, metadata=catMeta(serialize=False))
+
+	@property
+	def indexBundles(self) -> AspectDict[IndexBundleAspect]:
+		"""
+		the current version of the index bundles. A published version is never modified, so holding on to it is safe.
+		Within updateIndices() this is the new version that is being built, within indexSnapshot() the pinned version.
+		"""
+		state = _INDEX_THREAD_STATE
+		if state.drafts and (draft := state.drafts.get(id(self))) is not None:
+			return draft
+		if state.snapshots is not None:
+			return self._pinSnapshot(state.snapshots)[1]
+		return self._indexBundles
+
+	@property
+	def indexGeneration(self) -> int:
+		"""
+		increases every time a new version of the index bundles is published. Unique across all roots. Within
+		indexSnapshot() this is the generation of the pinned version.
+		"""
+		state = _INDEX_THREAD_STATE
+		if state.drafts and id(self) in state.drafts:
+			return self._indexGeneration
+		if state.snapshots is not None:
+			return self._pinSnapshot(state.snapshots)[0]
+		return self._indexGeneration
+
+	def _pinSnapshot(self, snapshots: dict[int, tuple[int, AspectDict[IndexBundleAspect]]]) -> tuple[int, AspectDict[IndexBundleAspect]]:
+		if (snapshot := snapshots.get(id(self))) is None:
+			# updateIndices() publishes the bundles before the generation, so reading them the other way round never
+			# pairs an old version with a newer generation (which would make a cache keyed by the generation stale):
+			generation = self._indexGeneration
+			snapshot = snapshots[id(self)] = generation, self._indexBundles
+		return snapshot
+
+	@contextmanager
+	def updateIndices(self) -> Iterator[AspectDict[IndexBundleAspect]]:
+		"""
+		builds the next version of the index bundles. Within the with block, indexBundles returns the new version for
+		the current thread only. All changes are published at once at the end of the block, and indexGeneration is
+		increased. Other threads keep seeing the previous version until then. Writers are serialized. Nested calls join
+		the outer update.
+		"""
+		state = _INDEX_THREAD_STATE
+		if (draft := state.drafts.get(id(self))) is not None:
+			yield draft
+			return
+		with _INDEX_WRITE_LOCK:
+			draft = state.drafts[id(self)] = _IndexBundlesDraft.basedOn(self._indexBundles)
+			try:
+				yield draft
+			finally:
+				del state.drafts[id(self)]
+				# publish even if an error occurred, so the changes applied so far (that were applied in place before) don't get lost:
+				self._indexBundles = draft.publish()
+				self._indexGeneration = next(_INDEX_GENERATIONS)
 
 	@property
 	def location(self) -> str:
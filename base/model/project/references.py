@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Callable, Collection, Hashable, Iterator, Optional
+
+from base.model.aspect import AspectType
+from base.model.pathUtils import FilePath, FilePathTpl, doesFileExist
+from base.model.project.index import Index
+from base.model.project.project import Project, ProjectAspect
+from cat.GUI import propertyDecorators as pd
+from cat.Serializable.serializableDataclasses import catMeta
+from cat.utils.utils import runLaterSafe
+
+ReferenceKey = Hashable
+"""identifies a referenced resource, e.g. a ResourceLocation."""
+ReferenceKeyPredicate = Callable[[ReferenceKey], bool]
+
+_recording = threading.local()
+
+
+@contextmanager
+def recordReferences() -> Iterator[set[ReferenceKey]]:
+	"""collects all references reported via addReference(...) in the current thread, while the context is active."""
+	previous = getattr(_recording, 'references', None)
+	references: set[ReferenceKey] = set()
+	_recording.references = references
+	try:
+		yield references
+	finally:
+		_recording.references = previous
+
+
+def addReference(key: ReferenceKey) -> None:
+	"""called by contexts during validation for every resource they look up. Does nothing if nobody is recording."""
+	references = getattr(_recording, 'references', None)
+	if references is not None:
+		references.add(key)
+
+
+def storeReferences(filePath: FilePath, references: Collection[ReferenceKey]) -> None:
+	if not isinstance(filePath, tuple):
+		return  # untitled documents cannot be referenced nor be revalidated later.
+	from base.model.session import getSession
+	if (referencesAspect := getSession().project.aspects.get(ReferencesAspect)) is not None:
+		referencesAspect.setReferences(filePath, references)
+
+
+@dataclass
+class ReferencesAspect(ProjectAspect):
+	"""
+	A dependency graph from files to the resources they referenced during their last validation.
+	When resources appear or disappear (see resourcesChanged(...)), all dependent files are revalidated: opened documents
+	directly, closed files in the background via the ProblemsAspect (if present).
+	"""
+
+	@classmethod
+	def getAspectType(cls) -> AspectType:
+		return AspectType('dpe:references')
+
+	references: Index[ReferenceKey, None] = field(default_factory=Index, init=False, metadata=catMeta(serialize=False, decorators=[pd.NoUI()]))
+	"""key: referenced resource, sources: referencing files"""
+
+	_lock: threading.RLock = field(default_factory=threading.RLock, init=False, metadata=catMeta(serialize=False, decorators=[pd.NoUI()]))
+	_changedKeys: set[ReferenceKey] = field(default_factory=set, init=False, metadata=catMeta(serialize=False, decorators=[pd.NoUI()]))
+	_changedKeyPredicates: list[ReferenceKeyPredicate] = field(default_factory=list, init=False, metadata=catMeta(serialize=False, decorators=[pd.NoUI()]))
+
+	def onCloseProject(self, project: Project) -> None:
+		with self._lock:
+			self.references.clear()
+			self._changedKeys.clear()
+			self._changedKeyPredicates.clear()
+
+	def setReferences(self, filePath: FilePathTpl, references: Collection[ReferenceKey]) -> None:
+		with self._lock:
+			self.references.discardSource(filePath)
+			for key in references:
+				self.references.add(key, filePath, None)
+
+	def discardReferences(self, files: Collection[FilePathTpl], directories: Collection[FilePathTpl] = ()) -> None:
+		"""forgets the references of deleted files, so they are never scheduled for revalidation again."""
+		with self._lock:
+			for filePath in files:
+				self.references.discardSource(filePath)
+			for directory in directories:
+				self.references.discardDirectory(directory)
+
+	def getDependents(self, keys: Collection[ReferenceKey], predicates: Collection[ReferenceKeyPredicate] = ()) -> set[FilePathTpl]:
+		""":return: all files that reference at least one of keys, or a key matching one of predicates"""
+		dependents: set[FilePathTpl] = set()
+		with self._lock:
+			byId = self.references.byId
+			for key in keys:
+				if (entry := byId.get(key)) is not None:
+					dependents.update(entry.sources)
+			if predicates:
+				for key, entry in byId.items():
+					if any(predicate(key) for predicate in predicates):
+						dependents.update(entry.sources)
+		return dependents
+
+	def resourcesChanged(self, keys: Collection[ReferenceKey], predicates: Collection[ReferenceKeyPredicate] = ()) -> None:
+		"""
+		Notifies that the resources identified by keys (or matched by predicates) have appeared or disappeared. Thread safe.
+		Changes are coalesced until the GUI thread gets to revalidate the dependent files.
+		"""
+		if not keys and not predicates:
+			return
+		with self._lock:
+			wasIdle = not self._changedKeys and not self._changedKeyPredicates
+			self._changedKeys.update(keys)
+			self._changedKeyPredicates.extend(predicates)
+		if wasIdle:
+			runLaterSafe(0, self._revalidateDependents)
+
+	def _revalidateDependents(self) -> None:
+		with self._lock:
+			keys, self._changedKeys = self._changedKeys, set()
+			predicates, self._changedKeyPredicates = self._changedKeyPredicates, []
+			dependents = self.getDependents(keys, predicates)
+		# a dependent might have been deleted after the change was reported:
+		dependents = [filePath for filePath in dependents if doesFileExist(filePath)]
+		if not dependents:
+			return
+
+		from base.model.session import getSession
+		from base.model.project.problems import ProblemsAspect
+		session = getSession()
+		closedFiles = []
+		for filePath in dependents:
+			if (document := session.documents.getDocument(filePath)) is not None:
+				document.asyncValidate()
+			else:
+				closedFiles.append(filePath)
+		if closedFiles and (problemsAspect := session.project.aspects.get(ProblemsAspect)) is not None:
+			problemsAspect.scheduleValidation(closedFiles)
+
+
+__all__ = [
+	'ReferenceKey',
+	'ReferenceKeyPredicate',
+	'recordReferences',
+	'addReference',
+	'storeReferences',
+	'ReferencesAspect',
+]
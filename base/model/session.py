@@ -55,6 +55,10 @@ class Session(SerializableDataclass):
 	def emitProjectErrorsChanged(self) -> None:
 		GLOBAL_SIGNALS.onProjectErrorsChanged.emit()
 
+	@DeferredCallOnceMethod(delay=333)
+	def emitProblemsChanged(self) -> None:
+		GLOBAL_SIGNALS.onProblemsChanged.emit()
+
 	documents: DocumentsManager = field(default_factory=DocumentsManager)
 
 	def tryOpenOrSelectDocument(self, filePath: FilePath, selectedSpan: Optional[Span] = None):
@@ -154,6 +158,9 @@ class _GlobalSignals(Singleton):
 	onProjectErrorsChanged: ClassVar[CatSignal[Callable[[], None]]] = CatSignal('onProjectErrorsChanged')  # not really satisfied with this location for this signal...
 	""" is emitted whenever project errors change. See also Project.getAllProjectErrors() and Session.emitProjectErrorsChanged(...)"""
 
+	onProblemsChanged: ClassVar[CatSignal[Callable[[], None]]] = CatSignal('onProblemsChanged')
+	""" is emitted whenever the errors of files in the project change. See also ProblemsAspect and Session.emitProblemsChanged(...)"""
+
 	def __hash__(self):
 		return hash((id(self), type(self)))
 
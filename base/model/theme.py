@@ -140,6 +140,10 @@ class GlobalStyles:
 	caretLineStyle: Style = field(default_factory=lambda: replace(EMPTY_STYLE_STYLE))
 	caretStyle: Style = field(default_factory=lambda: replace(EMPTY_STYLE_STYLE))
 	whiteSpaceStyle: Style = field(default_factory=lambda: replace(EMPTY_STYLE_STYLE))
+	errorStyle: Style = field(default_factory=lambda: Style(foreground=QColor(0xE0, 0x20, 0x20)))
+	warningStyle: Style = field(default_factory=lambda: Style(foreground=QColor(0xE0, 0xA0, 0x00)))
+	infoStyle: Style = field(default_factory=lambda: Style(foreground=QColor(0x20, 0x80, 0xE0)))
+	hintStyle: Style = field(default_factory=lambda: Style(foreground=QColor(0x80, 0x80, 0x80)))
 
 
 def updateGlobalStylesToMatchUIColors(scheme: ColorScheme):
@@ -157,6 +161,10 @@ def updateGlobalStylesToMatchUIColors(scheme: ColorScheme):
 		caretLineStyle       =gls.caretLineStyle       | Style(background=uic.Window),
 		caretStyle           =gls.caretStyle           | Style(background=uic.Text),
 		whiteSpaceStyle      =gls.whiteSpaceStyle      | Style(),
+		errorStyle           =gls.errorStyle           | Style(),
+		warningStyle         =gls.warningStyle         | Style(),
+		infoStyle            =gls.infoStyle            | Style(),
+		hintStyle            =gls.hintStyle            | Style(),
 	)
 
 
@@ -290,6 +298,46 @@ class StylesProxy:
 		return self.scheme.getStyles2(innerLanguage, self.outerStyles)
 
 
+StyleLayout = tuple[tuple[LanguageId, str, int], ...]
+"""(language, styleName, styleId) for every style of a language and all of its inner languages."""
+
+StyleTable = tuple[Optional[Style], ...]
+"""the fully merged styles indexed by styleId. None for styles of inner languages the color scheme has no styles for."""
+
+_STYLE_TABLES: dict[tuple[str, LanguageId, StyleLayout], Optional[StyleTable]] = {}
+
+
+def _buildStyleTable(scheme: ColorScheme, language: LanguageId, layout: StyleLayout) -> Optional[StyleTable]:
+	styles = scheme.getStyles2(language)
+	if styles is None:
+		return None
+	table: list[Optional[Style]] = [None] * (max((styleId for _, _, styleId in layout), default=-1) + 1)
+	allInnerStyles: dict[LanguageId, Optional[StylesProxy]] = {}
+	for innerLanguage, name, styleId in layout:
+		if innerLanguage not in allInnerStyles:
+			allInnerStyles[innerLanguage] = styles.getInnerLanguageStyles(innerLanguage)
+		if (innerStyles := allInnerStyles[innerLanguage]) is None:
+			continue
+		style = innerStyles.get(name)
+		if style is None:
+			logWarning(f"Theme '{scheme.name}' is missing style '{name}' for language '{innerLanguage}'")
+			style = scheme.globalStyles.defaultStyle
+		table[styleId] = style
+	return tuple(table)
+
+
+def getStyleTable(scheme: ColorScheme, language: LanguageId, layout: StyleLayout) -> Optional[StyleTable]:
+	"""
+	resolves all styles of layout for a document of the given language, including the modifiers language applies to
+	its inner languages. The result is cached until the color schemes are updated (see currentColorSchemeUpdated()).
+	:return: None, if scheme has no styles for language.
+	"""
+	key = (scheme.name, language, layout)
+	if (table := _STYLE_TABLES.get(key, ...)) is ...:
+		table = _STYLE_TABLES[key] = _buildStyleTable(scheme, language, layout)
+	return table
+
+
 _ALL_COLOR_SCHEMES: dict[str, ColorScheme] = {}
 _currentColorScheme: str = "Default"
 
@@ -309,6 +357,7 @@ def currentColorScheme() -> ColorScheme:
 
 def currentColorSchemeUpdated() -> None:
 	from cat.GUI.components import catWidgetMixins
+	_STYLE_TABLES.clear()
 	uiColors = currentColorScheme().uiColors
 	catWidgetMixins.setGUIColors(uiColors)
 
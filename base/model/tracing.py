@@ -0,0 +1,236 @@
+"""
+Lightweight tracing of the phases DPE goes through (indexing, parsing, validating, styling, ...).
+
+Spans are only recorded while tracing is enabled. Otherwise `traceSpan(...)` returns a shared no-op context manager and
+functions decorated with `@traced(...)` are called directly, so tracing can stay in place everywhere.
+Recorded spans are kept in a ring buffer and can be exported as Chrome trace-event JSON, which can be opened in
+chrome://tracing, Perfetto, speedscope, etc.
+"""
+from __future__ import annotations
+
+import functools
+import json
+import os
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from time import perf_counter_ns
+from typing import Any, Callable, Iterable, Optional, TypeVar
+
+from base.model.pathUtils import FilePath, unitePath
+
+TRACE_PROJECT: str = 'project'
+TRACE_INDEX: str = 'index'
+TRACE_PARSE: str = 'parse'
+TRACE_VALIDATE: str = 'validate'
+TRACE_SCHEMA: str = 'schema'
+TRACE_STYLE: str = 'style'
+
+_TCallable = TypeVar('_TCallable', bound=Callable)
+
+
+@dataclass
+class TraceSpan:
+	name: str
+	category: str
+	start: int
+	"""in nanoseconds, as returned by time.perf_counter_ns()"""
+	duration: int
+	"""in nanoseconds"""
+	threadId: int
+	depth: int
+	file: Optional[str]
+	"""the file that was processed. Spans without an explicit file inherit the file of their parent span."""
+	isNested: bool
+	"""True, if the span is (indirectly) inside another span of the same category."""
+	args: Optional[dict[str, Any]] = None
+
+
+class _NullSpan:
+	__slots__ = ()
+
+	def __enter__(self) -> _NullSpan:
+		return self
+
+	def __exit__(self, exc_type, exc_val, exc_tb) -> bool:
+		return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _ActiveSpan:
+	__slots__ = ('_tracer', 'name', 'category', 'file', 'args', '_start', '_depth', '_isNested')
+
+	def __init__(self, tracer: Tracer, name: str, category: str, file: Optional[str], args: Optional[dict[str, Any]]):
+		self._tracer = tracer
+		self.name = name
+		self.category = category
+		self.file = file
+		self.args = args
+
+	def __enter__(self) -> _ActiveSpan:
+		stack = self._tracer._stack()
+		if self.file is None and stack:
+			self.file = stack[-1].file
+		self._isNested = any(span.category == self.category for span in stack)
+		self._depth = len(stack)
+		stack.append(self)
+		self._start = perf_counter_ns()
+		return self
+
+	def __exit__(self, exc_type, exc_val, exc_tb) -> bool:
+		end = perf_counter_ns()
+		stack = self._tracer._stack()
+		if stack and stack[-1] is self:
+			stack.pop()
+		self._tracer._spans.append(TraceSpan(
+			self.name, self.category, self._start, end - self._start, threading.get_ident(), self._depth, self.file, self._isNested, self.args
+		))
+		return False
+
+
+class Tracer:
+	def __init__(self, capacity: int = 100_000):
+		self.enabled: bool = False
+		self._spans: deque[TraceSpan] = deque(maxlen=capacity)
+		self._local = threading.local()
+
+	def _stack(self) -> list[_ActiveSpan]:
+		try:
+			return self._local.stack
+		except AttributeError:
+			stack = self._local.stack = []
+			return stack
+
+	@property
+	def capacity(self) -> int:
+		return self._spans.maxlen
+
+	@capacity.setter
+	def capacity(self, value: int) -> None:
+		self._spans = deque(self._spans, maxlen=value)
+
+	@property
+	def spanCount(self) -> int:
+		return len(self._spans)
+
+	@property
+	def spans(self) -> list[TraceSpan]:
+		"""the recorded spans, oldest first"""
+		return list(self._spans)
+
+	def clear(self) -> None:
+		self._spans.clear()
+
+	def span(self, name: str, category: str, file: Optional[FilePath] = None, **args) -> _ActiveSpan | _NullSpan:
+		if not self.enabled:
+			return _NULL_SPAN
+		return _ActiveSpan(self, name, category, unitePath(file) if file is not None else None, args or None)
+
+	def chromeTraceEvents(self) -> list[dict[str, Any]]:
+		pid = os.getpid()
+		events = []
+		for span in self._spans:
+			args = dict(span.args) if span.args else {}
+			if span.file is not None:
+				args['file'] = span.file
+			events.append(dict(
+				name=span.name,
+				cat=span.category,
+				ph='X',
+				ts=span.start / 1000,
+				dur=span.duration / 1000,
+				pid=pid,
+				tid=span.threadId,
+				args=args,
+			))
+		return events
+
+	def exportChromeTrace(self, filePath: str) -> None:  # throws OSError
+		with open(filePath, 'w', encoding='utf-8') as f:
+			json.dump(dict(traceEvents=self.chromeTraceEvents(), displayTimeUnit='ms'), f)
+
+
+TRACER: Tracer = Tracer()
+
+
+def traceSpan(name: str, category: str, file: Optional[FilePath] = None, **args) -> _ActiveSpan | _NullSpan:
+	return TRACER.span(name, category, file, **args)
+
+
+def traced(category: str, name: Optional[str] = None, *, file: Optional[Callable[..., Optional[FilePath]]] = None) -> Callable[[_TCallable], _TCallable]:
+	"""
+	records a span for every call of the decorated function while tracing is enabled.
+	:param file: is called with the arguments of the decorated function and returns the file that is processed.
+	"""
+	def decorator(func: _TCallable) -> _TCallable:
+		spanName = name if name is not None else func.__qualname__
+
+		@functools.wraps(func)
+		def wrapper(*args, **kwargs):
+			if not TRACER.enabled:
+				return func(*args, **kwargs)
+			with TRACER.span(spanName, category, file(*args, **kwargs) if file is not None else None):
+				return func(*args, **kwargs)
+		return wrapper
+	return decorator
+
+
+@dataclass
+class FileTimes:
+	file: str
+	phases: dict[str, int] = field(default_factory=dict)
+	"""category -> duration in nanoseconds"""
+
+	@property
+	def total(self) -> int:
+		"""the sum of all phases. Phases can overlap (e.g. a schema is loaded while a file is parsed)."""
+		return sum(self.phases.values())
+
+
+def slowestFiles(spans: Optional[Iterable[TraceSpan]] = None, count: int = 20) -> list[FileTimes]:
+	"""
+	sums up the time spent on each file per phase (category). Spans inside a span of the same category are not counted
+	twice.
+	"""
+	if spans is None:
+		spans = TRACER.spans
+	times: dict[str, FileTimes] = {}
+	for span in spans:
+		if span.file is None or span.isNested:
+			continue
+		if (fileTimes := times.get(span.file)) is None:
+			fileTimes = times[span.file] = FileTimes(span.file)
+		fileTimes.phases[span.category] = fileTimes.phases.get(span.category, 0) + span.duration
+	return sorted(times.values(), key=lambda ft: ft.total, reverse=True)[:count]
+
+
+def formatSlowestFiles(spans: Optional[Iterable[TraceSpan]] = None, count: int = 20) -> str:
+	""":return: a plain text table of the slowest files with the time spent in each phase in milliseconds."""
+	files = slowestFiles(spans, count)
+	categories = sorted({category for ft in files for category in ft.phases})
+	columns = ['total', *categories]
+	lines = ['  '.join(f'{column:>10}' for column in columns) + '  file']
+	for ft in files:
+		durations = [ft.total, *(ft.phases.get(category, 0) for category in categories)]
+		lines.append('  '.join(f'{duration / 1_000_000:>10.2f}' for duration in durations) + f'  {ft.file}')
+	return '\n'.join(lines)
+
+
+__all__ = [
+	'TRACE_PROJECT',
+	'TRACE_INDEX',
+	'TRACE_PARSE',
+	'TRACE_VALIDATE',
+	'TRACE_SCHEMA',
+	'TRACE_STYLE',
+	'TraceSpan',
+	'Tracer',
+	'TRACER',
+	'traceSpan',
+	'traced',
+	'FileTimes',
+	'slowestFiles',
+	'formatSlowestFiles',
+]
@@ -0,0 +1,113 @@
+"""
+Mementos for the undo / redo stack of text documents that only store what changed between two versions of the
+content, instead of the whole content.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Optional
+
+KEYFRAME_INTERVAL: int = 64
+"""every KEYFRAME_INTERVAL-th memento stores the full content, so a broken chain of deltas can always be recovered from"""
+
+
+def _commonPrefixLength(a: bytes, b: bytes) -> int:
+	# binary search, so the actual comparisons are done by memcmp:
+	lo, hi = 0, min(len(a), len(b))
+	mv1, mv2 = memoryview(a), memoryview(b)
+	while lo < hi:
+		mid = (lo + hi + 1) // 2
+		if mv1[lo:mid] == mv2[lo:mid]:
+			lo = mid
+		else:
+			hi = mid - 1
+	return lo
+
+
+def _commonSuffixLength(a: bytes, b: bytes, maxLength: int) -> int:
+	lo, hi = 0, maxLength
+	mv1, mv2 = memoryview(a), memoryview(b)
+	len1, len2 = len(a), len(b)
+	while lo < hi:
+		mid = (lo + hi + 1) // 2
+		if mv1[len1 - mid:len1 - lo] == mv2[len2 - mid:len2 - lo]:
+			lo = mid
+		else:
+			hi = mid - 1
+	return lo
+
+
+@dataclass(frozen=True, slots=True)
+class TextDelta:
+	"""replaces `removed` at `start` with `inserted`."""
+	start: int
+	removed: bytes
+	inserted: bytes
+
+	def apply(self, content: bytes) -> bytes:
+		end = self.start + len(self.removed)
+		if content[self.start:end] != self.removed:
+			raise ValueError(f"TextDelta does not apply to content at {self.start}.")
+		return b''.join((content[:self.start], self.inserted, content[end:]))
+
+	def inverted(self) -> TextDelta:
+		return TextDelta(self.start, self.inserted, self.removed)
+
+
+def computeTextDelta(old: bytes, new: bytes) -> Optional[TextDelta]:
+	"""
+	computes the delta that turns old into new by trimming their common prefix and suffix.
+	:return: the delta, or None if old and new are equal.
+	"""
+	if old == new:
+		return None
+	prefix = _commonPrefixLength(old, new)
+	suffix = _commonSuffixLength(old, new, min(len(old), len(new)) - prefix)
+	return TextDelta(prefix, old[prefix:len(old) - suffix], new[prefix:len(new) - suffix])
+
+
+@dataclass(frozen=True, slots=True)
+class TextDeltaMemento:
+	delta: TextDelta
+
+	def restore(self, target: bytes) -> bytes:
+		return self.delta.apply(target)
+
+
+@dataclass(frozen=True, slots=True)
+class TextKeyframeMemento:
+	content: bytes
+
+	def restore(self, target: bytes) -> bytes:
+		return self.content
+
+
+@dataclass(slots=True)
+class MakesTextDeltaMementoIfDiff:
+	"""
+	a MakeMementoIfDiffFunc for bytes. It creates mementos that only store the changed part of the content, except for
+	every keyframeInterval-th pair of mementos, which stores the full content.
+	"""
+	keyframeInterval: int = KEYFRAME_INTERVAL
+	_sinceKeyframe: int = field(default=0, init=False)
+
+	def __call__(self, snapshot: bytes, target: bytes):
+		delta = computeTextDelta(snapshot, target)
+		if delta is None:
+			return False, None, None
+		self._sinceKeyframe += 1
+		if self._sinceKeyframe >= self.keyframeInterval:
+			self._sinceKeyframe = 0
+			return True, TextKeyframeMemento(snapshot), TextKeyframeMemento(target)
+		# undo turns target back into snapshot, redo turns snapshot into target:
+		return True, TextDeltaMemento(delta.inverted()), TextDeltaMemento(delta)
+
+
+__all__ = [
+	'KEYFRAME_INTERVAL',
+	'TextDelta',
+	'computeTextDelta',
+	'TextDeltaMemento',
+	'TextKeyframeMemento',
+	'MakesTextDeltaMementoIfDiff',
+]
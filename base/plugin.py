@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from sys import exit  # required when running packaged as an executable. See: https://stackoverflow.com/questions/45066518/nameerror-name-exit-is-not-defined
 import os
+import time
 from abc import ABC, abstractmethod
 from collections import defaultdict
 from dataclasses import dataclass
@@ -23,7 +24,7 @@ from base.model.defaultSchemaProvider import SchemaMapping, addSchemaMapping
 from base.model.documents import DocumentTypeDescription, registerDocumentTypeDescription
 from base.model.parsing.contextProvider import ContextProvider, registerContextProvider
 from base.model.parsing.parser import ParserBase, registerParser
-from base.model.parsing.schemaStore import GLOBAL_SCHEMA_STORE
+from base.model.parsing.schemaStore import GLOBAL_SCHEMA_STORE, LazySchema
 from base.model.parsing.tree import Node, Schema
 from base.model.pathUtils import FilePathStr
 from base.model.project.project import ProjectAspect, Project
@@ -95,11 +96,15 @@ class PluginService:
 
 		# initialize plugins
 		self.plugins: dict[str, PluginBase] = {}
+		initDurations: dict[str, float] = {}
 		for pluginName in allPluginsSorted:
 			plugin = pluginByName.get(pluginName)
 			self.plugins[pluginName] = plugin
 			with loggingIndentInfo(f"Initializing plugin '{pluginName}' ({type(plugin).__qualname__}) "):
+				start = time.perf_counter()
 				self._initPlugin(plugin)
+				initDurations[pluginName] = time.perf_counter() - start
+		_logInitDurations(initDurations)
 
 	@staticmethod
 	def _initPlugin(plugin: PluginBase):
@@ -128,6 +133,9 @@ class PluginService:
 			else:
 				logWarning(f"Schema with name'{name}' was null. it won't be added to the GLOBAL_SCHEMA_STORE.")
 
+		for name, lazySchema in (plugin.lazySchemas() or {}).items():
+			GLOBAL_SCHEMA_STORE.registerLazySchema(name, lazySchema)
+
 		schemaMappings = plugin.schemaMappings() or {}
 		for languageId, mappings in schemaMappings.items():
 			for mapping in mappings:
@@ -154,6 +162,13 @@ def _formatPluginsOrder(plugins: list[str]) -> str:
 	return ' -> '.join(plugins)
 
 
+def _logInitDurations(initDurations: dict[str, float]) -> None:
+	total = sum(initDurations.values())
+	logInfo(f"Initialized all plugins in {total * 1000:.1f} ms:")
+	for pluginName, duration in sorted(initDurations.items(), key=lambda item: item[1], reverse=True):
+		logInfo(f"{duration * 1000:8.1f} ms  {pluginName}", indentLvl=1)
+
+
 @dataclass
 class SideBarOptions:
 	tabOptions: TabOptions
@@ -228,6 +243,13 @@ class PluginBase(ABC):
 	def schemas(self) -> dict[str, Schema]:
 		return {}
 
+	def lazySchemas(self) -> dict[str, LazySchema]:
+		"""
+		Schemas, that are expensive to build. They are built when they are requested for the first time.
+		Prefer this over :meth:`schemas` if building a schema requires importing large modules.
+		"""
+		return {}
+
 	def schemaMappings(self) -> dict[LanguageId, list[SchemaMapping]]:
 		return {}
 
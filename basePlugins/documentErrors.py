@@ -1,14 +1,21 @@
 from __future__ import annotations
 
 from operator import attrgetter
-from typing import Optional, Sequence
+from typing import Optional, Sequence, Type
 
 from PyQt5 import sip
+from PyQt5.QtGui import QIcon
+from recordclass import as_dataclass
 
 from base.model.documents import Document, ErrorCounts, getErrorCounts
+from base.model.pathUtils import FilePathTpl, fileNameFromFilePath, toDisplayPath
+from base.model.project.problems import FileProblems, ProblemsAspect
+from base.model.project.project import ProjectAspect
+from base.model.project.references import ReferencesAspect
 from base.model.session import GLOBAL_SIGNALS, getSession
-from base.model.utils import GeneralError
+from base.model.utils import GeneralError, Span
 from base.plugin import PLUGIN_SERVICE, PluginBase, SideBarOptions
+from cat.GUI.components.treeBuilders import DataTreeBuilder
 from cat.GUI.pythonGUI import EditorBase, TabOptions
 from gui.datapackEditorGUI import DatapackEditorGUI
 from gui.icons import icons
@@ -30,8 +37,12 @@ class DocumentErrorsPlugin(PluginBase):
 		return [
 			SideBarOptions(TabOptions('Project Errors', icon=icons.error), ProjectErrorsGUI),  # put project errors first, so people see when there are problems with their project setup.
 			SideBarOptions(TabOptions('File Errors', icon=icons.error), DocumentErrorsGUI, DocumentErrorsSummaryGUI),
+			SideBarOptions(TabOptions('Problems', icon=icons.error), ProblemsGUI, ProblemsSummaryGUI),
 		]
 
+	def projectAspects(self) -> list[Type[ProjectAspect]]:
+		return [ProblemsAspect, ReferencesAspect]
+
 
 class DocumentErrorsGUI(EditorBase[None]):
 	def OnGUI(self, gui: DatapackEditorGUI) -> None:
@@ -81,3 +92,89 @@ class ProjectErrorsGUI(EditorBase[None]):
 			errors,
 			onDoubleClicked=lambda e: None,  # getSession().documents.selectDocument(document, e.span),
 		)
+
+
+@as_dataclass(hashable=True)
+class _Problem:
+	file: FilePathTpl
+	error: GeneralError
+
+
+def getAndConnectProblemsAspect(self: EditorBase[None]) -> Optional[ProblemsAspect]:
+	key = type(self).__name__
+	GLOBAL_SIGNALS.onProblemsChanged.reconnect(key, lambda: self.redrawLater('onProblemsChanged') if not sip.isdeleted(self) else None)
+	return getSession().project.aspects.get(ProblemsAspect)
+
+
+class ProblemsGUI(EditorBase[None]):
+
+	def OnGUI(self, gui: DatapackEditorGUI) -> None:
+		problemsAspect = getAndConnectProblemsAspect(self)
+		allFileProblems = problemsAspect.allFileProblems() if problemsAspect is not None else []
+		allFileProblems.sort(key=lambda fp: (-fp.counts.errors, -fp.counts.warnings, fp.file))
+
+		def labelMaker(x: list[FileProblems] | FileProblems | _Problem, i: int) -> str:
+			if isinstance(x, _Problem):
+				return gui.getErrorLabelForList(x.error, i)
+			elif isinstance(x, FileProblems):
+				if i == 0:
+					return fileNameFromFilePath(x.file[1])
+				elif i == 1:
+					counts = x.counts
+					return f'errors: {counts.errors:2} | warnings: {counts.warnings:2} | hints: {counts.hints:2}'
+				elif i == 2:
+					return fileNameFromFilePath(x.file[0])
+			return "<root>"
+
+		def iconMaker(x: list[FileProblems] | FileProblems | _Problem, i: int) -> Optional[QIcon]:
+			if isinstance(x, _Problem):
+				return gui.getErrorIconForList(x.error, i)
+			return None
+
+		def toolTipMaker(x: list[FileProblems] | FileProblems | _Problem, i: int) -> Optional[str]:
+			if isinstance(x, _Problem):
+				return gui.getErrorToolTipForList(x.error, i)
+			elif isinstance(x, FileProblems):
+				return toDisplayPath(x.file)
+			return ""
+
+		def openDocument(x: list[FileProblems] | FileProblems | _Problem) -> None:
+			if isinstance(x, _Problem):
+				getSession().tryOpenOrSelectDocument(x.file, Span(x.error.start))
+			elif isinstance(x, FileProblems):
+				getSession().tryOpenOrSelectDocument(x.file)
+
+		def childrenMaker(x: list[FileProblems] | FileProblems | _Problem) -> Sequence[FileProblems | _Problem]:
+			if isinstance(x, _Problem):
+				return ()
+			elif isinstance(x, FileProblems):
+				return [_Problem(x.file, e) for e in sorted(x.errors, key=attrgetter('position'))]
+			else:
+				return x
+
+		gui.tree(
+			DataTreeBuilder(
+				allFileProblems,
+				childrenMaker,
+				labelMaker,
+				iconMaker,
+				toolTipMaker,
+				3,
+				showRoot=False,
+				onDoubleClick=openDocument,
+				onCopy=lambda x: x.error.message if isinstance(x, _Problem) else toDisplayPath(x.file) if isinstance(x, FileProblems) else None,
+			),
+			itemDelegate=gui.htmlDelegate
+		)
+
+
+class ProblemsSummaryGUI(EditorBase[None]):
+	def OnGUI(self, gui: DatapackEditorGUI) -> None:
+		problemsAspect = getAndConnectProblemsAspect(self)
+		with gui.hLayout(seamless=True):
+			if problemsAspect is not None:
+				gui.errorsSummaryGUI(problemsAspect.totalCounts)
+				if pendingCount := problemsAspect.pendingCount:
+					gui.label(f'({pendingCount} files pending)')
+			else:
+				gui.errorsSummaryGUI(ErrorCounts())
@@ -5,9 +5,11 @@ from typing import Optional, Any
 
 from PyQt5.QtGui import QIcon
 
-from cat.GUI.components.treeBuilders import DataTreeBuilder
+from cat.GUI import SizePolicy
+from cat.GUI.components.treeBuilders import DataListBuilder, DataTreeBuilder
 from cat.GUI.pythonGUI import EditorBase, TabOptions
 from gui.icons import icons
+from base.model.memoryUsage import MemoryEntry, MemoryReport, buildMemoryReport, isTracingAllocations, startTracingAllocations, stopTracingAllocations, writeMemoryReport
 from base.model.project.index import DeepIndex, Index, IndexBundle
 from base.model.project.project import Root
 from base.model.session import getSession
@@ -28,7 +30,10 @@ class PluginDebugPlugin(PluginBase):
 		return {'ProjectFiles'}  # ordering of gui elements
 
 	def sideBarTabs(self) -> list[SideBarOptions]:
-		return [SideBarOptions(TabOptions('Index Bundles', icon=icons.folder_open), IndexBundlesGUI, None)]
+		return [
+			SideBarOptions(TabOptions('Index Bundles', icon=icons.folder_open), IndexBundlesGUI, None),
+			SideBarOptions(TabOptions('Memory', icon=icons.table), MemoryUsageGUI, None),
+		]
 
 
 class IndexBundlesGUI(EditorBase[None]):
@@ -112,3 +117,58 @@ def _childrenMaker(data: Root) -> list[TreeItem]:
 		return [TreeItem(str(key), str(value)) for key, value in data.items()]
 	else:
 		return []
+
+
+def _formatSize(size: int) -> str:
+	return f'{size / 1_048_576:,.1f} MB'
+
+
+class MemoryUsageGUI(EditorBase[None]):
+
+	def postInit(self) -> None:
+		self._report: Optional[MemoryReport] = None
+
+	def OnGUI(self, gui: DatapackEditorGUI) -> None:
+		with gui.vLayout(seamless=True):
+			with gui.hPanel(seamless=True):
+				if gui.toolButton(icon=icons.refresh, tip="measure"):
+					self._report = buildMemoryReport()
+				tracing = gui.toggleLeft(isTracingAllocations(), 'trace allocations', tip="uses tracemalloc. This makes everything noticeably slower.")
+				if tracing and not isTracingAllocations():
+					startTracingAllocations()
+				elif not tracing and isTracingAllocations():
+					stopTracingAllocations()
+				gui.addHSpacer(5, SizePolicy.Expanding)
+				if gui.toolButton(icon=icons.save, tip="export JSON report...", enabled=True):
+					self._exportReport(gui)
+
+			report = self._report
+			entries: list[MemoryEntry | tuple[str, int]] = []
+			if report is not None:
+				entries += sorted(report.entries, key=lambda e: e.size, reverse=True)
+				if report.allocationsByPackage is not None:
+					entries += report.allocationsByPackage.items()
+			gui.tree(
+				DataListBuilder(
+					entries,
+					labelMaker=_memoryLabelMaker,
+					iconMaker=None,
+					toolTipMaker=lambda e, i: f"~{e.objectCount:,} objects{' (sampled)' if e.isEstimate else ''}" if isinstance(e, MemoryEntry) else "allocated by package",
+					columnCount=3,
+				),
+			)
+
+	def _exportReport(self, gui: DatapackEditorGUI) -> None:
+		filePath = gui.showFileDialog('memory.json', [('JSON Report', '.json')], style='save')
+		if not filePath:
+			return
+		try:
+			self._report = writeMemoryReport(filePath)
+		except OSError as e:
+			getSession().showAndLogError(e, "Cannot write memory report")
+
+
+def _memoryLabelMaker(entry: MemoryEntry | tuple[str, int], column: int) -> str:
+	if isinstance(entry, MemoryEntry):
+		return (entry.subsystem, entry.name, _formatSize(entry.size))[column]
+	return ('allocations', entry[0], _formatSize(entry[1]))[column]
@@ -8,7 +8,6 @@ from typing import Optional, Callable, ClassVar, Type, final
 
 from PyQt5.QtGui import QIcon
 from recordclass import as_dataclass
-from watchdog.events import FileSystemEventHandler, FileClosedEvent, FileModifiedEvent, FileDeletedEvent, FileCreatedEvent, FileMovedEvent
 
 from base.model.searchUtils import FilterStr, filterComputedChoices
 from cat.GUI.pythonGUI import TabOptions, EditorBase, MenuItemData, SizePolicy
@@ -17,12 +16,13 @@ from cat.Serializable.serializableDataclasses import catMeta
 from gui.icons import icons
 from cat.utils import DeferredCallOnceMethod, openOrCreate
 from base.model import filesystemEvents
+from base.model.filesystemEvents import ChangeKind, CoalescingEventHandler, PendingChanges
 from base.model.pathUtils import FilePath, SearchPath, FilePathTpl, normalizeDirSeparators, splitPath, \
 	normalizeDirSeparatorsStr, unitePath, fileNameFromFilePath, getAllFilesFoldersFromFolder, joinFilePath, \
 	getAllFilesFromArchive, isExcludedDirectory, ZipFilePool
 from base.model.aspect import AspectType
 from base.model.project.index import Index
-from base.model.project.project import AnalyzeRootsAspectPart, Project, ProjectRoot, ProjectAspect, Root, IndexBundleAspect, FileEntry, makeFileEntry
+from base.model.project.project import AnalyzeRootsAspectPart, FileChanges, Project, ProjectRoot, ProjectAspect, Root, IndexBundleAspect, FileEntry, makeFileEntry
 from base.model.session import getSession
 from base.model.utils import Span, formatMarkdown
 from gui.datapackEditorGUI import DatapackEditorGUI, ContextMenuEntries, SearchableListContext
@@ -265,6 +265,8 @@ class ProjectFilesEditor(EditorBase[Project]):
 				('', None),
 				*ContextMenuEntries.fileItems(filePath, openFunc=self._openFunc)
 			]
+			if not data.isImmutable and (providedItems := ContextMenuEntries.providedFileItems(filePath, self._gui)):
+				menuItems += [('', None), *providedItems]
 
 		else:
 			# it is a 'real' folder:
@@ -368,9 +370,9 @@ class ProjectFilesEditor(EditorBase[Project]):
 		isImmutable = not isinstance(root, ProjectRoot)
 		isArchive = isImmutable
 		projItem = FilesTreeItem(rootName, icon, rootName + '/', (root.normalizedLocation, ''), filesForProj, isImmutable, isArchive)
-		filesIndex = root.indexBundles.setdefault(FilesIndex)
-		filesForProj.extend(filesIndex.folders.values())
-		filesForProj.extend(filesIndex.files.values())
+		if (filesIndex := root.indexBundles.get(FilesIndex)) is not None:
+			filesForProj.extend(filesIndex.folders.values())
+			filesForProj.extend(filesIndex.files.values())
 		allAutocompleteStringsIO.extend(map(attrgetter('virtualPath'), filesForProj))
 		if True or projItem.filePaths:
 			projectItemsIO.append(projItem)
@@ -469,9 +471,11 @@ def createNewFolderGUI(folderPath: FilePath, gui: DatapackEditorGUI):
 # Non-GUI stuff:
 
 
-class _FileSystemChangeHandler(FileSystemEventHandler):
+class _FileSystemChangeHandler(CoalescingEventHandler):
 	"""
-	Base file system event handler that you can override methods from.
+	Keeps the index bundles of a root up to date. Events are coalesced per path (see :class:`CoalescingEventHandler`)
+	and applied in one batch, so bursts of events (e.g. a ``git checkout``) don't cause the same file to be analyzed
+	over and over again.
 	"""
 
 	def __init__(self, root: Root, project: Project):
@@ -479,20 +483,23 @@ class _FileSystemChangeHandler(FileSystemEventHandler):
 		self._project: Project = project
 		self._root: Root = root
 
+	@property
+	def _excludedDirectories(self) -> tuple[str, ...]:
+		return self._project.aspects.get(FilesAspect).excludedDirectories
+
 	def _addFileOrFolderEntry(self, index: Index[str, FileEntry], path: FilePathTpl, isFile: bool) -> Optional[FileEntry]:
-		if not isExcludedDirectory(path[1], self._project.aspects.get(FilesAspect).excludedDirectories):
+		if not isExcludedDirectory(path[1], self._excludedDirectories):
 			return index.add(path[1], path, makeFileEntry(path, self._root, isFile))
 
-	def _analyzeFile(self, fileEntry: FileEntry) -> None:
-		with ZipFilePool() as pool:
-			for aspect in self._project.aspects:
-				if aspect.analyzeFilesPart is not None:
-					aspect.analyzeFilesPart.analyzeFile(self._root, fileEntry, pool)
+	def _analyzeFile(self, fileEntry: FileEntry, pool: ZipFilePool) -> None:
+		for aspect in self._project.aspects:
+			if aspect.analyzeFilesPart is not None:
+				aspect.analyzeFilesPart.analyzeFile(self._root, fileEntry, pool)
 
-	def _addFileEntryAndAnalyzeFile(self, path: FilePathTpl) -> None:
+	def _addFileEntryAndAnalyzeFile(self, path: FilePathTpl, pool: ZipFilePool) -> None:
 		fileEntry = self._addFileOrFolderEntry(self._root.indexBundles.setdefault(FilesIndex).files, path, True)
 		if fileEntry is not None:
-			self._analyzeFile(fileEntry)
+			self._analyzeFile(fileEntry, pool)
 
 	def _addFolderEntry(self, path: FilePathTpl) -> None:
 		self._addFileOrFolderEntry(self._root.indexBundles.setdefault(FilesIndex).folders, path, False)
@@ -503,101 +510,79 @@ class _FileSystemChangeHandler(FileSystemEventHandler):
 			normPath = normPath + '/'
 		return jf if (jf := splitPath(normPath, self._root.normalizedLocation)) is not None else None
 
-	def on_any_event(self, event):
-		"""Catch-all event handler.
-
-		:param event:
-			The event object representing the file system event.
-		:type event:
-			:class:`FileSystemEvent`
-		"""
-		event.split_src_path: Optional[FilePathTpl] = self._splitPath(event.src_path, event.is_directory)
-
-	def on_moved(self, event: FileMovedEvent):
-		"""Called when a file or a directory is moved or renamed.
-
-		:param event:
-			Event representing file/directory movement.
-		:type event:
-			:class:`DirMovedEvent` or :class:`FileMovedEvent`
-		"""
-		split_src_path = event.split_src_path
-		split_dst_path = self._splitPath(event.dest_path, event.is_directory)
-
-		if event.is_directory:
-			discardName, addFunc = 'discardDirectory', self._addFolderEntry
-			# TODO: analyze Files for DirMovedEvent
-		else:
-			discardName, addFunc = 'discardSource', self._addFileEntryAndAnalyzeFile
-
-		if split_src_path is not None:
-			for index in self._root.indexBundles:
-				getattr(index, discardName)(split_src_path)
-		if split_dst_path is not None:
-			addFunc(split_dst_path)
-
-	def on_created(self, event: FileCreatedEvent):
-		"""Called when a file or directory is created.
-
-		:param event:
-			Event representing file/directory creation.
-		:type event:
-			:class:`DirCreatedEvent` or :class:`FileCreatedEvent`
-		"""
-		if (path := event.split_src_path) is not None:
-			if event.is_directory:
-				self._addFolderEntry(path)
-			else:
-				self._addFileEntryAndAnalyzeFile(path)
-
-	def on_deleted(self, event: FileDeletedEvent):
-		"""Called when a file or directory is deleted.
-
-		:param event:
-			Event representing file/directory deletion.
-		:type event:
-			:class:`DirDeletedEvent` or :class:`FileDeletedEvent`
-		"""
-		if (path := event.split_src_path) is not None:
-			if event.is_directory:
-				self._root.indexBundles.setdefault(FilesIndex).folders.discardSource(path)
-				for index in self._root.indexBundles:
-					index.discardDirectory(path)
-			else:
-				# due to a bug (?) in Watchdog on Windows, a deleted directory will cause a FileDeletedEvent instead of a DirDeletedEvent:
-				dirPath = joinFilePath(path, '/')
-				self._root.indexBundles.setdefault(FilesIndex).folders.discardSource(dirPath)
-				for index in self._root.indexBundles:
-					# due to a bug (?) in Watchdog on Windows, a deleted directory will cause a FileDeletedEvent instead of a DirDeletedEvent:
-					index.discardDirectory(dirPath)
-					# normal FileDeletedEvent handling:
-					index.discardSource(path)
-
-	def on_modified(self, event: FileModifiedEvent):
-		"""Called when a file or directory is modified.
-
-		:param event:
-			Event representing file/directory modification.
-		:type event:
-			:class:`DirModifiedEvent` or :class:`FileModifiedEvent`
-		"""
-		if (path := event.split_src_path) is not None:
-			if event.is_directory:
-				pass
+	def _discardFile(self, path: FilePathTpl) -> None:
+		# due to a bug (?) in Watchdog on Windows, a deleted directory will cause a FileDeletedEvent instead of a DirDeletedEvent:
+		self._discardDirectory(joinFilePath(path, '/'))
+		# normal FileDeletedEvent handling:
+		for index in self._root.indexBundles:
+			index.discardSource(path)
+
+	def _discardDirectory(self, path: FilePathTpl) -> None:
+		self._root.indexBundles.setdefault(FilesIndex).folders.discardSource(path)
+		for index in self._root.indexBundles:
+			index.discardDirectory(path)
+
+	def _scanDirectory(self, path: FilePathTpl) -> tuple[list[FilePathTpl], list[FilePathTpl]]:
+		"""returns all files and folders inside the directory (recursively), relative to the root."""
+		if isExcludedDirectory(path[1], self._excludedDirectories):
+			return [], []
+		return getAllFilesFoldersFromFolder(unitePath(path), self._root.normalizedLocation, excludedDirs=self._excludedDirectories)
+
+	def processChanges(self, changes: PendingChanges) -> None:
+		deletedFiles: list[FilePathTpl] = []
+		deletedDirs: list[FilePathTpl] = []
+		changedFiles: dict[FilePathTpl, None] = {}  # an ordered set
+		changedDirs: list[FilePathTpl] = []
+		fileChanges = FileChanges()
+		for (rawPath, isDir), kind in changes.items():
+			path = self._splitPath(rawPath, isDir)
+			if path is None:
+				continue
+			if isDir:
+				if kind is not ChangeKind.created:
+					deletedDirs.append(path)
+					if kind is ChangeKind.deleted:
+						fileChanges.deletedDirectories.append(path)
+				if kind is not ChangeKind.deleted:
+					changedDirs.append(path)
 			else:
-				for index in self._root.indexBundles:
-					index.discardSource(path)
-				self._addFileEntryAndAnalyzeFile(path)
+				if kind is not ChangeKind.created:
+					deletedFiles.append(path)
+				if kind is not ChangeKind.deleted:
+					changedFiles[path] = None
+				if kind is ChangeKind.created:
+					fileChanges.created.append(path)
+				elif kind is ChangeKind.modified:
+					fileChanges.modified.append(path)
+				else:
+					fileChanges.deleted.append(path)
+
+		# all changes of the batch are published at once, so readers never see a half-applied update:
+		with filesystemEvents.FILESYSTEM_OBSERVER.lock, self._root.updateIndices():
+			for path in deletedDirs:
+				self._discardDirectory(path)
+			for path in deletedFiles:
+				self._discardFile(path)
+
+			# a created (or moved) directory might already contain files and folders, which won't send events of their own:
+			for path in changedDirs:
+				self._addFolderEntry(path)
+				files, folders = self._scanDirectory(path)
+				for folder in folders:
+					self._addFolderEntry(folder)
+				for file in files:
+					if file not in changedFiles:
+						changedFiles[file] = None
+						fileChanges.created.append(file)
 
-	def on_closed(self, event: FileClosedEvent):
-		"""Called when a file opened for writing is closed.
+			with ZipFilePool() as pool:
+				for path in changedFiles:
+					for index in self._root.indexBundles:
+						index.discardSource(path)
+					self._addFileEntryAndAnalyzeFile(path, pool)
 
-		:param event:
-			Event representing file closing.
-		:type event:
-			:class:`FileClosedEvent`
-		"""
-		pass
+		for aspect in self._project.aspects:
+			aspect.onFilesChanged(self._root, fileChanges, self._project)
 
 
 @dataclass
@@ -663,17 +648,19 @@ class AnalyzeRootsFilesAspectPart(AnalyzeRootsAspectPart[FilesAspect]):
 		else:
 			return
 		aspects = [a.analyzeFilesPart for a in project.aspects if a.analyzeFilesPart is not None]
-		idx = root.indexBundles.setdefault(FilesIndex).files
-		with ZipFilePool() as pool:
-			for jf in rawLocalFiles:
-				fileEntry = makeFileEntry(jf, root, True)
-				for aspect in aspects:
-					aspect.analyzeFile(root, fileEntry, pool)
-				idx.add(jf[1], jf, fileEntry)
-
-		idx = root.indexBundles.get(FilesIndex).folders
-		for jf in rawLocalFolders:
-			idx.add(jf[1], jf, makeFileEntry(jf, root, False))
+		# joins the update of Project.analyzeRoot(...), if there is one:
+		with root.updateIndices() as indexBundles:
+			idx = indexBundles.setdefault(FilesIndex).files
+			with ZipFilePool() as pool:
+				for jf in rawLocalFiles:
+					fileEntry = makeFileEntry(jf, root, True)
+					for aspect in aspects:
+						aspect.analyzeFile(root, fileEntry, pool)
+					idx.add(jf[1], jf, fileEntry)
+
+			idx = indexBundles.get(FilesIndex).folders
+			for jf in rawLocalFolders:
+				idx.add(jf[1], jf, makeFileEntry(jf, root, False))
 
 	def onRootRenamed(self, root: Root, oldName: str, newName: str) -> None:
 		indexBundle = root.indexBundles.get(FilesIndex)
@@ -82,6 +82,10 @@ def _editRoot(gui: DatapackEditorGUI, root: ProjectRoot):
 		root.name = newName
 
 
+def _withResolutionInfo(toolTip: str, descr: DependencyDescr) -> str:
+	return f'{toolTip}\n{descr.resolutionInfo}' if descr.resolutionInfo else toolTip
+
+
 def _refreshRoots(project: Project):
 	project.resolveDependencies()
 	project.analyzeDependencies()
@@ -242,9 +246,9 @@ class _DependenciesNS:
 			elif isinstance(item, RootInfo):
 				return f'{item.root.identifier} ({item.root.normalizedLocation})'
 			elif isinstance(item, DependencyInfo):
-				return f'{item.descr.identifier} ({item.root.normalizedLocation if item.root is not None else "(missing)"})'
+				return _withResolutionInfo(f'{item.descr.identifier} ({item.root.normalizedLocation if item.root is not None else "(missing)"})', item.descr)
 			elif isinstance(item, RequiredByInfo):
-				return f'{item.root.identifier} ({item.root.normalizedLocation})'
+				return _withResolutionInfo(f'{item.root.identifier} ({item.root.normalizedLocation})', item.descr)
 			elif isinstance(item, cls.DependencyDetails):
 				return None
 			else:
@@ -347,7 +351,7 @@ class _RootsNS:
 			elif isinstance(item, Root):
 				return item.normalizedLocation
 			elif isinstance(item, DependencyDescr):
-				return f'{item.identifier} ({item.resolved.normalizedLocation if item.resolved is not None else "missing"})'
+				return _withResolutionInfo(f'{item.identifier} ({item.resolved.normalizedLocation if item.resolved is not None else "missing"})', item)
 			else:
 				return str(type(item))
 
@@ -58,7 +58,11 @@ def buildColorScheme() -> ColorScheme:
 		calltipStyle=Style(foreground=scheme.uiColors.Border, background=scheme.uiColors.Window),
 		foldDisplayTextStyle=Style(foreground=lightGray, background=QColor('orange')),
 		caretLineStyle=Style(background=scheme.uiColors.Window),
-		whiteSpaceStyle=Style(foreground=lightGray)
+		whiteSpaceStyle=Style(foreground=lightGray),
+		errorStyle=Style(foreground=QColor(0xE0, 0x20, 0x20)),
+		warningStyle=Style(foreground=QColor(0xE0, 0xA0, 0x00)),
+		infoStyle=Style(foreground=QColor(0x20, 0x80, 0xE0)),
+		hintStyle=Style(foreground=QColor(0x80, 0x80, 0x80)),
 	)
 	updateGlobalStylesToMatchUIColors(scheme)
 
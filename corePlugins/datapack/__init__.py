@@ -21,6 +21,7 @@ class DatapackPlugin(PluginBase):
 
 	def initPlugin(self):
 		from . import resourceLocationContext  # loads all resource location contexts
+		from . import renameResourceGUI  # registers the 'rename Resource...' context menu entry
 
 	def dependencies(self) -> set[str]:
 		return {'JsonPlugin', 'McFunctionPlugin', 'MinecraftPlugin'}
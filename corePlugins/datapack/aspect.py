@@ -1,5 +1,6 @@
 import os
 from dataclasses import dataclass, field, fields
+from itertools import chain
 from typing import Optional, Callable, cast
 
 from cat.GUI import propertyDecorators as pd
@@ -10,16 +11,19 @@ from cat.utils.logging_ import logWarning
 from base.model.applicationSettings import getApplicationSettings
 from base.model.parsing.schemaStore import GLOBAL_SCHEMA_STORE
 from base.model.aspect import AspectType
-from base.model.project.project import AnalyzeFilesAspectPart, DependenciesAspectPart, ProjectInfoAspectPart, Root, ProjectAspect, DependencyDescr, FileEntry, Project
+from base.model.project.project import AnalyzeFilesAspectPart, DependenciesAspectPart, FileChanges, ProjectInfoAspectPart, Root, ProjectAspect, DependencyDescr, FileEntry, Project
+from base.model.project.references import ReferenceKeyPredicate, ReferencesAspect
 from base.model.parsing.contextProvider import parseNPrepare, validateTree
-from base.model.pathUtils import ArchiveFilePool, ZipFilePool, loadBinaryFile, normalizeDirSeparators
+from base.model.pathUtils import ArchiveFilePool, FilePathTpl, ZipFilePool, loadBinaryFile
 from base.model.session import getSession
-from base.model.utils import GeneralError, MDStr, NULL_SPAN, SemanticsError
-from .datapackContents import collectEntry
+from base.model.utils import GeneralError, MDStr, NULL_SPAN, SemanticsError, Span
+from .datapackContents import NAME_SPACE_VAR, EntryHandlers, collectEntry, getEntryHandlerForFile, getEntryHandlersForFolder
+from .dependencyResolution import DEPENDENCY_RESOLVER
 from .dpVersions import getAllDPVersions, getDPVersion, DPVersion
 from corePlugins.json import JSON_ID
 from corePlugins.json.core import JsonData
 from corePlugins.minecraft.settings import MinecraftSettings, MinecraftVersion
+from corePlugins.minecraft_data.resourceLocation import ResourceLocation
 from corePlugins.minecraft_data.fullData import FullMCData, getFullMcData
 
 
@@ -120,6 +124,26 @@ class DatapackAspect(ProjectAspect):
 		else:
 			self.projectInfoPart.setErrors('dpVersion', ())
 
+	def onFilesChanged(self, root: Root, changes: FileChanges, project: Project) -> None:
+		if not changes.hasAddedOrRemovedFiles:
+			return  # changing the contents of a file doesn't make a resource appear or disappear.
+		if (referencesAspect := project.aspects.get(ReferencesAspect)) is None:
+			return
+		referencesAspect.discardReferences(changes.deleted, changes.deletedDirectories)
+		handlers = self.dpVersionData.structure
+		changedResources: set[ResourceLocation] = set()
+		for filePath in chain(changes.created, changes.deleted):
+			if (resLocHandler := getEntryHandlerForFile(filePath, handlers)) is not None and resLocHandler[0] is not None:
+				changedResources.add(resLocHandler[0])
+
+		# the files of deleted directories are already gone from the index, so match resource locations by their prefix:
+		predicates = [
+			predicate
+			for directory in changes.deletedDirectories
+			for predicate in _resourcesInDirectoryPredicates(directory, handlers)
+		]
+		referencesAspect.resourcesChanged(changedResources, predicates)
+
 	def _reloadMinecraftVersion(self, oldVersion: Optional[str], newVersion: Optional[str]):
 		minecraftVersion = _getFullMcDataFromRegisteredMinecraftVersion(oldVersion)
 		if minecraftVersion is not None:
@@ -134,6 +158,31 @@ class DatapackAspect(ProjectAspect):
 			self.projectInfoPart.setErrors('minecraftVersion', ())
 
 
+def _resourcesInDirectoryPredicates(directory: FilePathTpl, handlers: EntryHandlers) -> list[ReferenceKeyPredicate]:
+	nsHandlers = getEntryHandlersForFolder(directory, handlers)
+	if not nsHandlers:
+		if _containsResourceFolders(directory[1], handlers):
+			# e.g. a whole namespace or the data folder has been deleted.
+			return [lambda key: isinstance(key, ResourceLocation)]
+		return []
+	return [
+		lambda key, ns=namespace, isTag=handler.isTag, prefix=rest: (
+			isinstance(key, ResourceLocation) and key.isTag == isTag and key.actualNamespace == ns and key.path.startswith(prefix)
+		)
+		for namespace, handler, rest in nsHandlers
+		if namespace is not None
+	]
+
+
+def _containsResourceFolders(dirPath: str, handlers: EntryHandlers) -> bool:
+	dirPath = dirPath.lstrip('/')
+	for folder in handlers:
+		prefix, sep, _ = folder.partition(NAME_SPACE_VAR)
+		if sep and (prefix.startswith(dirPath) or dirPath.startswith(prefix)):
+			return True
+	return False
+
+
 def _getDPVersion(self: DatapackAspect) -> str:
 	try:
 		return getattr(self, '_dpVersion')
@@ -176,8 +225,28 @@ def _setMinecraftVersion(self: DatapackAspect, newVal: str) -> None:
 DatapackAspect.minecraftVersion = property(_getMinecraftVersion, _setMinecraftVersion)
 
 
+def _getDependenciesFileStamp(rootPath: str, fileName: str) -> Optional[tuple[int, int]]:
+	""":return: (mtime, size) of the dependencies file. The file inside a zipped root can only change together with the zip file."""
+	path = rootPath if os.path.isfile(rootPath) else os.path.join(rootPath, fileName)
+	try:
+		stat = os.stat(path)
+	except OSError:
+		return None
+	return stat.st_mtime_ns, stat.st_size
+
+
+@dataclass
+class _DependenciesFile:
+	stamp: Optional[tuple[int, int]]
+	dependencies: list[tuple[str, bool, Optional[Span]]] = field(default_factory=list)
+	"""(name, mandatory, span)"""
+	error: Optional[GeneralError] = None
+
+
 @dataclass
 class DependenciesDatapackAspectPart(DependenciesAspectPart[DatapackAspect]):
+	_dependenciesFiles: dict[str, _DependenciesFile] = field(default_factory=dict, init=False, repr=False)
+	"""rootPath -> the parsed dependencies file. Reused as long as the file has not changed."""
 
 	def preResolveDependencies(self, project: Project) -> None:
 		self.aspect.projectInfoPart.setErrors('dependencies', [])
@@ -188,7 +257,6 @@ class DependenciesDatapackAspectPart(DependenciesAspectPart[DatapackAspect]):
 	def getDependencies(self, root: Root, project: Project) -> list[DependencyDescr]:
 		fileName = 'dependencies.json'
 		rootPath = root.normalizedLocation
-		schema = GLOBAL_SCHEMA_STORE.get('dpe:dependencies', JSON_ID)
 
 		if rootPath.lower().endswith('.jar'):
 			# Minecraft does not need itself as a dependency.
@@ -197,6 +265,39 @@ class DependenciesDatapackAspectPart(DependenciesAspectPart[DatapackAspect]):
 		# dependencies = [Dependency(applicationSettings.minecraft.executable, mandatory=True)]
 		dependencies: list[DependencyDescr] = []  # TODO: DependencyDescr(applicationSettings.minecraft.executable, 'minecraft', mandatory=True)]
 
+		stamp = _getDependenciesFileStamp(rootPath, fileName)
+		dependenciesFile = self._dependenciesFiles.get(rootPath)
+		if dependenciesFile is None or dependenciesFile.stamp != stamp:
+			dependenciesFile = self._dependenciesFiles[rootPath] = self._readDependenciesFile(root, fileName, stamp)
+
+		if dependenciesFile.error is not None:
+			self._getErrorsList().append(dependenciesFile.error)
+		for name, mandatory, span in dependenciesFile.dependencies:
+			dependencies.append(DependencyDescr(
+				name=name,
+				identifier=name,
+				mandatory=mandatory,
+				span=span
+			))
+
+		# minecraft dependency
+		registeredVersion = getRegisteredMinecraftVersion(self.aspect.minecraftVersion)
+		if registeredVersion is not None:
+			dependencies.append(DependencyDescr(
+				name=registeredVersion.minecraftExecutable,
+				identifier=registeredVersion.minecraftExecutable,
+				mandatory=True,
+				span=None
+			))
+
+		return dependencies
+
+	@staticmethod
+	def _readDependenciesFile(root: Root, fileName: str, stamp: Optional[tuple[int, int]]) -> _DependenciesFile:
+		rootPath = root.normalizedLocation
+		schema = GLOBAL_SCHEMA_STORE.get('dpe:dependencies', JSON_ID)
+		result = _DependenciesFile(stamp)
+
 		filePath = (rootPath, fileName)
 		node: Optional[JsonData]
 		try:
@@ -213,46 +314,26 @@ class DependenciesDatapackAspectPart(DependenciesAspectPart[DatapackAspect]):
 		if node is not None and not errors:
 			for element in node.data:
 				name = element.data['name'].value
-				dependencies.append(DependencyDescr(
-					name=name.data,
-					identifier=name.data,
-					mandatory=element.data['mandatory'].value.data,
-					span=name.span
-				))
+				result.dependencies.append((name.data, element.data['mandatory'].value.data, name.span))
 		if errors:
-			self._getErrorsList().append(errors[0])  # only append the first error!
+			result.error = errors[0]  # only report the first error!
 			logWarning(f"Failed to read '{fileName}' for root '{rootPath}':")
 			for error in errors:
 				logWarning(str(error), indentLvl=1)
-
-		# minecraft dependency
-		registeredVersion = getRegisteredMinecraftVersion(self.aspect.minecraftVersion)
-		if registeredVersion is not None:
-			dependencies.append(DependencyDescr(
-				name=registeredVersion.minecraftExecutable,
-				identifier=registeredVersion.minecraftExecutable,
-				mandatory=True,
-				span=None
-			))
-
-		return dependencies
+		return result
 
 	def resolveDependency(self, dep: DependencyDescr) -> Optional[Root]:
-		if '/' in dep.name and os.path.exists(dep.name):
+		searchLocations = [dsl for dslProvider in DEPENDENCY_SEARCH_LOCATIONS for dsl in dslProvider()]
+		resolution = DEPENDENCY_RESOLVER.resolve(dep.name, searchLocations)
+		dep.resolutionInfo = resolution.explanation
+		if resolution.location is None:
+			return None  # missing dependency error is logged by Project itself.
+		if resolution.location == dep.name:
 			return Root(dep.name, dep.name)
-		for dslProvider in DEPENDENCY_SEARCH_LOCATIONS:
-			dsls = dslProvider()
-			for dsl in dsls:
-				path = os.path.join(dsl, dep.name)
-				if os.path.exists(path):
-					return Root(_name=dep.name, _location=normalizeDirSeparators(path))
-				path = path + '.zip'
-				if os.path.exists(path):
-					return Root(_name=dep.name, _location=normalizeDirSeparators(path))
-		return None  # missing dependency error is logged by Project itself.
+		return Root(_name=dep.name, _location=resolution.location)
 
 	def postResolveDependencies(self, project: Project) -> None:
-		pass  # nothing to do here...
+		DEPENDENCY_RESOLVER.save()
 
 
 @dataclass
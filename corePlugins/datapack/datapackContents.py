@@ -1,15 +1,17 @@
 from __future__ import annotations
+import json
 import re
 from dataclasses import dataclass, field
 from typing import Optional, TypeVar, Type, Callable, Mapping
 
 from cat.utils.profiling import logError
-from cat.utils import unescapeFromXml, escapeForXmlAttribute, CachedProperty
+from cat.utils import unescapeFromXml, escapeForXmlAttribute
 from base.model.aspect import AspectType
 from base.model.project.index import DeepIndex, Index
-from base.model.parsing.parser import parse
-from base.model.pathUtils import ArchiveFilePool, FilePathTpl, loadBinaryFile, loadTextFile, ZipFilePool
+from base.model.parsing.bytesUtils import bytesToStr
+from base.model.pathUtils import ArchiveFilePool, FilePathTpl, openBinaryFile, ZipFilePool
 from base.model.project.project import IndexBundleAspect, Root
+from base.model.tracing import TRACE_INDEX, traced
 from base.model.utils import MDStr
 from corePlugins.minecraft.resourceLocation import ResourceLocation, MetaInfo
 
@@ -18,10 +20,109 @@ DATAPACK_CONTENTS_TYPE = AspectType('dpe:datapack_contents')
 _TMetaInfo = TypeVar('_TMetaInfo', bound=MetaInfo)
 
 
+_MAX_DOCUMENTATION_HEADER_LINES = 256
+"""at most this many lines of leading comments are read for the documentation of a function."""
+
+_MAX_DOCUMENTATION_HEADER_BYTES = 16 * 1024
+"""only this many bytes at the beginning of a json file are searched for a description."""
+
+
+def _readFunctionHeader(filePath: FilePathTpl, pool: ArchiveFilePool) -> list[str]:
+	"""reads only the leading comment lines of a function file."""
+	lines: list[str] = []
+	with openBinaryFile(filePath, pool) as file:
+		for _ in range(_MAX_DOCUMENTATION_HEADER_LINES):
+			line = file.readline()
+			if not line.startswith(b'#'):
+				break
+			lines.append(bytesToStr(line).rstrip('\r\n'))
+	return lines
+
+
+def _formatFunctionDocumentation(lines: list[str]) -> MDStr:
+	doc = []
+	whiteSpaces = 999  # way too many
+	for line in lines:
+		if not line.startswith('#'):
+			break
+
+		# remove '#':
+		line = line[1:]
+		# remove leading whiteSpaces:
+		line2 = line.lstrip()
+		if line2:
+			whiteSpaces = min(whiteSpaces, len(line) - len(line2))
+			line2 = line[whiteSpaces:]
+		line = line2
+		del line2
+
+		# handle special parameters:
+		if line.startswith('Desc:'):
+			doc.append('<b>Description:</b>' + line[len('Desc:'):])
+		elif line.startswith('Called by:'):
+			line2 = line[len('Called by:'):]
+			functions = line2.split(',')
+
+			doc.append('<b>Called by:</b>')
+			for f in functions:
+				f = f.strip()
+				f = unescapeFromXml(f)
+				f = escapeForXmlAttribute(f)
+				doc.append(f'* [`{f}`](@dpe.function:{f})')
+		else:
+			doc.append(line)
+
+	return MDStr('\n'.join(doc))
+
+
+_JSON_HEADER_TOKEN_PATTERN = re.compile(rb'"(?:[^"\\]|\\.)*"|[{}\[\]:,]')
+
+
+def _scanJsonDescription(header: bytes) -> Optional[str]:
+	"""
+	finds the string value of the top-level "description" property without building a tree.
+	Everything that isn't a string or a structural character (numbers, literals, comments, ...) is skipped.
+	"""
+	depth = 0
+	lastString: Optional[bytes] = None
+	expectValueFor: Optional[bytes] = None
+	for match in _JSON_HEADER_TOKEN_PATTERN.finditer(header):
+		token = match.group()
+		first = token[0]
+		if first == 0x22:  # '"'
+			if expectValueFor == b'"description"':
+				try:
+					value = json.loads(token)
+				except ValueError:
+					return None
+				return value if isinstance(value, str) else None
+			lastString = token
+			expectValueFor = None
+		elif first == 0x3A:  # ':'
+			expectValueFor = lastString if depth == 1 else None
+			lastString = None
+		else:
+			if first in b'{[':
+				depth += 1
+			elif first in b'}]':
+				depth -= 1
+				if depth <= 0:
+					return None
+			lastString = None
+			expectValueFor = None
+	return None
+
+
+def _readJsonHeader(filePath: FilePathTpl, pool: ArchiveFilePool) -> bytes:
+	with openBinaryFile(filePath, pool) as file:
+		return file.read(_MAX_DOCUMENTATION_HEADER_BYTES)
+
+
 @dataclass
 class FunctionMeta(MetaInfo):
+	_documentation: Optional[MDStr] = field(default=None, repr=False, compare=False)
 
-	@CachedProperty
+	@property
 	def documentation(self) -> MDStr:
 		"""
 		TODO: add documentation for Formatting of MCFunction Documentation
@@ -30,72 +131,43 @@ class FunctionMeta(MetaInfo):
 			Called by: a comma-separated list of other functions that call this function
 		:return:
 		"""
+		if self._documentation is None:
+			with ZipFilePool() as pool:
+				self.extractDocumentation(pool)
+		return self._documentation
+
+	def extractDocumentation(self, pool: ArchiveFilePool) -> None:
 		lines: list[str] = []
 		try:
-			with ZipFilePool() as pool:
-				file = loadTextFile(self.filePath, pool)
-				lines = file.splitlines()
-		except OSError as e:
+			lines = _readFunctionHeader(self.filePath, pool)
+		except (OSError, KeyError) as e:
 			logError(e)
-
-		doc = []
-		whiteSpaces = 999  # way too many
-		for line in lines:
-			if not line.startswith('#'):
-				break
-
-			# remove '#':
-			line = line[1:]
-			# remove leading whiteSpaces:
-			line2 = line.lstrip()
-			if line2:
-				whiteSpaces = min(whiteSpaces, len(line) - len(line2))
-				line2 = line[whiteSpaces:]
-			line = line2
-			del line2
-
-			# handle special parameters:
-			if line.startswith('Desc:'):
-				doc.append('<b>Description:</b>' + line[len('Desc:'):])
-			elif line.startswith('Called by:'):
-				line2 = line[len('Called by:'):]
-				functions = line2.split(',')
-
-				doc.append('<b>Called by:</b>')
-				for f in functions:
-					f = f.strip()
-					f = unescapeFromXml(f)
-					f = escapeForXmlAttribute(f)
-					doc.append(f'* [`{f}`](@dpe.function:{f})')
-			else:
-				doc.append(line)
-
-		return MDStr('\n'.join(doc))
+		self._documentation = _formatFunctionDocumentation(lines) if lines else _NO_DOCUMENTATION
 
 
 @dataclass
 class JsonMeta(MetaInfo):
 	schemaId: str = ''
+	_documentation: Optional[MDStr] = field(default=None, repr=False, compare=False)
 
-	@CachedProperty
+	@property
 	def documentation(self) -> MDStr:
-		try:
+		if self._documentation is None:
 			with ZipFilePool() as pool:
-				file = loadBinaryFile(self.filePath, pool)
-		except OSError as e:
-			logError(e)
-			return MDStr('')
+				self.extractDocumentation(pool)
+		return self._documentation
 
-		from corePlugins.json import JSON_ID
-		json, errors, _ = parse(file, filePath=self.filePath, language=JSON_ID, schema=None)
+	def extractDocumentation(self, pool: ArchiveFilePool) -> None:
+		description: Optional[str] = None
+		try:
+			description = _scanJsonDescription(_readJsonHeader(self.filePath, pool))
+		except (OSError, KeyError) as e:
+			logError(e)
+		self._documentation = MDStr(description) if description else _NO_DOCUMENTATION
 
-		from corePlugins.json.core import JsonObject, JsonString
-		if json is not None and isinstance(json, JsonObject):
-			description = json.data.get('description')
-			if description is not None and isinstance(description.value, JsonString):
-				return MDStr(description.value.data)
 
-		return MDStr('')
+_NO_DOCUMENTATION = MDStr('')
+"""shared by all MetaInfos without documentation."""
 
 
 @dataclass
@@ -112,6 +184,20 @@ class DatapackContents(IndexBundleAspect):
 	resources: DeepIndex[ResourceLocation, MetaInfo] = field(default_factory=DeepIndex, init=False, metadata=dict(dpe=dict(isIndex=True)))
 
 
+_EMPTY_RESOURCES_INDEX: Index[ResourceLocation, MetaInfo] = Index()
+_EMPTY_RESOURCES_INDEX.freeze()
+
+
+def getResourcesIndex(root: Root, indexPath: str) -> Index[ResourceLocation, MetaInfo]:
+	"""
+	:return: the index of the resources at indexPath, or an empty index if root has no DatapackContents.
+	The DatapackContents are never added here, because outside of Root.updateIndices() indexBundles is a published snapshot.
+	"""
+	if (contents := root.indexBundles.get(DatapackContents)) is not None:
+		return contents.resources.getIndex(indexPath)
+	return _EMPTY_RESOURCES_INDEX
+
+
 def createMetaInfo(cls: Type[_TMetaInfo], filePath: FilePathTpl) -> _TMetaInfo:
 	return cls(filePath)
 
@@ -271,6 +357,7 @@ def getMetaInfo(fullPath: FilePathTpl, handlers: EntryHandlers) -> MetaInfo | No
 			return metaInfo
 
 
+@traced(TRACE_INDEX, file=lambda fullPath, *args, **kwargs: fullPath)
 def collectEntry(fullPath: FilePathTpl, handlers: EntryHandlers, root: Root, pool: ArchiveFilePool) -> None:
 	if (resLocHandler := getEntryHandlerForFile(fullPath, handlers)) is not None:
 		resLoc: ResourceLocation | None
@@ -278,8 +365,10 @@ def collectEntry(fullPath: FilePathTpl, handlers: EntryHandlers, root: Root, poo
 		resLoc, handler = resLocHandler
 		if resLoc is None:
 			return
-		metaInfo = handler.buildMetaInfo(fullPath)
 		if handler.getIndex is not None:
+			metaInfo = handler.buildMetaInfo(fullPath)
+			metaInfo.extractDocumentation(pool)
+			root.indexBundles.setdefault(DatapackContents)  # we are within Root.updateIndices().
 			handler.getIndex(root).add(resLoc, fullPath, metaInfo)
 
 
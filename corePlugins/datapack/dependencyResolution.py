@@ -0,0 +1,191 @@
+"""
+Resolves dependencies of datapacks to folders or zip files and caches the results between sessions.
+
+A resolution is cached together with the mtime of the resolved location and the mtimes of all search locations. Adding
+or removing a dependency in a search location changes the mtime of that location, so a cached resolution stays valid
+as long as none of these mtimes has changed. Otherwise, all candidate locations are probed concurrently, which mostly
+matters for search locations on network drives. Every resolution records why it was resolved where it was.
+"""
+from __future__ import annotations
+
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from time import perf_counter
+from typing import Callable, Iterable, Optional
+
+from base.model.pathUtils import normalizeDirSeparators
+from cat.utils import getExePath, openOrCreate
+from cat.utils.logging_ import logWarning
+
+_MISSING: int = -1
+"""the mtime of a path that does not exist."""
+
+_MAX_PROBING_THREADS: int = 8
+
+
+@dataclass
+class DependencyResolution:
+	identifier: str
+	location: Optional[str]
+	"""None, if the dependency could not be found."""
+	mtime: int
+	"""of location in ns"""
+	searchLocations: dict[str, int]
+	"""search location -> its mtime in ns at the time of the resolution"""
+	candidates: list[str]
+	"""all locations that were probed, in the order of their priority."""
+	alternatives: list[str]
+	"""other candidates that exist, but have a lower priority than location."""
+	duration: float
+	"""time spent probing in seconds"""
+	isFromCache: bool = field(default=False, compare=False)
+
+	@property
+	def isAmbiguous(self) -> bool:
+		return bool(self.alternatives)
+
+	@property
+	def explanation(self) -> str:
+		""":return: a short explanation of why the dependency was resolved to location (or why it is missing)."""
+		if self.location is None:
+			lines = [f"Not found. Probed {len(self.candidates)} locations:", *(f"  {c}" for c in self.candidates)]
+		elif self.location == self.identifier:
+			lines = [f"'{self.identifier}' is an existing path."]
+		else:
+			index = self.candidates.index(self.location) if self.location in self.candidates else -1
+			lines = [f"Found at '{self.location}' (candidate {index + 1} of {len(self.candidates)})."]
+			if index > 0:
+				lines += ["Not found at:", *(f"  {c}" for c in self.candidates[:index])]
+		if self.alternatives:
+			lines += ["Ambiguous, also found at (ignored):", *(f"  {c}" for c in self.alternatives)]
+		source = "cached" if self.isFromCache else "probed"
+		lines.append(f"({source}, probing took {self.duration * 1000:.1f} ms)")
+		return '\n'.join(lines)
+
+
+def _mtime(path: str) -> int:
+	try:
+		return os.stat(path).st_mtime_ns
+	except OSError:
+		return _MISSING
+
+
+def _getCandidates(name: str, searchLocations: Iterable[str]) -> list[str]:
+	candidates = []
+	for searchLocation in searchLocations:
+		path = normalizeDirSeparators(os.path.join(searchLocation, name))
+		candidates += (path, path + '.zip')
+	return candidates
+
+
+class DependencyResolver:
+	def __init__(self, filePath: Optional[str] = None):
+		self._filePath: Optional[str] = filePath
+		self._resolutions: Optional[dict[str, DependencyResolution]] = None
+		self._isDirty: bool = False
+		self._executor: Optional[ThreadPoolExecutor] = None
+
+	@property
+	def filePath(self) -> str:
+		if self._filePath is None:
+			self._filePath = os.path.join(os.path.dirname(getExePath()), 'caches', 'dependencyResolutions.json')
+		return self._filePath
+
+	@property
+	def resolutions(self) -> dict[str, DependencyResolution]:
+		if self._resolutions is None:
+			self._resolutions = self._load()
+		return self._resolutions
+
+	def _load(self) -> dict[str, DependencyResolution]:
+		try:
+			with open(self.filePath, 'r', encoding='utf-8') as f:
+				return {key: DependencyResolution(**value) for key, value in json.load(f).items()}
+		except FileNotFoundError:
+			return {}
+		except (OSError, ValueError, TypeError) as e:
+			logWarning(f"Unable to load dependency resolution cache '{self.filePath}': {e}")
+			return {}
+
+	def save(self) -> None:
+		"""writes the cache to disk, if it has changed."""
+		if not self._isDirty or self._resolutions is None:
+			return
+		data = {key: asdict(resolution) for key, resolution in self._resolutions.items()}
+		for value in data.values():
+			del value['isFromCache']
+		try:
+			with openOrCreate(self.filePath, 'w') as f:
+				json.dump(data, f, indent=1)
+		except OSError as e:
+			logWarning(f"Unable to save dependency resolution cache '{self.filePath}': {e}")
+		else:
+			self._isDirty = False
+
+	def clear(self) -> None:
+		self.resolutions.clear()
+		self._isDirty = True
+
+	def _map(self, func: Callable[[str], int], paths: list[str]) -> list[int]:
+		if len(paths) <= 1:
+			return list(map(func, paths))
+		if self._executor is None:
+			self._executor = ThreadPoolExecutor(_MAX_PROBING_THREADS, thread_name_prefix='dpe_dependency_probing')
+		return list(self._executor.map(func, paths))
+
+	def _isValid(self, resolution: DependencyResolution, searchLocations: list[str]) -> bool:
+		if list(resolution.searchLocations) != searchLocations:
+			return False
+		paths = list(searchLocations)
+		expected = list(resolution.searchLocations.values())
+		if resolution.location is not None:
+			paths.append(resolution.location)
+			expected.append(resolution.mtime)
+		elif '/' in resolution.identifier:
+			paths.append(resolution.identifier)  # a path that might have been created since.
+			expected.append(_MISSING)
+		return self._map(_mtime, paths) == expected
+
+	def resolve(self, name: str, searchLocations: list[str]) -> DependencyResolution:
+		"""
+		:param name: the name of the dependency, or a path to it.
+		:param searchLocations: the folders to search in, in the order of their priority.
+		"""
+		key = name
+		if (cached := self.resolutions.get(key)) is not None and self._isValid(cached, searchLocations):
+			cached.isFromCache = True
+			return cached
+
+		start = perf_counter()
+		candidates = _getCandidates(name, searchLocations)
+		if '/' in name:
+			candidates.insert(0, name)
+			candidates = list(dict.fromkeys(candidates))
+		mtimes = self._map(_mtime, [*searchLocations, *candidates])
+		searchLocationMtimes = dict(zip(searchLocations, mtimes))
+		found = [(candidate, mtime) for candidate, mtime in zip(candidates, mtimes[len(searchLocations):]) if mtime != _MISSING]
+		location, mtime = found[0] if found else (None, _MISSING)
+		resolution = DependencyResolution(
+			identifier=name,
+			location=location,
+			mtime=mtime,
+			searchLocations=searchLocationMtimes,
+			candidates=candidates,
+			alternatives=[candidate for candidate, _ in found[1:]],
+			duration=perf_counter() - start,
+		)
+		self.resolutions[key] = resolution
+		self._isDirty = True
+		return resolution
+
+
+DEPENDENCY_RESOLVER: DependencyResolver = DependencyResolver()
+
+
+__all__ = [
+	'DependencyResolution',
+	'DependencyResolver',
+	'DEPENDENCY_RESOLVER',
+]
@@ -1,8 +1,9 @@
 from __future__ import annotations
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from types import MappingProxyType
-from typing import Optional, Mapping, ClassVar
+from typing import Callable, Optional, Mapping, ClassVar
 
+from cat.utils import CachedProperty
 from base.model.parsing.schemaStore import GLOBAL_SCHEMA_STORE
 from .datapackContents import EntryHandlers
 from corePlugins.json.core import JsonSchema
@@ -14,8 +15,18 @@ from corePlugins.mcFunction.command import MCFunctionSchema
 class DPVersion:
 	name: str
 	structure: EntryHandlers
-	jsonSchemas: dict[str, JsonSchema]
-	mcFunctionSchema: MCFunctionSchema
+	buildJsonSchemas: Callable[[], dict[str, JsonSchema]]
+	buildMcFunctionSchema: Callable[[], MCFunctionSchema]
+	"""the schemas are only built when the version is activated for the first time."""
+	_isActive: bool = field(default=False, init=False, repr=False, compare=False)
+
+	@CachedProperty
+	def jsonSchemas(self) -> dict[str, JsonSchema]:
+		return self.buildJsonSchemas()
+
+	@CachedProperty
+	def mcFunctionSchema(self) -> MCFunctionSchema:
+		return self.buildMcFunctionSchema()
 
 	def getJsonSchema(self, name: str) -> Optional[JsonSchema]:
 		return GLOBAL_SCHEMA_STORE.get(name + ' ' + self.name, JsonSchema)
@@ -23,6 +34,7 @@ class DPVersion:
 	def activate(self) -> None:
 		self.activateJsonSchemas(self.jsonSchemas)
 		self.activateMcFunctionSchema(self.mcFunctionSchema)
+		self._isActive = True
 
 	def activateJsonSchemas(self, jsonSchemas: dict[str, JsonSchema]):
 		for name, schema in jsonSchemas.items():
@@ -35,6 +47,9 @@ class DPVersion:
 			GLOBAL_SCHEMA_STORE.registerSchema(MC_FUNCTION_DEFAULT_SCHEMA_ID, mcFunctionSchema)
 
 	def deactivate(self) -> None:
+		if not self._isActive:
+			return  # nothing has been registered, so there is no need to build the schemas.
+		self._isActive = False
 		self.deactivateJsonSchemas(self.jsonSchemas)
 		self.deactivateMcFunctionSchema(self.mcFunctionSchema)
 
@@ -42,18 +57,18 @@ class DPVersion:
 		for name, schema in jsonSchemas.items():
 			# schema = self.getJsonSchema(name)
 			if schema is not None:
-				if GLOBAL_SCHEMA_STORE.get(name, JsonSchema) is schema:
+				if GLOBAL_SCHEMA_STORE.getIfBuilt(name, JsonSchema) is schema:
 					GLOBAL_SCHEMA_STORE.unregisterSchema(name, JsonSchema)
 
 	def deactivateMcFunctionSchema(self, mcFunctionSchema: MCFunctionSchema):
 		if mcFunctionSchema is not None:
-			if GLOBAL_SCHEMA_STORE.get(MC_FUNCTION_DEFAULT_SCHEMA_ID, MCFunctionSchema) is mcFunctionSchema:
+			if GLOBAL_SCHEMA_STORE.getIfBuilt(MC_FUNCTION_DEFAULT_SCHEMA_ID, MCFunctionSchema) is mcFunctionSchema:
 				GLOBAL_SCHEMA_STORE.unregisterSchema(MC_FUNCTION_DEFAULT_SCHEMA_ID, MCFunctionSchema.language)
 
 	EMPTY: ClassVar[DPVersion]
 
 
-DPVersion.EMPTY = DPVersion('No Version', MappingProxyType({}), {}, MCFunctionSchema('', commands={}))
+DPVersion.EMPTY = DPVersion('No Version', MappingProxyType({}), dict, lambda: MCFunctionSchema('', commands={}))
 
 
 _ALL_DP_VERSIONS: dict[str, DPVersion] = {}
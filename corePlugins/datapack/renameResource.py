@@ -0,0 +1,313 @@
+"""
+Renaming of resources (functions, tags, predicates, ...) together with all references to them in the project.
+"""
+from __future__ import annotations
+
+import os
+import tempfile
+from dataclasses import dataclass, field
+from typing import Iterator, NamedTuple, Optional
+
+from base.model import filesystemEvents
+from base.model.documents import Document, getDocumentTypeForFilePath, loadDocument
+from base.model.parsing.tree import Node
+from base.model.pathUtils import FilePathTpl, ZipFilePool, loadBinaryFile, unitePath
+from base.model.project.project import ProjectRoot, Root
+from base.model.session import getSession
+from base.model.utils import Span
+from basePlugins.projectFiles import FilesIndex
+from cat.utils.profiling import logError
+from corePlugins.minecraft.resourceLocation import ResourceLocationContext, ResourceLocationNode, ResourceLocationSchema, getResourceLocationContext
+from corePlugins.minecraft_data.resourceLocation import ResourceLocation, isNamespaceValid, isPathValid
+from .aspect import DatapackAspect
+from .datapackContents import NAME_SPACE_VAR, EntryHandlerInfo, getEntryHandlerForFile
+
+_EMBEDDED_NODE_ATTRIBUTES: tuple[str, ...] = ('value', 'parsedValue')
+"""attributes of nodes that can contain nodes which are not listed in Node.children (e.g. the value of a command argument)."""
+
+
+class TextEdit(NamedTuple):
+	filePath: FilePathTpl
+	span: Span
+	replacement: bytes
+
+
+@dataclass
+class ResourceRenamePlan:
+	"""everything that has to be changed to rename a resource. Nothing is changed until it is applied."""
+	oldLocation: ResourceLocation
+	newLocation: ResourceLocation
+	oldFilePath: FilePathTpl
+	newFilePath: FilePathTpl
+	edits: list[TextEdit] = field(default_factory=list)
+	skippedFiles: list[FilePathTpl] = field(default_factory=list)
+	"""files that might reference the resource, but could not be read."""
+
+	@property
+	def editedFiles(self) -> dict[FilePathTpl, list[TextEdit]]:
+		result: dict[FilePathTpl, list[TextEdit]] = {}
+		for edit in self.edits:
+			result.setdefault(edit.filePath, []).append(edit)
+		return result
+
+
+def _getRoot(filePath: FilePathTpl) -> Optional[Root]:
+	for root in getSession().project.allRoots:
+		if root.normalizedLocation == filePath[0].rstrip('/'):
+			return root
+	return None
+
+
+def _getEntryHandler(filePath: FilePathTpl) -> Optional[tuple[ResourceLocation, EntryHandlerInfo]]:
+	if (dpAspect := getSession().project.aspects.get(DatapackAspect)) is None:
+		return None
+	if (resLocHandler := getEntryHandlerForFile(filePath, dpAspect.dpVersionData.structure)) is None or resLocHandler[0] is None:
+		return None
+	return resLocHandler
+
+
+def getResourceLocationForFile(filePath: FilePathTpl) -> Optional[ResourceLocation]:
+	""":return: the resource location of the resource defined by the file, or None if the file is not a resource."""
+	resLocHandler = _getEntryHandler(filePath)
+	return resLocHandler[0] if resLocHandler is not None else None
+
+
+def iterResourceLocationNodes(tree: Node) -> Iterator[ResourceLocationNode]:
+	"""yields all ResourceLocationNodes in tree, including those inside of command arguments and json strings."""
+	seen: set[int] = set()
+	stack: list[Node] = [tree]
+	while stack:
+		node = stack.pop()
+		if id(node) in seen:
+			continue
+		seen.add(id(node))
+		if isinstance(node, ResourceLocationNode):
+			yield node
+			continue
+		stack.extend(node.children)
+		for attr in _EMBEDDED_NODE_ATTRIBUTES:
+			if isinstance(value := getattr(node, attr, None), Node):
+				stack.append(value)
+
+
+def _referencesIndex(node: ResourceLocationNode, root: Root, index: object, isTag: bool) -> bool:
+	""":return: True, if the context of node looks up its values (or tags) in index."""
+	if not isinstance(ctx := getResourceLocationContext(node.schema.name), ResourceLocationContext):
+		return False
+	indices = ctx.tagsFromDP(root) if isTag else ctx.valuesFromDP(root)
+	return any(i is index for i in indices)
+
+
+def _isReferenceTo(node: ResourceLocationNode, location: ResourceLocation) -> bool:
+	if not isinstance(node.schema, ResourceLocationSchema):
+		return False
+	# arguments that only accept tags may omit the '#':
+	return ResourceLocation(node.namespace, node.path, node.isTag or node.schema.onlyTags) == location
+
+
+def _formatReplacement(written: bytes, node: ResourceLocationNode, newLocation: ResourceLocation) -> bytes:
+	# keep the style of the original reference, i.e. whether it has a '#' and whether it has a namespace:
+	newLocation = ResourceLocation(newLocation.actualNamespace, newLocation.path, written.startswith(b'#'))
+	text = newLocation.asCompactString if node.namespace is None else newLocation.asQualifiedString
+	return text.encode('utf-8')
+
+
+def _loadTree(filePath: FilePathTpl, pool: ZipFilePool) -> tuple[Optional[Node], bytes]:  # throws OSError
+	if (document := getSession().documents.getDocument(filePath)) is None:
+		document = loadDocument(filePath, pool, observeFileSystem=False)
+	if document.tree is None:
+		document.asyncParse.callNow()
+	return document.tree, document.content
+
+
+def _filesMentioning(text: bytes, pool: ZipFilePool, skippedFiles: list[FilePathTpl]) -> Iterator[FilePathTpl]:
+	"""
+	yields all files of the project roots that can be opened as a document and contain text. The references index only
+	knows files that have been validated, so all files have to be searched. Reading them is a lot cheaper than parsing.
+	"""
+	for root in getSession().project.roots:
+		if (filesIndex := root.indexBundles.get(FilesIndex)) is None:
+			continue
+		for fileEntry in filesIndex.files.values():
+			filePath = fileEntry.fullPath
+			if getDocumentTypeForFilePath(filePath) is None:
+				continue
+			try:
+				content = loadBinaryFile(filePath, pool)
+			except OSError as e:
+				logError(e)
+				skippedFiles.append(filePath)
+				continue
+			if text in content:
+				yield filePath
+
+
+def planResourceRename(oldFilePath: FilePathTpl, newLocation: ResourceLocation) -> ResourceRenamePlan:
+	"""
+	finds all references to the resource defined by oldFilePath that need to change if it is renamed to newLocation.
+	References are looked up in all opened documents and in all files of the project that contain the path of the
+	resource, whether they have been validated or not.
+	:raises ValueError: if oldFilePath is not a resource of a project root or newLocation is not valid.
+	"""
+	if not isNamespaceValid(newLocation.actualNamespace) or not isPathValid(newLocation.path):
+		raise ValueError(f"Not a valid resource location: '{newLocation.asString}'")
+	if (resLocHandler := _getEntryHandler(oldFilePath)) is None:
+		raise ValueError(f"Not a resource: '{unitePath(oldFilePath)}'")
+	oldLocation, handler = resLocHandler
+	root = _getRoot(oldFilePath)
+	if not isinstance(root, ProjectRoot) or handler.getIndex is None:
+		raise ValueError(f"Not a resource of the project: '{unitePath(oldFilePath)}'")
+	newLocation = ResourceLocation(newLocation.actualNamespace, newLocation.path, oldLocation.isTag)
+	folder = handler.folder.replace(NAME_SPACE_VAR, newLocation.actualNamespace)
+	plan = ResourceRenamePlan(
+		oldLocation=oldLocation,
+		newLocation=newLocation,
+		oldFilePath=oldFilePath,
+		newFilePath=(oldFilePath[0], f'{folder}{newLocation.path}{handler.extension}'),
+	)
+
+	session = getSession()
+	index = handler.getIndex(root)
+	with ZipFilePool() as pool:
+		candidates: dict[FilePathTpl, None] = {}  # an ordered set
+		# opened documents might have unsaved changes, so they are always searched:
+		candidates.update(dict.fromkeys(doc.filePath for doc in session.documents.allOpenedDocuments() if isinstance(doc.filePath, tuple)))
+		candidates.update(dict.fromkeys(_filesMentioning(oldLocation.path.encode('utf-8'), pool, plan.skippedFiles)))
+		for filePath in candidates:
+			if not isinstance(fileRoot := _getRoot(filePath), ProjectRoot):
+				continue  # files of dependencies cannot be changed.
+			try:
+				tree, content = _loadTree(filePath, pool)
+			except OSError as e:
+				logError(e)
+				plan.skippedFiles.append(filePath)
+				continue
+			if tree is None:
+				continue
+			for node in iterResourceLocationNodes(tree):
+				if not _isReferenceTo(node, oldLocation) or not _referencesIndex(node, fileRoot, index, oldLocation.isTag):
+					continue
+				span = node.span
+				written = content[span.start.index:span.end.index]
+				if written.removeprefix(b'#').decode('utf-8', errors='replace') != ResourceLocation(node.namespace, node.path, False).asString:
+					continue  # the reference is escaped somehow, e.g. inside a json string. better leave it alone.
+				plan.edits.append(TextEdit(filePath, span, _formatReplacement(written, node, newLocation)))
+	return plan
+
+
+def applyTextEdits(content: bytes, edits: list[TextEdit]) -> bytes:
+	parts: list[bytes] = []
+	end = len(content)
+	for edit in sorted(edits, key=lambda e: e.span.start.index, reverse=True):
+		start, stop = edit.span.start.index, edit.span.end.index
+		if stop > end:
+			raise ValueError(f"overlapping edits at {edit.span.start}")
+		parts.append(content[stop:end])
+		parts.append(edit.replacement)
+		end = start
+	parts.append(content[:end])
+	return b''.join(reversed(parts))
+
+
+def _writeTempFile(targetPath: str, content: bytes | str, encoding: Optional[str] = None) -> str:
+	"""writes content to a new temporary file next to targetPath. str content is written in text mode, like Document.saveToFile() does."""
+	fd, tempPath = tempfile.mkstemp(prefix='.dpe-', suffix='.tmp', dir=os.path.dirname(targetPath))
+	try:
+		with (os.fdopen(fd, 'w', encoding=encoding) if isinstance(content, str) else os.fdopen(fd, 'wb')) as f:
+			f.write(content)
+	except BaseException:
+		os.unlink(tempPath)
+		raise
+	return tempPath
+
+
+def _missingDirs(dirPath: str) -> list[str]:
+	""":return: all directories that have to be created for dirPath to exist, outermost first."""
+	missing: list[str] = []
+	while dirPath and not os.path.isdir(dirPath):
+		missing.append(dirPath)
+		dirPath = os.path.dirname(dirPath)
+	missing.reverse()
+	return missing
+
+
+def applyResourceRename(plan: ResourceRenamePlan) -> None:
+	"""
+	applies all edits of plan and moves the resource file, as one transaction: if anything fails, all files on disk are
+	restored. Opened documents are changed in memory (and can be undone), closed files are written via temporary files
+	that replace the originals atomically. File system events are held back until everything is done.
+	:raises OSError: if the transaction failed. Nothing has been changed in that case.
+	"""
+	session = getSession()
+	oldPath = unitePath(plan.oldFilePath)
+	newPath = unitePath(plan.newFilePath)
+	if os.path.exists(newPath):
+		raise FileExistsError(f"A file with that name already exists: '{newPath}'")
+
+	openEdits: list[tuple[Document, list[TextEdit]]] = []
+	closedEdits: list[tuple[FilePathTpl, list[TextEdit]]] = []
+	for filePath, edits in plan.editedFiles.items():
+		if (document := session.documents.getDocument(filePath)) is not None:
+			openEdits.append((document, edits))
+		else:
+			closedEdits.append((filePath, edits))
+
+	with filesystemEvents.FILESYSTEM_OBSERVER.holdEvents():
+		# 1. prepare everything that can fail without changing anything:
+		staged: list[tuple[str, str, bytes]] = []  # (tempPath, targetPath, originalContent)
+		createdDirs: list[str] = []
+		try:
+			with ZipFilePool() as pool:
+				for filePath, edits in closedEdits:
+					path = unitePath(filePath)
+					with open(path, 'rb') as f:
+						original = f.read()
+					# the spans refer to the content of the document (with normalized line breaks), not to the raw bytes:
+					document = loadDocument(filePath, pool, observeFileSystem=False)
+					newContent = str(applyTextEdits(document.content, edits), encoding=document.encoding, errors='replace')
+					staged.append((_writeTempFile(path, newContent, document.encoding), path, original))
+			for dirPath in _missingDirs(os.path.dirname(newPath)):
+				os.mkdir(dirPath)
+				createdDirs.append(dirPath)
+		except (OSError, ValueError) as e:
+			for tempPath, _, _ in staged:
+				os.unlink(tempPath)
+			for dirPath in reversed(createdDirs):
+				os.rmdir(dirPath)
+			raise OSError(f"Cannot rename '{plan.oldLocation.asString}': {e}") from e
+
+		# 2. commit:
+		committed: list[tuple[str, bytes]] = []
+		try:
+			for tempPath, path, original in staged:
+				os.replace(tempPath, path)
+				committed.append((path, original))
+			os.rename(oldPath, newPath)
+		except OSError as e:
+			for tempPath, path, _ in staged[len(committed):]:
+				if os.path.exists(tempPath):
+					os.unlink(tempPath)
+			for path, original in committed:
+				os.replace(_writeTempFile(path, original), path)
+			for dirPath in reversed(createdDirs):
+				os.rmdir(dirPath)
+			raise OSError(f"Cannot rename '{plan.oldLocation.asString}': {e}") from e
+
+	# 3. opened documents (each change is a normal, undoable edit):
+	for document, edits in openEdits:
+		document.content = applyTextEdits(document.content, edits)
+	if (document := session.documents.getDocument(plan.oldFilePath)) is not None:
+		document.filePath = plan.newFilePath
+		document._resetFileSystemChanged()
+		session.documents.emitDocumentChanged(document)
+
+
+__all__ = [
+	'TextEdit',
+	'ResourceRenamePlan',
+	'getResourceLocationForFile',
+	'iterResourceLocationNodes',
+	'planResourceRename',
+	'applyTextEdits',
+	'applyResourceRename',
+]
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+from base.model.pathUtils import FilePath, unitePath
+from base.model.session import getSession
+from cat.GUI.pythonGUI import MenuItemData
+from corePlugins.minecraft_data.resourceLocation import ResourceLocation, isNamespaceValid, isPathValid
+from gui.datapackEditorGUI import DatapackEditorGUI, fileContextMenuProvider
+from .renameResource import ResourceRenamePlan, applyResourceRename, getResourceLocationForFile, planResourceRename
+
+_MAX_PREVIEWED_FILES: int = 20
+
+
+@fileContextMenuProvider('dpe:rename_resource')
+def _renameResourceMenuItems(filePath: FilePath, gui: DatapackEditorGUI) -> list[MenuItemData]:
+	if not isinstance(filePath, tuple) or getResourceLocationForFile(filePath) is None:
+		return []
+	return [('rename Resource...', lambda: renameResourceGUI(filePath, gui))]
+
+
+def _formatPlan(plan: ResourceRenamePlan) -> str:
+	editedFiles = plan.editedFiles
+	lines = [
+		f"`{plan.oldLocation.asString}` will be renamed to `{plan.newLocation.asString}`.",
+		f"{len(plan.edits)} references in {len(editedFiles)} files will be changed:",
+		'',
+	]
+	lines.extend(f"- {unitePath(filePath)} ({len(edits)})" for filePath, edits in list(editedFiles.items())[:_MAX_PREVIEWED_FILES])
+	if len(editedFiles) > _MAX_PREVIEWED_FILES:
+		lines.append(f"- ... and {len(editedFiles) - _MAX_PREVIEWED_FILES} more")
+	if plan.skippedFiles:
+		lines.append('')
+		lines.append(f"{len(plan.skippedFiles)} files could not be read and will not be changed.")
+	return '\n'.join(lines)
+
+
+def renameResourceGUI(filePath: tuple[str, str], gui: DatapackEditorGUI) -> None:
+	oldLocation = getResourceLocationForFile(filePath)
+	if oldLocation is None:
+		return
+	oldString = ResourceLocation(oldLocation.actualNamespace, oldLocation.path, False).asString
+	newString, isOk = gui.askUserInput(f"rename '{oldLocation.asString}'", oldString)
+	if not isOk or not newString or newString == oldString:
+		return
+	namespace, path, _ = ResourceLocation.splitString(newString.strip().removeprefix('#'))
+	if (namespace is not None and not isNamespaceValid(namespace)) or not isPathValid(path):
+		getSession().showAndLogError(ValueError(
+			f"Not a valid resource location: '{newString}'.\n"
+			f"Namespace and path must only contain numbers (0-9), lowercase letters (a-z), underscore (_), hyphen/minus (-) and dot (.).\n"
+			f"The path must not be empty and can additionally contain forward slashes (/) between its folders."
+		), "Cannot rename resource")
+		return
+	newLocation = ResourceLocation(namespace, path, False)
+	try:
+		plan = planResourceRename(filePath, newLocation)
+	except ValueError as e:
+		getSession().showAndLogError(e, "Cannot rename resource")
+		return
+	if not gui.askUser(f"rename '{oldLocation.asString}'?", _formatPlan(plan)):
+		return
+	try:
+		applyResourceRename(plan)
+	except OSError as e:
+		getSession().showAndLogError(e, "Cannot rename resource")
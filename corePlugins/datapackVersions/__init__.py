@@ -1,5 +1,7 @@
+from functools import cache
+
 from base.model.defaultSchemaProvider import SchemaMapping
-from base.model.parsing.tree import Schema
+from base.model.parsing.schemaStore import LazySchema
 from base.model.utils import LanguageId
 from base.plugin import PLUGIN_SERVICE, PluginBase
 
@@ -17,6 +19,7 @@ class DatapackVersionsPlugin(PluginBase):
 		version23.initVersion()
 		from .commands import argumentContextsImpl
 		from .commands import argumentStylers
+		from .commands import argumentNormalizers
 
 	def dependencies(self) -> set[str]:
 		return {'DatapackPlugin', 'JsonPlugin', 'NbtPlugin', 'DatapackPlugin', 'MinecraftPlugin', 'McFunctionPlugin'}
@@ -96,13 +99,27 @@ class DatapackVersionsPlugin(PluginBase):
 		from corePlugins.json import JSON_ID
 		return {JSON_ID: mappings}
 
-	def schemas(self) -> dict[str, Schema]:
-		schemas = {}
+	def lazySchemas(self) -> dict[str, LazySchema]:
+		# legacy way of doing it. The command trees are huge, so they are only built when requested.
+		from corePlugins.mcFunction import MC_FUNCTION_ID
+		return {
+			name: LazySchema(MC_FUNCTION_ID, lambda n=name, b=build: b().get(n))
+			for build, names in [
+				(_buildMCFunctionSchemas_1_20_2, ['Minecraft 1.20.2']),
+				(_buildMCFunctionSchemas_1_20_3, ['Minecraft 23w44a', 'Minecraft 23w46a', 'Minecraft 1.20.3-rc1', 'Minecraft 1.20.3']),
+			]
+			for name in names
+		}
+
+
+@cache
+def _buildMCFunctionSchemas_1_20_2():
+	from corePlugins.datapackVersions.commands.v1_20_2_schema import buildMCFunctionSchemas
+	return buildMCFunctionSchemas()
 
-		from corePlugins.datapackVersions.commands.v1_20_2_schema import buildMCFunctionSchemas as buildMCFunctionSchemas_1_20_2
-		from corePlugins.datapackVersions.commands.v1_20_3_schema import buildMCFunctionSchemas as buildMCFunctionSchemas_1_20_3
 
-		schemas |= buildMCFunctionSchemas_1_20_2()  # legacy way of doing it.
-		schemas |= buildMCFunctionSchemas_1_20_3()  # legacy way of doing it.
-		return schemas
+@cache
+def _buildMCFunctionSchemas_1_20_3():
+	from corePlugins.datapackVersions.commands.v1_20_3_schema import buildMCFunctionSchemas
+	return buildMCFunctionSchemas()
 
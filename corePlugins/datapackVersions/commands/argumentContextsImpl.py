@@ -20,9 +20,10 @@ from corePlugins.minecraft_data.fullData import getCurrentFullMcData
 from corePlugins.nbt import SNBT_ID
 from corePlugins.nbt.path import NBTPathSchema, SNBT_PATH_ID
 from corePlugins.nbt.tags import NBTTagSchema
-from .argumentParsersImpl import _parseVec, _readResourceLocation, tryReadNBTCompoundTag
+from .argumentParsersImpl import _parseVec, _readResourceLocation, readNBTTag, tryReadNBTCompoundTag
 from .argumentTypes import *
 from .argumentValues import BlockState, FilterArguments, ItemStack, TargetSelector
+from .nbtPathShapes import suggestNBTPathKeys, validateNBTPathShape
 from .filterArgs import FilterArgOptions, clickableRangesForFilterArgs, onIndicatorClickedForFilterArgs, parseFilterArgsLike, suggestionsForFilterArgs, validateFilterArgs
 from .targetSelector import TARGET_SELECTOR_ARG_OPTIONS
 
@@ -477,6 +478,15 @@ class NbtPathHandler(ParsingHandler):
 	def getParserKwArgs(self, ai: ArgumentSchema) -> dict[str, Any]:
 		return dict(ignoreTrailingChars=True)
 
+	def validate(self, node: ParsedArgument, errorsIO: list[GeneralError]) -> None:
+		super(NbtPathHandler, self).validate(node, errorsIO)
+		validateNBTPathShape(node, errorsIO)
+
+	def getSuggestions2(self, ai: ArgumentSchema, node: Optional[ParsedArgument], pos: Position, replaceCtx: str) -> Suggestions:
+		if node is None:
+			return []
+		return suggestNBTPathKeys(node, pos)
+
 
 @argumentContext(MINECRAFT_NBT_COMPOUND_TAG.name)
 @argumentContext(MINECRAFT_NBT_TAG.name)
@@ -490,6 +500,11 @@ class NbtTagHandler(ParsingHandler):
 	def getParserKwArgs(self, ai: ArgumentSchema) -> dict[str, Any]:
 		return dict(ignoreTrailingChars=True)
 
+	def parse(self, sr: StringReader, ai: ArgumentSchema, filePath: FilePath, *, errorsIO: list[GeneralError]) -> Optional[ParsedArgument]:
+		data = readNBTTag(sr, filePath, errorsIO=errorsIO)
+		if data is not None:
+			return makeParsedArgument(sr, ai, value=data)
+
 
 @argumentContext(MINECRAFT_OBJECTIVE.name)
 class ObjectiveHandler(ArgumentContext):
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import re
+from typing import Hashable, Iterable, Optional
+
+from base.model.parsing.tree import Node
+from corePlugins.mcFunction.command import ParsedArgument
+from corePlugins.mcFunction.formatter import McFunctionFormatRules, argumentMeaning, argumentNormalizer, getArgumentMeaning, normalizeArgument
+from corePlugins.nbt.tags import BasicDataTag, CompoundTag, InvalidTag, NBTTag, StringTag
+from .argumentTypes import *
+from .argumentValues import BlockState, FilterArguments, ItemStack, TargetSelector
+
+_ZERO_COORDINATE_PATTERN: re.Pattern[bytes] = re.compile(rb'([~^])[-+]?0*(?:\.0*)?')
+
+
+@argumentNormalizer(MINECRAFT_BLOCK_POS.name)
+@argumentNormalizer(MINECRAFT_COLUMN_POS.name)
+@argumentNormalizer(MINECRAFT_ROTATION.name)
+@argumentNormalizer(MINECRAFT_VEC2.name)
+@argumentNormalizer(MINECRAFT_VEC3.name)
+def normalizeCoordinates(argument: ParsedArgument, rules: McFunctionFormatRules) -> Optional[bytes]:
+	if not rules.normalizeCoordinates:
+		return None
+	coordinates = argument.content.split()
+	return b' '.join(
+		match.group(1) if (match := _ZERO_COORDINATE_PATTERN.fullmatch(coordinate)) is not None else coordinate
+		for coordinate in coordinates
+	)
+
+
+@argumentMeaning(MINECRAFT_BLOCK_POS.name)
+@argumentMeaning(MINECRAFT_COLUMN_POS.name)
+@argumentMeaning(MINECRAFT_ROTATION.name)
+@argumentMeaning(MINECRAFT_VEC2.name)
+@argumentMeaning(MINECRAFT_VEC3.name)
+def coordinatesMeaning(argument: ParsedArgument) -> Optional[Hashable]:
+	meaning = []
+	for coordinate in argument.content.split():
+		prefix = coordinate[:1] if coordinate[:1] in (b'~', b'^') else b''
+		number = coordinate[len(prefix):]
+		try:
+			meaning.append((prefix, float(number) if number else 0.))
+		except ValueError:
+			return None
+	return tuple(meaning)
+
+
+@argumentNormalizer(MINECRAFT_ENTITY.name)
+@argumentNormalizer(MINECRAFT_GAME_PROFILE.name)
+@argumentNormalizer(MINECRAFT_SCORE_HOLDER.name)
+def normalizeTargetSelector(argument: ParsedArgument, rules: McFunctionFormatRules) -> Optional[bytes]:
+	selector = argument.value
+	if not rules.normalizeTargetSelectors or not isinstance(selector, TargetSelector):
+		return None
+	parts: list[bytes] = []
+	for filterArg in selector.arguments.values():
+		if filterArg.value is None:
+			return None
+		parts.append(filterArg.key.content + (b'=!' if filterArg.isNegated else b'=') + normalizeArgument(filterArg.value, rules))
+	variable = selector.variable.encode()
+	return variable + b'[' + b','.join(parts) + b']' if parts else variable
+
+
+def _filterArgumentsMeaning(arguments: FilterArguments) -> Optional[Hashable]:
+	meaning = []
+	for filterArg in arguments.values():
+		if filterArg.value is None:
+			return None
+		meaning.append((filterArg.key.content, filterArg.isNegated, getArgumentMeaning(filterArg.value)))
+	return tuple(meaning)
+
+
+@argumentMeaning(MINECRAFT_ENTITY.name)
+@argumentMeaning(MINECRAFT_GAME_PROFILE.name)
+@argumentMeaning(MINECRAFT_SCORE_HOLDER.name)
+def targetSelectorMeaning(argument: ParsedArgument) -> Optional[Hashable]:
+	selector = argument.value
+	if not isinstance(selector, TargetSelector) or (arguments := _filterArgumentsMeaning(selector.arguments)) is None:
+		return None
+	return selector.variable, arguments
+
+
+def _preferredQuote(data: str) -> str:
+	return "'" if data.count('"') > data.count("'") else '"'
+
+
+def _requoteString(tag: StringTag) -> Optional[bytes]:
+	""":return: tag with the preferred quotes, or None if it already uses them or is not quoted at all."""
+	raw = tag.raw
+	if not raw or raw[0] not in b'"\'':
+		return None
+	quote = _preferredQuote(tag.data)
+	if raw[0] == ord(quote):
+		return None
+	return (quote + tag.data.replace('\\', '\\\\').replace(quote, '\\' + quote) + quote).encode()
+
+
+def _iterStringTags(tag: Node) -> Iterable[StringTag]:
+	if isinstance(tag, StringTag):
+		yield tag
+	else:
+		for child in tag.children:
+			yield from _iterStringTags(child)
+
+
+def _normalizeNbtQuotes(argument: ParsedArgument, nbt: Optional[NBTTag], rules: McFunctionFormatRules) -> Optional[bytes]:
+	if not rules.normalizeNbtQuotes or nbt is None:
+		return None
+	content = argument.content
+	start = argument.span.start.index
+	# the spans of the tags are only usable, if the argument is not split by line continuations:
+	if argument.source[start:argument.span.end.index] != content:
+		return None
+	parts: list[bytes] = []
+	lastEnd = 0
+	for tag in _iterStringTags(nbt):
+		if (requoted := _requoteString(tag)) is not None:
+			parts += (content[lastEnd:tag.span.start.index - start], requoted)
+			lastEnd = tag.span.end.index - start
+	if not parts:
+		return None
+	parts.append(content[lastEnd:])
+	return b''.join(parts)
+
+
+@argumentNormalizer(MINECRAFT_NBT_COMPOUND_TAG.name)
+@argumentNormalizer(MINECRAFT_NBT_TAG.name)
+def normalizeNbtTag(argument: ParsedArgument, rules: McFunctionFormatRules) -> Optional[bytes]:
+	return _normalizeNbtQuotes(argument, argument.value if isinstance(argument.value, NBTTag) else None, rules)
+
+
+def _nbtMeaning(tag: NBTTag) -> Hashable:
+	if isinstance(tag, CompoundTag):
+		return CompoundTag, tuple((prop.key.data, _nbtMeaning(prop.value)) for prop in tag.data.values())
+	if isinstance(tag, InvalidTag | BasicDataTag):
+		return type(tag), tag.data
+	# lists and arrays:
+	return type(tag), tuple(_nbtMeaning(child) for child in tag.children)
+
+
+@argumentMeaning(MINECRAFT_NBT_COMPOUND_TAG.name)
+@argumentMeaning(MINECRAFT_NBT_TAG.name)
+def nbtTagMeaning(argument: ParsedArgument) -> Optional[Hashable]:
+	return _nbtMeaning(argument.value) if isinstance(argument.value, NBTTag) else None
+
+
+@argumentNormalizer(MINECRAFT_BLOCK_PREDICATE.name)
+@argumentNormalizer(MINECRAFT_BLOCK_STATE.name)
+@argumentNormalizer(MINECRAFT_ITEM_PREDICATE.name)
+@argumentNormalizer(MINECRAFT_ITEM_STACK.name)
+def normalizeBlockOrItemNbt(argument: ParsedArgument, rules: McFunctionFormatRules) -> Optional[bytes]:
+	value = argument.value
+	return _normalizeNbtQuotes(argument, value.nbt if isinstance(value, BlockState | ItemStack) else None, rules)
+
+
+@argumentMeaning(MINECRAFT_BLOCK_PREDICATE.name)
+@argumentMeaning(MINECRAFT_BLOCK_STATE.name)
+def blockStateMeaning(argument: ParsedArgument) -> Optional[Hashable]:
+	value = argument.value
+	if not isinstance(value, BlockState) or (states := _filterArgumentsMeaning(value.states)) is None:
+		return None
+	return value.blockId.asString, states, _nbtMeaning(value.nbt) if value.nbt is not None else None
+
+
+@argumentMeaning(MINECRAFT_ITEM_PREDICATE.name)
+@argumentMeaning(MINECRAFT_ITEM_STACK.name)
+def itemStackMeaning(argument: ParsedArgument) -> Optional[Hashable]:
+	value = argument.value
+	if not isinstance(value, ItemStack):
+		return None
+	return value.itemId.asString, _nbtMeaning(value.nbt) if value.nbt is not None else None
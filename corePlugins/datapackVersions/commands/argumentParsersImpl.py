@@ -6,6 +6,7 @@ from corePlugins.mcFunction.command import ArgumentSchema, ParsedArgument
 from corePlugins.mcFunction.commandContext import makeParsedArgument
 from corePlugins.mcFunction.stringReader import StringReader
 from corePlugins.nbt import SNBT_ID
+from corePlugins.nbt.literalCache import SNBT_LITERAL_CACHE, findSNBTLiteralEnd
 from corePlugins.minecraft.resourceLocation import ResourceLocationSchema, ResourceLocationNode
 from corePlugins.nbt.tags import NBTTag, CompoundTag, NBTTagSchema
 from base.model.pathUtils import FilePath
@@ -43,15 +44,32 @@ def _parseVec(sr: StringReader, ai: ArgumentSchema, *, count: int, useFloat: boo
 	return makeParsedArgument(sr, ai, value=tuple(vec))
 
 
+def readNBTTag(sr: StringReader, filePath: FilePath, *, errorsIO: list[GeneralError]) -> Optional[NBTTag]:
+	"""
+	Parses an SNBT tag. Error-free compound and list literals are looked up in / stored in the SNBT_LITERAL_CACHE,
+	so repeated literals are not parsed again.
+	"""
+	start = sr.cursor
+	end = findSNBTLiteralEnd(sr.text, start) if sr.indexMapper.isIdentity else -1
+	if end == -1:
+		return cast(NBTTag, parseFromStringReader(sr, filePath, SNBT_ID, NBTTagSchema(''), errorsIO=errorsIO, ignoreTrailingChars=True))
+
+	literal = sr.text[start:end]
+	if (tag := SNBT_LITERAL_CACHE.get(literal, sr.currentPos)) is not None:
+		sr.save()
+		sr.cursor = end
+		return tag
+
+	errors: list[GeneralError] = []
+	tag = cast(NBTTag, parseFromStringReader(sr, filePath, SNBT_ID, NBTTagSchema(''), errorsIO=errors, ignoreTrailingChars=True))
+	if tag is not None and not errors and sr.cursor == end:
+		SNBT_LITERAL_CACHE.put(literal, tag)
+	errorsIO.extend(errors)
+	return tag
+
+
 def tryReadNBTCompoundTag(sr: StringReader, ai: ArgumentSchema, filePath: FilePath, *, errorsIO: list[GeneralError]) -> Optional[NBTTag]:
-	tag = cast(NBTTag, parseFromStringReader(
-		sr,
-		filePath=filePath,
-		language=SNBT_ID,
-		schema=NBTTagSchema(''),
-		errorsIO=errorsIO,
-		ignoreTrailingChars=True
-	))
+	tag = readNBTTag(sr, filePath, errorsIO=errorsIO)
 	if tag is None:
 		return None
 
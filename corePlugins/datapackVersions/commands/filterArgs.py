@@ -3,8 +3,8 @@ filterArgs are a list of comma separated arguments enclosed in square brackets.
 They are either block states ot target selector arguments
 """
 import re
-from dataclasses import dataclass, field
-from typing import Any, Callable, Optional
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, Mapping, Optional
 
 from corePlugins.mcFunction.command import ArgumentSchema, CommandPartSchema, FALLBACK_FILTER_ARGUMENT_INFO, FilterArgumentInfo, ParsedArgument, CommandPart
 from corePlugins.mcFunction.commandContext import getArgumentContext, missingArgumentParser, makeParsedArgument
@@ -15,6 +15,7 @@ from base.model.parsing.bytesUtils import bytesToStr
 from base.model.parsing.contextProvider import Suggestions, Match, getSuggestions, validateTree
 from base.model.pathUtils import FilePath
 from base.model.utils import ParsingError, Span, Position, GeneralError, MDStr
+from cat.utils.logging_ import logWarning
 
 
 def makeCommandPart(sr: StringReader, key: bytes, schema: CommandPartSchema) -> CommandPart:
@@ -50,6 +51,8 @@ class FilterArgOptions:
 	maxCount: int = _INT_MAX
 	minCount: int = 0
 	gotoNextArgPattern: re.Pattern[bytes] = field(default=None, kw_only=True)
+	argsInfoByKey: Optional[Mapping[bytes, FilterArgumentInfo]] = field(default=None, kw_only=True)
+	"""if the set of keys is fixed, a precomputed key -> FilterArgumentInfo mapping. Enables the fast path of parseFilterArgsLike(...)."""
 	openingOrd: int = field(init=False)
 	closingOrd: int = field(init=False)
 	openingStr: str = field(init=False)
@@ -64,12 +67,180 @@ class FilterArgOptions:
 		self.closingStr = bytesToStr(self.closing)
 
 
+_FILTER_ARGS_TOKENS_PATTERN: re.Pattern[bytes] = re.compile(rb'"(?:[^"\\\n]|\\.)*"|\'(?:[^\'\\\n]|\\.)*\'|[\[\]{}=,\n]')
+_ORD_QUOTES = frozenset(b'"\'')
+_ORD_OPENING_BRACKETS = frozenset(b'[{')
+_ORD_CLOSING_BRACKETS = frozenset(b']}')
+_ORD_EQUALS = ord('=')
+_ORD_COMMA = ord(',')
+_ORD_NEW_LINE = ord('\n')
+_ORD_EXCLAMATION_MARK = ord('!')
+_FAST_PATH_WHITESPACE = b' '
+
+
+def scanFilterArgs(text: bytes, start: int, closingOrd: int) -> Optional[tuple[list[tuple[int, int, int, int]], int]]:
+	"""
+	Splits the contents of a filterArgs-like block in a single pass, respecting quotes and nested brackets.
+	:param start: the index just behind the opening bracket
+	:return: ([(keyStart, keyEnd, valueStart, valueEnd), ...], index just behind the closing bracket),
+		or None if the block is not well-formed (e.g. a missing `=`, a trailing comma or a line break)
+	"""
+	entries: list[tuple[int, int, int, int]] = []
+	depth = 0
+	entryStart = start
+	equalsPos = -1
+	for match in _FILTER_ARGS_TOKENS_PATTERN.finditer(text, start):
+		pos = match.start()
+		char = text[pos]
+		if char in _ORD_QUOTES:
+			continue
+		if char == _ORD_NEW_LINE:
+			return None
+		if depth == 0:
+			if char == _ORD_EQUALS:
+				if equalsPos == -1:
+					equalsPos = pos
+				continue
+			if char == _ORD_COMMA or char == closingOrd:
+				if equalsPos == -1:
+					if char == closingOrd and not entries and not text[entryStart:pos].strip(_FAST_PATH_WHITESPACE):
+						return entries, pos + 1  # empty block
+					return None
+				entries.append((entryStart, equalsPos, equalsPos + 1, pos))
+				if char == closingOrd:
+					return entries, pos + 1
+				entryStart = pos + 1
+				equalsPos = -1
+				continue
+		if char in _ORD_OPENING_BRACKETS:
+			depth += 1
+		elif char in _ORD_CLOSING_BRACKETS:
+			depth -= 1
+			if depth < 0:
+				return None
+	return None
+
+
+def _strip(text: bytes, start: int, end: int) -> tuple[int, int]:
+	while start < end and text[start] == 0x20:
+		start += 1
+	while end > start and text[end - 1] == 0x20:
+		end -= 1
+	return start, end
+
+
+def _tryParseFilterArgsFast(
+		sr: StringReader,
+		options: FilterArgOptions,
+		filePath: FilePath,
+		errorsIO: list[GeneralError]) -> Optional[FilterArguments]:
+	"""
+	The fast path of parseFilterArgsLike(...) for well-formed blocks with known keys. Keys are looked up in
+	options.argsInfoByKey directly instead of being parsed by their handler, and only the values are parsed.
+	The cursor must be just behind the opening bracket. If anything is unusual (unknown or duplicate keys, a value
+	that could not be parsed, too many arguments, ...), None is returned and the cursor is left unchanged,
+	so the regular parser can report the errors.
+	"""
+	argsInfoByKey = options.argsInfoByKey
+	text = sr.text
+	scanResult = scanFilterArgs(text, sr.cursor, options.closingOrd)
+	if scanResult is None:
+		return None
+	entries, end = scanResult
+	if not options.minCount <= len(entries) <= options.maxCount:
+		return None
+
+	startCursor = sr.cursor
+	keySchema = options.keySchema
+	arguments = FilterArguments()
+	errors: list[GeneralError] = []
+	for keyStart, keyEnd, valueStart, valueEnd in entries:
+		keyStart, keyEnd = _strip(text, keyStart, keyEnd)
+		key = text[keyStart:keyEnd]
+		tsai = argsInfoByKey.get(key)
+		if tsai is None:
+			sr.cursor = startCursor
+			return None
+
+		sr.cursor = keyStart
+		sr.save()
+		sr.cursor = keyEnd
+		keyNode = makeParsedArgument(sr, keySchema, value=key)
+		sr.mergeLastSave()
+
+		valueStart, valueEnd = _strip(text, valueStart, valueEnd)
+		isNegated = valueStart < valueEnd and text[valueStart] == _ORD_EXCLAMATION_MARK
+		if isNegated:
+			if not tsai.isNegatable:
+				sr.cursor = startCursor
+				return None
+			valueStart += 1
+		if key in arguments and not (tsai.multipleAllowed or (tsai.multipleAllowedIfNegated and isNegated)):
+			sr.cursor = startCursor
+			return None
+
+		sr.cursor = valueStart
+		handler = getArgumentContext(tsai.type)
+		valueNode = handler.parse(sr, tsai, filePath, errorsIO=errors) if handler is not None else None
+		if valueNode is None:
+			sr.cursor = startCursor
+			return None
+		sr.mergeLastSave()
+		if sr.cursor != valueEnd:
+			sr.cursor = startCursor
+			return None
+		arguments.add(key, FilterArgument(keyNode, valueNode, isNegated))
+
+	errorsIO.extend(errors)
+	sr.cursor = end
+	return arguments
+
+
+_CHECK_FAST_PATH: bool = False
+"""for debugging: compares every result of the fast path with the result of the regular path, see checkFastPath(...)"""
+
+
+def _argumentSpans(arguments: Optional[FilterArguments]) -> list[tuple]:
+	if arguments is None:
+		return []
+	return [
+		(fa.key.span, fa.value.span if fa.value is not None else None, fa.isNegated)
+		for fa in arguments.values()
+	]
+
+
+def checkFastPath(sr: StringReader, options: FilterArgOptions, filePath: FilePath) -> Optional[str]:
+	"""
+	parses the filter args at the cursor of sr with the fast and with the regular path, each on a copy of sr.
+	:return: a description of the first difference (spans of keys and values, end cursor, remaining save), or None.
+	"""
+	fast = replace(sr)
+	regular = replace(sr)
+	fastArgs = parseFilterArgsLike(fast, options, filePath, errorsIO=[])
+	regularArgs = parseFilterArgsLike(regular, options, filePath, errorsIO=[], allowFastPath=False)
+	if (fastSpans := _argumentSpans(fastArgs)) != (regularSpans := _argumentSpans(regularArgs)):
+		return f"spans differ: {fastSpans} != {regularSpans}"
+	if fast.cursor != regular.cursor:
+		return f"end cursors differ: {fast.cursor} != {regular.cursor}"
+	if fast.lastCursors.peek() != regular.lastCursors.peek():
+		return f"remaining saves differ: {fast.lastCursors.peek()} != {regular.lastCursors.peek()}"
+	return None
+
+
 def parseFilterArgsLike(
 		sr: StringReader,
 		options: FilterArgOptions,
 		filePath: FilePath,
-		*, errorsIO: list[GeneralError]) -> Optional[FilterArguments]:
+		*, errorsIO: list[GeneralError],
+		allowFastPath: bool = True) -> Optional[FilterArguments]:
+	if _CHECK_FAST_PATH and allowFastPath and (difference := checkFastPath(sr, options, filePath)) is not None:
+		logWarning(f"fast path of parseFilterArgsLike differs from regular path for {bytesToStr(sr.text[sr.cursor:])!r}: {difference}")
 	sr.save()
+	if allowFastPath and options.argsInfoByKey is not None and sr.tryConsumeByte(options.openingOrd):
+		if (arguments := _tryParseFilterArgsFast(sr, options, filePath, errorsIO)) is not None:
+			# like the regular path, leave the save for the caller to merge.
+			return arguments
+		sr.cursor -= 1  # give the opening bracket back to the regular parser.
 	if sr.tryConsumeByte(options.openingOrd):
 		# block states:
 		count = 0
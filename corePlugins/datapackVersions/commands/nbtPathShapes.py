@@ -0,0 +1,134 @@
+"""
+Validation and completion of NBT path arguments against the known NBT shapes of entities and block entities
+(see corePlugins.minecraft_data.nbtShapes).
+"""
+import re
+from typing import Optional, Sequence
+
+from base.model.parsing.contextProvider import Suggestions, errorMsg
+from base.model.utils import GeneralError, Message, Position
+from corePlugins.mcFunction.command import CommandPart, KeywordSchema, ParsedArgument
+from corePlugins.minecraft.resourceLocation import ResourceLocationNode
+from corePlugins.minecraft_data.fullData import getCurrentFullMcData
+from corePlugins.minecraft_data.nbtShapes import NBTShape
+from corePlugins.minecraft_data.resourceLocation import ResourceLocation
+from corePlugins.nbt.path import NBTPath, NBTPathElement, NBTPathElementKind
+from .argumentValues import TargetSelector
+
+UNKNOWN_NBT_KEY_MSG: Message = Message("Unknown NBT key `{0}`", 1)
+NBT_KEY_ON_NON_COMPOUND_MSG: Message = Message("Cannot access key `{0}` of a tag of type `{1}`", 2)
+NBT_INDEX_ON_NON_LIST_MSG: Message = Message("Cannot index a tag of type `{0}`", 1)
+
+_PLAYER_SELECTORS: frozenset[str] = frozenset({'@a', '@p', '@r'})
+_UNQUOTED_KEY_PATTERN: re.Pattern[str] = re.compile(r'[^ \t\r\n."\'\[\]{}]+')
+
+
+def _getKeyword(part: Optional[CommandPart]) -> Optional[bytes]:
+	if isinstance(part, ParsedArgument) and isinstance(part.schema, KeywordSchema):
+		return part.value
+	return None
+
+
+def _getEntityType(targetSelector: TargetSelector) -> Optional[ResourceLocation]:
+	for fa in targetSelector.arguments.values():
+		if fa.key.content != b'type' or fa.isNegated or fa.value is None:
+			continue
+		entityType = fa.value.value
+		if isinstance(entityType, ResourceLocationNode) and not entityType.isTag:
+			return ResourceLocation(entityType.namespace, entityType.path, False)
+	if targetSelector.variable in _PLAYER_SELECTORS:
+		return ResourceLocation(None, 'player', False)
+	return None
+
+
+def getNBTPathTargetShape(node: ParsedArgument) -> Optional[NBTShape]:
+	"""
+	finds the shape of the NBT data an NBT path argument points into, by looking at the preceding arguments
+	(e.g. `entity @e[type=zombie]` or `block ~ ~ ~`).
+	:return: the shape, or None if it is not known (e.g. for storages).
+	"""
+	target = node.prev
+	if not isinstance(target, ParsedArgument):
+		return None
+	shapes = getCurrentFullMcData().nbtShapes
+	keyword = _getKeyword(target.prev)
+	if keyword == b'entity':
+		if isinstance(target.value, TargetSelector):
+			return shapes.getEntityShape(_getEntityType(target.value))
+		if isinstance(target.value, bytes) and target.value.count(b'-') != 4:
+			return shapes.getEntityShape(ResourceLocation(None, 'player', False))  # a player name, not a UUID
+		return shapes.getEntityShape(None)
+	if keyword == b'block':
+		# the block at a position is not known, so this is the (open) union of all block entities:
+		return shapes.getBlockEntityShape(None)
+	return None
+
+
+def resolveNBTPathShape(shape: NBTShape, elements: Sequence[NBTPathElement], errorsIO: Optional[list[GeneralError]] = None) -> Optional[NBTShape]:
+	"""
+	follows elements through shape.
+	:param errorsIO: if given, a warning is added for the first element that does not fit the shape.
+	:return: the shape of the tag the elements point to, or None if they do not fit the shape.
+	"""
+	for element in elements:
+		if shape.isAny:
+			return shape
+		kind = element.kind
+		if kind is NBTPathElementKind.ROOT_MATCH:
+			continue
+		if kind is NBTPathElementKind.KEY:
+			if not shape.isCompound:
+				if errorsIO is not None:
+					errorMsg(NBT_KEY_ON_NON_COMPOUND_MSG, element.key, shape.type, span=element.span, style='warning', errorsIO=errorsIO)
+				return None
+			child = shape.getKey(element.key)
+			if child is None:
+				if errorsIO is not None:
+					errorMsg(UNKNOWN_NBT_KEY_MSG, element.key, span=element.span, style='warning', errorsIO=errorsIO)
+				return None
+			shape = child
+		else:
+			if not shape.isListLike:
+				if errorsIO is not None:
+					errorMsg(NBT_INDEX_ON_NON_LIST_MSG, shape.type, span=element.span, style='warning', errorsIO=errorsIO)
+				return None
+			shape = shape.getElement()
+	return shape
+
+
+def validateNBTPathShape(node: ParsedArgument, errorsIO: list[GeneralError]) -> None:
+	path = node.value
+	if not isinstance(path, NBTPath):
+		return
+	if (shape := getNBTPathTargetShape(node)) is None:
+		return
+	resolveNBTPathShape(shape, path.elements, errorsIO)
+
+
+def _formatKey(key: str) -> str:
+	if _UNQUOTED_KEY_PATTERN.fullmatch(key):
+		return key
+	escaped = key.replace('\\', '\\\\').replace('"', '\\"')
+	return f'"{escaped}"'
+
+
+def suggestNBTPathKeys(node: ParsedArgument, pos: Position) -> Suggestions:
+	path = node.value
+	if not isinstance(path, NBTPath):
+		return []
+	if (shape := getNBTPathTargetShape(node)) is None:
+		return []
+	# the element that ends at the cursor is the one being typed, so it does not count:
+	elementsBefore = [element for element in path.elements if element.span.end.index < pos.index]
+	shape = resolveNBTPathShape(shape, elementsBefore)
+	if shape is None or not shape.isCompound:
+		return []
+	return [_formatKey(key) for key in sorted(shape.keys, key=str.lower)]
+
+
+__all__ = [
+	'getNBTPathTargetShape',
+	'resolveNBTPathShape',
+	'validateNBTPathShape',
+	'suggestNBTPathKeys',
+]
@@ -217,7 +217,8 @@ TARGET_SELECTOR_ARG_OPTIONS: FilterArgOptions = FilterArgOptions(
 		name='key',
 		type=makeLiteralsArgumentType(list(TARGET_SELECTOR_ARGUMENTS_DICT.keys())),
 	),
-	getArgsInfo=lambda key: TARGET_SELECTOR_ARGUMENTS_DICT.get(key.content, FALLBACK_FILTER_ARGUMENT_INFO)
+	getArgsInfo=lambda key: TARGET_SELECTOR_ARGUMENTS_DICT.get(key.content, FALLBACK_FILTER_ARGUMENT_INFO),
+	argsInfoByKey=TARGET_SELECTOR_ARGUMENTS_DICT,
 )
 
 
@@ -1,10 +1,12 @@
 import os
+from functools import cache
 
-from corePlugins.datapack.datapackContents import RESOURCES, buildJsonMeta, EntryHandlerInfo, NAME_SPACE_VAR, DatapackContents, GenerationInfo, DefaultFileInfo, \
-	buildFunctionMeta, buildNbtMeta, buildEntryHandlers
+from corePlugins.datapack.datapackContents import RESOURCES, buildJsonMeta, EntryHandlerInfo, NAME_SPACE_VAR, GenerationInfo, DefaultFileInfo, \
+	buildFunctionMeta, getResourcesIndex, buildNbtMeta, buildEntryHandlers
 from corePlugins.datapack.dpVersions import DPVersion, registerDPVersion
 from corePlugins.json.core import JsonSchema
 from corePlugins.json.schemaStore import JSON_SCHEMA_LOADER
+from corePlugins.mcFunction.command import MCFunctionSchema
 from corePlugins.minecraft_data.fullData import getFullMcData
 from .allVersions import REGISTRY_TAGS, WORLDGEN
 
@@ -56,7 +58,7 @@ DATAPACK_CONTENTS: list[EntryHandlerInfo] = [
 		isTag=True,
 		includeSubdirs=True,
 		buildMetaInfo=lambda fp: buildJsonMeta(fp, schemaId='minecraft:tags/function'),
-		getIndex=lambda p: p.indexBundles.setdefault(DatapackContents).resources.getIndex(RESOURCES.TAGS.FUNCTION),
+		getIndex=lambda p: getResourcesIndex(p, RESOURCES.TAGS.FUNCTION),
 		generation=GenerationInfo(
 			initialFiles=[
 				DefaultFileInfo(
@@ -78,7 +80,7 @@ DATAPACK_CONTENTS: list[EntryHandlerInfo] = [
 		isTag=True,
 		includeSubdirs=True,
 		buildMetaInfo=lambda fp: buildJsonMeta(fp, schemaId='minecraft:tags/instrument'),
-		getIndex=lambda p: p.indexBundles.setdefault(DatapackContents).resources.getIndex(RESOURCES.TAGS.INSTRUMENT)
+		getIndex=lambda p: getResourcesIndex(p, RESOURCES.TAGS.INSTRUMENT)
 	),
 	EntryHandlerInfo(
 		folder=f'data/{NAME_SPACE_VAR}/tags/damage_type/',
@@ -86,7 +88,7 @@ DATAPACK_CONTENTS: list[EntryHandlerInfo] = [
 		isTag=True,
 		includeSubdirs=True,
 		buildMetaInfo=lambda fp: buildJsonMeta(fp, schemaId='minecraft:tags/damage_type'),
-		getIndex=lambda p: p.indexBundles.setdefault(DatapackContents).resources.getIndex(RESOURCES.TAGS.DAMAGE_TYPE)
+		getIndex=lambda p: getResourcesIndex(p, RESOURCES.TAGS.DAMAGE_TYPE)
 	),
 	*[
 		EntryHandlerInfo(
@@ -95,7 +97,7 @@ DATAPACK_CONTENTS: list[EntryHandlerInfo] = [
 			isTag=True,
 			includeSubdirs=True,
 			buildMetaInfo=lambda fp: buildJsonMeta(fp, schemaId=f'minecraft:{indexPath}'),
-			getIndex=lambda p, indexPath=indexPath: p.indexBundles.setdefault(DatapackContents).resources.getIndex(indexPath)
+			getIndex=lambda p, indexPath=indexPath: getResourcesIndex(p, indexPath)
 		)
 		for indexPath, folder in REGISTRY_TAGS.items()
 	],
@@ -108,7 +110,7 @@ DATAPACK_CONTENTS: list[EntryHandlerInfo] = [
 			isTag=False,
 			includeSubdirs=True,
 			buildMetaInfo=lambda fp: buildJsonMeta(fp, schemaId=f'minecraft:{indexPath}'),
-			getIndex=lambda p, indexPath=indexPath: p.indexBundles.setdefault(DatapackContents).resources.getIndex(indexPath)
+			getIndex=lambda p, indexPath=indexPath: getResourcesIndex(p, indexPath)
 		)
 		for indexPath, folder in WORLDGEN.items()
 	],
@@ -120,7 +122,7 @@ DATAPACK_CONTENTS: list[EntryHandlerInfo] = [
 		isTag=False,
 		includeSubdirs=True,
 		buildMetaInfo=lambda fp: buildJsonMeta(fp, schemaId='minecraft:advancement'),
-		getIndex=lambda p: p.indexBundles.setdefault(DatapackContents).resources.getIndex(RESOURCES.ADVANCEMENTS)
+		getIndex=lambda p: getResourcesIndex(p, RESOURCES.ADVANCEMENTS)
 	),
 	EntryHandlerInfo(
 		folder=f'data/{NAME_SPACE_VAR}/functions/',
@@ -128,7 +130,7 @@ DATAPACK_CONTENTS: list[EntryHandlerInfo] = [
 		isTag=False,
 		includeSubdirs=True,
 		buildMetaInfo=lambda fp: buildFunctionMeta(fp),
-		getIndex=lambda p: p.indexBundles.setdefault(DatapackContents).resources.getIndex(RESOURCES.FUNCTIONS),
+		getIndex=lambda p: getResourcesIndex(p, RESOURCES.FUNCTIONS),
 		generation=GenerationInfo(
 			initialFiles=[
 				DefaultFileInfo(
@@ -150,7 +152,7 @@ DATAPACK_CONTENTS: list[EntryHandlerInfo] = [
 		isTag=False,
 		includeSubdirs=True,
 		buildMetaInfo=lambda fp: buildJsonMeta(fp, schemaId='minecraft:item_modifiers'),
-		getIndex=lambda p: p.indexBundles.setdefault(DatapackContents).resources.getIndex(RESOURCES.ITEM_MODIFIERS)
+		getIndex=lambda p: getResourcesIndex(p, RESOURCES.ITEM_MODIFIERS)
 	),
 	EntryHandlerInfo(
 		folder=f'data/{NAME_SPACE_VAR}/loot_tables/',
@@ -158,7 +160,7 @@ DATAPACK_CONTENTS: list[EntryHandlerInfo] = [
 		isTag=False,
 		includeSubdirs=True,
 		buildMetaInfo=lambda fp: buildJsonMeta(fp, schemaId='minecraft:loot_tables'),
-		getIndex=lambda p: p.indexBundles.setdefault(DatapackContents).resources.getIndex(RESOURCES.LOOT_TABLES)
+		getIndex=lambda p: getResourcesIndex(p, RESOURCES.LOOT_TABLES)
 	),
 	EntryHandlerInfo(
 		folder=f'data/{NAME_SPACE_VAR}/predicates/',
@@ -166,7 +168,7 @@ DATAPACK_CONTENTS: list[EntryHandlerInfo] = [
 		isTag=False,
 		includeSubdirs=True,
 		buildMetaInfo=lambda fp: buildJsonMeta(fp, schemaId='minecraft:predicate'),
-		getIndex=lambda p: p.indexBundles.setdefault(DatapackContents).resources.getIndex(RESOURCES.PREDICATES)
+		getIndex=lambda p: getResourcesIndex(p, RESOURCES.PREDICATES)
 	),
 	EntryHandlerInfo(
 		folder=f'data/{NAME_SPACE_VAR}/recipes/',
@@ -174,7 +176,7 @@ DATAPACK_CONTENTS: list[EntryHandlerInfo] = [
 		isTag=False,
 		includeSubdirs=True,
 		buildMetaInfo=lambda fp: buildJsonMeta(fp, schemaId='minecraft:recipe'),
-		getIndex=lambda p: p.indexBundles.setdefault(DatapackContents).resources.getIndex(RESOURCES.RECIPES)
+		getIndex=lambda p: getResourcesIndex(p, RESOURCES.RECIPES)
 	),
 	EntryHandlerInfo(
 		folder=f'data/{NAME_SPACE_VAR}/structures/',
@@ -182,7 +184,7 @@ DATAPACK_CONTENTS: list[EntryHandlerInfo] = [
 		isTag=False,
 		includeSubdirs=True,
 		buildMetaInfo=lambda fp: buildNbtMeta(fp),
-		getIndex=lambda p: p.indexBundles.setdefault(DatapackContents).resources.getIndex(RESOURCES.STRUCTURES)
+		getIndex=lambda p: getResourcesIndex(p, RESOURCES.STRUCTURES)
 	),
 	EntryHandlerInfo(
 		folder=f'data/{NAME_SPACE_VAR}/dimension/',
@@ -190,7 +192,7 @@ DATAPACK_CONTENTS: list[EntryHandlerInfo] = [
 		isTag=False,
 		includeSubdirs=True,
 		buildMetaInfo=lambda fp: buildJsonMeta(fp, schemaId='minecraft:dimension'),
-		getIndex=lambda p: p.indexBundles.setdefault(DatapackContents).resources.getIndex(RESOURCES.DIMENSION)
+		getIndex=lambda p: getResourcesIndex(p, RESOURCES.DIMENSION)
 	),
 	EntryHandlerInfo(
 		folder=f'data/{NAME_SPACE_VAR}/dimension_type/',
@@ -198,11 +200,12 @@ DATAPACK_CONTENTS: list[EntryHandlerInfo] = [
 		isTag=False,
 		includeSubdirs=True,
 		buildMetaInfo=lambda fp: buildJsonMeta(fp, schemaId='minecraft:dimension_type'),
-		getIndex=lambda p: p.indexBundles.setdefault(DatapackContents).resources.getIndex(RESOURCES.DIMENSION_TYPE)
+		getIndex=lambda p: getResourcesIndex(p, RESOURCES.DIMENSION_TYPE)
 	),
 ]
 
 
+@cache
 def loadJsonSchemas() -> dict[str, JsonSchema]:
 	resourcesDir = os.path.join(os.path.dirname(__file__), "resources/")
 	v23Dir = os.path.join(resourcesDir, "v23/")
@@ -220,26 +223,31 @@ def loadJsonSchemas() -> dict[str, JsonSchema]:
 	return v23Schemas
 
 
-JSON_SCHEMAS = loadJsonSchemas()
+def _buildMcFunctionSchema23() -> MCFunctionSchema:
+	from .commands.v1_20_3_schema import COMMANDS_V25
+	return COMMANDS_V25.buildSchema(getFullMcData('1.20.3'))
+
+
+def _buildMcFunctionSchema18() -> MCFunctionSchema:
+	from .commands.v1_20_2_schema import COMMANDS
+	return COMMANDS.buildSchema(getFullMcData('1.20.2'))
 
 
 def buildVersion23() -> DPVersion:
-	from .commands.v1_20_3_schema import COMMANDS_V25
 	return DPVersion(
 		name='23',
 		structure=buildEntryHandlers(DATAPACK_CONTENTS),
-		jsonSchemas=JSON_SCHEMAS,  # todo add schemata here, so they are synced to datapack version.
-		mcFunctionSchema=COMMANDS_V25.buildSchema(getFullMcData('1.20.3'))
+		buildJsonSchemas=loadJsonSchemas,  # todo add schemata here, so they are synced to datapack version.
+		buildMcFunctionSchema=_buildMcFunctionSchema23
 	)
 
 
 def buildVersion18() -> DPVersion:
-	from .commands.v1_20_2_schema import COMMANDS
 	return DPVersion(
 		name='18',
 		structure=buildEntryHandlers(DATAPACK_CONTENTS),
-		jsonSchemas=JSON_SCHEMAS,
-		mcFunctionSchema=COMMANDS.buildSchema(getFullMcData('1.20.2'))
+		buildJsonSchemas=loadJsonSchemas,
+		buildMcFunctionSchema=_buildMcFunctionSchema18
 	)
 
 # DATAPACK_CONTENTS_STRUCTURE: EntryHandlers = buildEntryHandlers(DATAPACK_CONTENTS)
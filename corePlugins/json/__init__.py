@@ -22,6 +22,7 @@ class JsonPlugin(PluginBase):
 	def initPlugin(self) -> None:
 		from .argTypes import init  # load standard argument types
 		init()
+		from . import formatter  # registers the JSON formatter
 
 	def dependencies(self) -> set[str]:
 		return set()
@@ -693,12 +693,114 @@ class JsonUnionSchema(JsonDataSchema):
 
 	allOptions: list[JsonDataSchema] = CachedProperty(_getAllOptions)
 
+	def _getDiscriminator(self) -> Optional[UnionDiscriminator]:
+		return UnionDiscriminator.build(self.allOptions)
+
+	discriminator: Optional[UnionDiscriminator] = CachedProperty(_getDiscriminator)
+
+	def selectOption(self, data: JsonData) -> Optional[JsonDataSchema]:
+		"""
+		returns the single option that can match data, or None if the discriminator of this union cannot decide.
+		"""
+		discriminator = self.discriminator
+		if discriminator is None or not isinstance(data, JsonObject):
+			return None
+		return discriminator.select(data)
+
 	# @CachedProperty
 	@property
 	def asString(self) -> str:
 		return f"({'|'.join(o.asString for o in self.options)})"
 
 
+DISCRIMINATOR_KEYS: tuple[str, ...] = ('type', 'function', 'condition')
+
+
+@dataclass
+class UnionDiscriminator:
+	"""
+	Lookup tables to pick the one object option of a union for a given JsonObject without validating every option.
+	 * key / byValue: the options share a mandatory enum property (e.g. 'type'), whose values do not overlap between the options.
+	 * fingerprints: the set of unconditionally mandatory keys for each object option.
+	"""
+	key: Optional[str]
+	byValue: dict[str, JsonObjectSchema]
+	fingerprints: list[tuple[frozenset[str], JsonObjectSchema]]
+
+	@classmethod
+	def build(cls, options: Sequence[JsonDataSchema]) -> Optional[UnionDiscriminator]:
+		objectOptions: list[JsonObjectSchema] = []
+		for opt in options:
+			if isinstance(opt, (JsonCalculatedValueSchema, JsonAnySchema)):
+				return None  # these can match anything, so we cannot decide statically.
+			if isinstance(opt, JsonObjectSchema):
+				objectOptions.append(opt.finish())
+		if len(objectOptions) < 2:
+			return None  # at most one option can be type-compatible anyway.
+
+		key, byValue = None, {}
+		for candidateKey in DISCRIMINATOR_KEYS:
+			byValue = _buildDiscriminatorTable(candidateKey, objectOptions)
+			if byValue is not None:
+				key = candidateKey
+				break
+		else:
+			byValue = {}
+
+		fingerprints = [(_getMandatoryKeys(opt), opt) for opt in objectOptions]
+		if any(not keys for keys, opt in fingerprints):
+			fingerprints = []  # an option without mandatory keys would match every object.
+
+		if key is None and not fingerprints:
+			return None
+		return cls(key, byValue, fingerprints)
+
+	def select(self, data: JsonObject) -> Optional[JsonObjectSchema]:
+		if self.key is not None:
+			prop = data.data.get(self.key)
+			if prop is not None and isinstance(prop.value, JsonString):
+				value = prop.value.data
+				option = self.byValue.get(value)
+				if option is None:
+					option = self.byValue.get(value.removeprefix('minecraft:') if ':' in value else f'minecraft:{value}')
+				if option is not None:
+					return option
+
+		if self.fingerprints:
+			presentKeys = data.data.keys()
+			selected = None
+			for keys, option in self.fingerprints:
+				if all(k in presentKeys for k in keys):
+					if selected is not None:
+						return None
+					selected = option
+			return selected
+		return None
+
+
+def _buildDiscriminatorTable(key: str, options: list[JsonObjectSchema]) -> Optional[dict[str, JsonObjectSchema]]:
+	byValue: dict[str, JsonObjectSchema] = {}
+	for opt in options:
+		prop = opt.propertiesDict.get(key)
+		if prop is None or prop.optional or prop.decidingProp is not None or prop.hates:
+			return None
+		valueSchema = prop.value
+		if not isinstance(valueSchema, JsonStringSchema) or valueSchema.type != OPTIONS_JSON_ARG_TYPE.name:
+			return None
+		for value in valueSchema.args.get('values', ()):
+			if byValue.setdefault(value, opt) is not opt:
+				return None  # values overlap, so they cannot discriminate.
+	return byValue
+
+
+def _getMandatoryKeys(schema: JsonObjectSchema) -> frozenset[str]:
+	return frozenset(
+		name
+		for name, prop in schema.propertiesDict.items()
+		if prop.mandatory and not prop.requires and not prop.hates and prop.decidingProp is None
+	)
+
+
 class JsonCalculatedValueSchema(JsonDataSchema):
 	typeName: ClassVar[str] = 'calculated'
 	_fields: ClassVar[FieldsMeta] = dict(func=(..., Nothing))
@@ -888,6 +990,7 @@ __all__ = [
 	'JsonObjectSchema',
 	'Inheritance',
 	'JsonUnionSchema',
+	'UnionDiscriminator',
 	'JsonCalculatedValueSchema',
 	'resolveCalculatedSchema',
 	'JsonAnySchema',
@@ -0,0 +1,164 @@
+"""
+A formatter for JSON that works on the syntax tree instead of re-encoding the data, so it keeps comments, the order of
+properties that are not known to the schema and the original spelling of all keys and values.
+"""
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from typing import Optional, Sequence
+
+from base.model.formatting import FormatOptions, formatter
+from base.model.parsing.tree import Node
+from . import JSON_ID
+from .core import JsonArray, JsonData, JsonNode, JsonObject, JsonObjectSchema, JsonProperty
+
+_NL: bytes = b'\n'
+_COMMENT_PATTERN: re.Pattern[bytes] = re.compile(rb'//[^\n]*')
+
+
+@dataclass
+class _Entry:
+	node: JsonNode
+	leadingComments: list[bytes]
+	trailingComment: Optional[bytes] = None
+	"""a comment on the same line, right after the entry"""
+
+
+@dataclass
+class JsonFormatter:
+	text: bytes
+	options: FormatOptions
+	_parts: list[bytes] = field(default_factory=list, init=False)
+
+	def __post_init__(self):
+		self._indent = self.options.indent
+		self._indentWidth = len(self._indent) if self.options.indentation.useSpaces else self.options.indentation.tabWidth
+
+	def _raw(self, node: JsonNode) -> bytes:
+		return self.text[node.span.start.index:node.span.end.index]
+
+	def _comments(self, start: int, end: int) -> list[tuple[bytes, bool]]:
+		"""
+		all comments between start and end as (comment, isOnSameLineAsStart) tuples. Between two nodes of a tree there
+		can only be whitespace, punctuation and comments, so there is no need to look out for strings.
+		"""
+		text = self.text
+		return [
+			(match.group().rstrip(), text.find(b'\n', start, match.start()) < 0)
+			for match in _COMMENT_PATTERN.finditer(text, start, end)
+		]
+
+	def _hasComments(self, start: int, end: int) -> bool:
+		return _COMMENT_PATTERN.search(self.text, start, end) is not None
+
+	def _entries(self, nodes: Sequence[JsonNode], container: JsonData) -> tuple[list[_Entry], list[bytes]]:
+		""":return: the entries for nodes and the comments after the last entry."""
+		entries: list[_Entry] = []
+		prevEnd = container.span.start.index + 1  # after the opening bracket
+		for node in nodes:
+			comments = self._comments(prevEnd, node.span.start.index)
+			if entries and comments and comments[0][1]:
+				entries[-1].trailingComment = comments.pop(0)[0]
+			if isinstance(node, JsonProperty):
+				# comments between the key and the value are moved in front of the property:
+				comments += self._comments(node.key.span.end.index, node.value.span.start.index)
+			entries.append(_Entry(node, [comment for comment, _ in comments]))
+			prevEnd = node.span.end.index
+		comments = self._comments(prevEnd, container.span.end.index - 1)
+		if entries and comments and comments[0][1]:
+			entries[-1].trailingComment = comments.pop(0)[0]
+		return entries, [comment for comment, _ in comments]
+
+	def _sortEntries(self, entries: list[_Entry], obj: JsonObject) -> list[_Entry]:
+		schema = obj.schema
+		if not self.options.sortKeys or not isinstance(schema, JsonObjectSchema) or not schema.propertiesDict:
+			return entries
+		order = {name: i for i, name in enumerate(schema.propertiesDict)}
+		# sorted(...) is stable, so unknown properties keep their order:
+		return sorted(entries, key=lambda e: order.get(e.node.key.data, len(order)))
+
+	def _compact(self, node: JsonData) -> Optional[bytes]:
+		""":return: node on a single line, or None if it must not be written on a single line."""
+		if isinstance(node, JsonObject):
+			if node.data or self._hasComments(node.span.start.index, node.span.end.index):
+				return None
+			return b'{}'
+		if isinstance(node, JsonArray):
+			parts: list[bytes] = []
+			prevEnd = node.span.start.index + 1
+			for element in node.data:
+				if self._hasComments(prevEnd, element.span.start.index) or (compact := self._compact(element)) is None:
+					return None
+				parts.append(compact)
+				prevEnd = element.span.end.index
+			if self._hasComments(prevEnd, node.span.end.index - 1):
+				return None
+			return b'[' + b', '.join(parts) + b']'
+		return self._raw(node)
+
+	def _writeEntries(self, open_: bytes, close: bytes, entries: list[_Entry], danglingComments: list[bytes], depth: int) -> None:
+		parts = self._parts
+		if not entries and not danglingComments:
+			parts += (open_, close)
+			return
+		innerIndent = self._indent * (depth + 1)
+		innerColumn = self._indentWidth * (depth + 1)
+		parts.append(open_)
+		lastIndex = len(entries) - 1
+		for i, entry in enumerate(entries):
+			for comment in entry.leadingComments:
+				parts += (_NL, innerIndent, comment)
+			parts += (_NL, innerIndent)
+			node = entry.node
+			if isinstance(node, JsonProperty):
+				key = self._raw(node.key)
+				parts += (key, b': ')
+				self._writeValue(node.value, depth + 1, innerColumn + len(key) + 2)
+			else:
+				self._writeValue(node, depth + 1, innerColumn)
+			if i < lastIndex:
+				parts.append(b',')
+			if entry.trailingComment is not None:
+				parts += (b' ', entry.trailingComment)
+		for comment in danglingComments:
+			parts += (_NL, innerIndent, comment)
+		parts += (_NL, self._indent * depth, close)
+
+	def _writeValue(self, node: JsonData, depth: int, column: int) -> None:
+		if isinstance(node, JsonObject):
+			entries, danglingComments = self._entries(list(node.data.values()), node)
+			self._writeEntries(b'{', b'}', self._sortEntries(entries, node), danglingComments, depth)
+		elif isinstance(node, JsonArray):
+			compact = self._compact(node)
+			# + 1 for a comma that might follow:
+			if compact is not None and column + len(compact) + 1 <= self.options.lineWidth:
+				self._parts.append(compact)
+				return
+			entries, danglingComments = self._entries(node.data, node)
+			self._writeEntries(b'[', b']', entries, danglingComments, depth)
+		else:
+			self._parts.append(self._raw(node))
+
+	def format(self, root: JsonData) -> bytes:
+		parts = self._parts
+		parts.clear()
+		for comment, _ in self._comments(0, root.span.start.index):
+			parts += (comment, _NL)
+		self._writeValue(root, 0, 0)
+		for comment, isOnSameLine in self._comments(root.span.end.index, len(self.text)):
+			parts += (b' ' if isOnSameLine else _NL, comment)
+		parts.append(_NL)
+		return b''.join(parts)
+
+
+@formatter(JSON_ID)
+def formatJson(tree: Node, text: bytes, options: FormatOptions) -> bytes:
+	assert isinstance(tree, JsonData)
+	return JsonFormatter(text, options).format(tree)
+
+
+__all__ = [
+	'JsonFormatter',
+	'formatJson',
+]
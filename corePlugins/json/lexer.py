@@ -1,4 +1,5 @@
 """Lexer functions, loosely based on www.github.com/tusharsadhwani/json_parser"""
+import re
 from dataclasses import dataclass, field
 from typing import Optional, Callable
 
@@ -29,6 +30,12 @@ _TOKEN_TYPE_FOR_SPECIAL = {
 	b'null': TokenType.null,
 }
 
+_DOUBLE_QUOTED_STRING_PATTERN = re.compile(rb'"[^"\\\n]*(?:\\[^\r\n][^"\\\n]*)*"')
+"""a well-formed, single-line, double quoted string. Everything else is handled by the slow path in extract_string()."""
+
+_NUMBER_PATTERN = re.compile(rb'[-+]?(?:[0-9]+\.?[0-9]*|\.[0-9]+)(?:[eE][-+]?[0-9]+)?(?=[,\s}\]"\':=\[{\\]|\Z)')
+"""a well-formed number. Everything else is handled by the slow path in extract_number()."""
+
 _TOKEN_TYPE_FOR_OPERATOR = {
 	b'[': TokenType.left_bracket,
 	b']': TokenType.right_bracket,
@@ -100,6 +107,10 @@ class JsonTokenizer(TokenizerBase[Token]):
 		"""Extracts a single string token from JSON string"""
 		start = self.currentPos
 		startCursor = self.cursor
+		if (match := _DOUBLE_QUOTED_STRING_PATTERN.match(self.text, startCursor)) is not None:
+			self.cursor = match.end()
+			return self.addToken(start, startCursor, TokenType.string)
+
 		quote = self.text[startCursor]
 		if quote == ORD_SINGLE_QUOTE:
 			self.errorNextToken(SINGLE_QUOTED_STRING_MSG)
@@ -134,6 +145,10 @@ class JsonTokenizer(TokenizerBase[Token]):
 		"""Extracts a single number token (e.g. 42, -12.3) from JSON string"""
 		start = self.currentPos
 		startCursor = self.cursor
+		if (match := _NUMBER_PATTERN.match(self.text, startCursor)) is not None:
+			self.cursor = match.end()
+			return self.addToken(start, startCursor, TokenType.number)
+
 		non_exp_digit_found = False
 		decimal_point_found = False
 		exponent_found = False
@@ -39,10 +39,9 @@ _BOOLEAN_TOKENS = {
 class JsonParser(ParserBase[JsonNode, JsonSchema]):
 
 	_waitingForClosing: dict[TokenType, int] = field(default_factory=lambda: defaultdict(int), init=False)
-	# tokens: deque[Token] = field(init=False)
 	_tokenizer: JsonTokenizer = field(init=False)
 	_current: Token = field(init=False)
-	_eofToken: Token = field(init=False)
+	_eofToken: Optional[Token] = field(init=False, default=None)
 	_last: Optional[Token] = field(init=False, default=None)
 
 	def __post_init__(self):
@@ -57,18 +56,26 @@ class JsonParser(ParserBase[JsonNode, JsonSchema]):
 			self.indexMapper,
 			allowMultilineStr
 		)
-		self._tokens, self._eofToken = self.tokenize()
-		self._tokensIter = iter(self._tokens)
 		self.errors = self._tokenizer.errors  # sync errors
 		self._current = cast(Any, None)
 		self._next()  # sets self._current, self._last
 
-	def tokenize(self):
-		tokens = []
-		while (tkn := self._tokenizer.nextToken()).type is not TokenType.eof:
-			tokens.append(tkn)
-		eofToken = tkn
-		return tokens, eofToken
+	def _nextToken(self) -> Token:
+		"""
+		pulls the next token directly from the tokenizer, so we never have to hold a full token list in memory.
+		Once the end of the text has been reached, the same eof token is returned over and over again.
+		"""
+		if self._eofToken is not None:
+			return self._eofToken
+		token = self._tokenizer.nextToken()
+		if token.type is TokenType.eof:
+			self._eofToken = token
+		return token
+
+	def _drainTokens(self) -> None:
+		"""consumes all remaining tokens, so that the tokenizer reports errors for any trailing garbage."""
+		while self._eofToken is None:
+			self._nextToken()
 
 	@property
 	def allowMultilineStr(self) -> bool:
@@ -84,7 +91,7 @@ class JsonParser(ParserBase[JsonNode, JsonSchema]):
 
 	def _next(self) -> None:
 		self._last = self._current
-		self._current = next(self._tokensIter, self._eofToken)
+		self._current = self._nextToken()
 
 	def tryAccept(self, tokenType: TokenType) -> Optional[Token]:
 		if self._current.type is not tokenType:
@@ -464,6 +471,7 @@ class JsonParser(ParserBase[JsonNode, JsonSchema]):
 				MDStr(f"Invalid JSON at `{bytesToStr(self._current.value)}`"),
 				span=self._current.span
 			)
+		self._drainTokens()
 
 		self.cursor = self._tokenizer.cursor
 		self.line = self._tokenizer.line
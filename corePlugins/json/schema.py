@@ -36,6 +36,9 @@ def _enrichWithSchemaInternal(data: JsonData, schema: JsonSchema) -> int:
 
 
 def _enrichWithUnionSchema(data: JsonData, schema: JsonUnionSchema) -> int:
+	selectedOpt = schema.selectOption(data)
+	if selectedOpt is not None:
+		return _enrichWithSchemaInternal(data, selectedOpt)
 	result = 0
 	for opt in schema.allOptions:
 		internal = _enrichWithSchemaInternal(data, opt)
@@ -1,9 +1,11 @@
 from dataclasses import dataclass, field
-from typing import Optional
+from typing import Iterable, Optional
 
 from base.model.utils import WrappedError
 from cat.utils.logging_ import logWarning, logInfo
+from base.model.memoryUsage import MemoryRoot, memoryProvider
 from base.model.pathUtils import FilePathStr
+from base.model.tracing import TRACE_SCHEMA, traceSpan
 from .core import JsonSchema
 from .jsonSchema import SchemaBuilderOrchestrator
 
@@ -27,7 +29,8 @@ class JsonSchemaLoader:
 
 	def loadSchema(self, name: str, path: str) -> Optional[JsonSchema]:
 		self._registeredSchemas[name] = path
-		schema = self._load_schema(path)
+		with traceSpan('JsonSchemaStore.loadSchema', TRACE_SCHEMA, schema=name):
+			schema = self._load_schema(path)
 		self.logAndClearErrors()
 		return schema
 
@@ -42,7 +45,8 @@ class JsonSchemaLoader:
 		"""
 		lib_path = _SchemaLibPath(path, includedDefinitions)
 		self._registeredLibraries[name] = lib_path
-		schemas = self._load_library(name, lib_path)
+		with traceSpan('JsonSchemaStore.loadSchemaLibrary', TRACE_SCHEMA, schema=name):
+			schemas = self._load_library(name, lib_path)
 		self.logAndClearErrors()
 		return schemas
 
@@ -102,6 +106,11 @@ class JsonSchemaLoader:
 JSON_SCHEMA_LOADER: JsonSchemaLoader = JsonSchemaLoader()
 
 
+@memoryProvider('jsonSchemas')
+def _jsonSchemaGraph() -> Iterable[MemoryRoot]:
+	yield MemoryRoot('schema graph', JSON_SCHEMA_LOADER.orchestrator)
+
+
 __all__ = [
 	'JsonSchemaLoader',
 	'JSON_SCHEMA_LOADER',
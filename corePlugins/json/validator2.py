@@ -1,4 +1,4 @@
-from typing import Protocol
+from typing import Protocol, Callable, NamedTuple
 
 from cat.utils.collections_ import AddToDictDecorator
 from .core import *
@@ -24,9 +24,8 @@ def wrongTypeError(expected: JsonSchema, got: JsonData):
 
 
 def validateJson(data: JsonData, errorsIO: list[GeneralError]) -> None:
-	if data.schema is not None:
-		validator = getSchemaValidator(data.schema.typeName, None)
-		validator(data, data.schema, errorsIO=errorsIO)
+	if (schema := data.schema) is not None:
+		getCompiledValidator(schema)(data, errorsIO)
 	else:
 		msg = NO_JSON_SCHEMA_MSG.format(data.typeName)
 		errorsIO.append(SemanticsError(msg, Span(data.span.start)))
@@ -167,6 +166,11 @@ def _flattenOptions(schema: JsonUnionSchema, parent: JsonObject, allOptionsIO: l
 
 @schemaValidator(JsonUnionSchema.typeName)
 def validateJsonUnion(data: JsonData, schema: JsonUnionSchema, *, errorsIO: list[GeneralError]) -> None:
+	selectedOpt = schema.selectOption(data)
+	if selectedOpt is not None:
+		getCompiledValidator(selectedOpt)(data, errorsIO)
+		return
+
 	# we could not decide on a schema previously, so show errors for option with the least errors:
 	allOptions = []
 	_flattenOptions(schema, data.parent, allOptionsIO=allOptions)
@@ -184,9 +188,8 @@ def validateJsonUnion(data: JsonData, schema: JsonUnionSchema, *, errorsIO: list
 
 	optionsErrors: list[list[GeneralError]] = []
 	for opt in optionsToValidate:
-		validator = getSchemaValidator(opt.typeName, None)
 		errors = []
-		validator(data, opt, errorsIO=errors)
+		getCompiledValidator(opt)(data, errors)
 		optionsErrors.append(errors)
 
 	minErrors = []
@@ -208,6 +211,211 @@ def validateJsonUnion(data: JsonData, schema: JsonUnionSchema, *, errorsIO: list
 
 
 
+_BUILTIN_VALIDATORS: dict[str, ValidatorFunc] = dict(VALIDATORS_FOR_SCHEMAS)
+"""the validators defined above. Plugins can override them in VALIDATORS_FOR_SCHEMAS."""
+
+
+# ## COMPILED VALIDATORS: ##################################################################
+# A compiled validator is a closure specialized for a single schema instance. Everything that only depends on the
+# schema (property tables, messages, bounds, string contexts, ...) is computed once, when the schema is first used.
+
+CompiledValidatorFunc = Callable[[JsonData, list[GeneralError]], None]
+
+
+class ValidatorCompilerFunc(Protocol):
+	def __call__(self, schema: JsonSchema) -> CompiledValidatorFunc:
+		pass
+
+
+SCHEMA_COMPILERS: dict[str, ValidatorCompilerFunc] = {}
+schemaCompiler = AddToDictDecorator(SCHEMA_COMPILERS)
+
+def getCompiledValidator(schema: JsonSchema) -> CompiledValidatorFunc:
+	# schemas are unhashable dataclasses, so the validator is stored on the schema itself:
+	validator = schema.__dict__.get('_compiledValidator')
+	if validator is None:
+		validator = schema.__dict__['_compiledValidator'] = compileValidator(schema)
+	return validator
+
+
+def compileValidator(schema: JsonSchema) -> CompiledValidatorFunc:
+	validator = getSchemaValidator(schema.typeName, None)
+	if validator is not None and validator is not _BUILTIN_VALIDATORS.get(schema.typeName):
+		# a plugin has overridden the validator for this schema type:
+		return lambda data, errorsIO: validator(data, schema, errorsIO=errorsIO)
+	if (compiler := SCHEMA_COMPILERS.get(schema.typeName)) is not None:
+		return compiler(schema)
+	if validator is not None:
+		# fall back to the generic validator for schema types that have no compiler:
+		return lambda data, errorsIO: validator(data, schema, errorsIO=errorsIO)
+
+	noValidatorMsg = INTERNAL_ERROR_MSG.format(NO_JSON_SCHEMA_VALIDATOR_MSG, schema.typeName)
+
+	def validateWithoutValidator(data: JsonData, errorsIO: list[GeneralError]) -> None:
+		errorsIO.append(SemanticsError(noValidatorMsg, data.span, style='info'))
+	return validateWithoutValidator
+
+
+@schemaCompiler(PropertySchema.typeName)
+@schemaCompiler(JsonAnySchema.typeName)
+def compileNoOp(schema: JsonSchema) -> CompiledValidatorFunc:
+	def validate(data: JsonData, errorsIO: list[GeneralError]) -> None:
+		pass
+	return validate
+
+
+@schemaCompiler(JsonNullSchema.typeName)
+@schemaCompiler(JsonBoolSchema.typeName)
+def compileSimpleType(schema: JsonDataSchema) -> CompiledValidatorFunc:
+	dataType = schema.DATA_TYPE
+
+	def validate(data: JsonData, errorsIO: list[GeneralError]) -> None:
+		if not isinstance(data, dataType):
+			errorsIO.append(wrongTypeError(schema, data))
+	return validate
+
+
+@schemaCompiler(JsonFloatSchema.typeName)
+@schemaCompiler(JsonIntSchema.typeName)
+def compileNumber(schema: JsonNumberSchema) -> CompiledValidatorFunc:
+	isInt = schema.typeName == JsonIntSchema.typeName
+	min_, max_ = schema.min, schema.max
+	outOfBoundsMsg = NUMBER_OUT_OF_BOUNDS_MSG.format(min_, max_)
+	notAnIntMsg = EXPECTED_BUT_GOT_MSG.format('integer', 'float')
+
+	def validate(data: JsonData, errorsIO: list[GeneralError]) -> None:
+		if not isinstance(data, JsonNumber):
+			errorsIO.append(wrongTypeError(schema, data))
+			return
+		value = data.data
+		if isInt and type(value) is float and int(value) != value:
+			errorsIO.append(SemanticsError(notAnIntMsg, data.span))
+		if not min_ <= value <= max_:
+			errorsIO.append(SemanticsError(outOfBoundsMsg, data.span))
+	return validate
+
+
+@schemaCompiler(JsonStringSchema.typeName)
+def compileString(schema: JsonStringSchema) -> CompiledValidatorFunc:
+	if (ctx := getJsonStringContext(schema.type)) is not None:
+		ctxValidate = ctx.validate
+
+		def validate(data: JsonData, errorsIO: list[GeneralError]) -> None:
+			if not isinstance(data, JsonString):
+				errorsIO.append(wrongTypeError(schema, data))
+				return
+			ctxValidate(data, errorsIO)
+	elif schema.type is not None:
+		# no specialized string handler has been found.
+		missingHandlerMsg = INTERNAL_ERROR_MSG.format(MISSING_JSON_STRING_HANDLER_MSG, schema.type)
+
+		def validate(data: JsonData, errorsIO: list[GeneralError]) -> None:
+			if not isinstance(data, JsonString):
+				errorsIO.append(wrongTypeError(schema, data))
+				return
+			errorsIO.append(SemanticsError(missingHandlerMsg, data.span, style='info'))
+	else:
+		def validate(data: JsonData, errorsIO: list[GeneralError]) -> None:
+			if not isinstance(data, JsonString):
+				errorsIO.append(wrongTypeError(schema, data))
+	return validate
+
+
+@schemaCompiler(JsonArraySchema.typeName)
+def compileArray(schema: JsonArraySchema) -> CompiledValidatorFunc:
+	def validate(data: JsonData, errorsIO: list[GeneralError]) -> None:
+		if not isinstance(data, JsonArray):
+			errorsIO.append(wrongTypeError(schema, data))
+			return
+		for element in data.data:
+			validateJson(element, errorsIO)
+	return validate
+
+
+class _CompiledProp(NamedTuple):
+	schema: PropertySchema
+	isStatic: bool  # True if the value schema does not depend on the parent object
+	hasValue: bool  # only meaningful if isStatic
+	requires: tuple[str, ...]
+	hates: frozenset[str]
+	requiresMsg: str
+	hatesMsg: str
+
+
+def _compileProp(propSchema: PropertySchema) -> _CompiledProp:
+	isStatic = propSchema.decidingProp is None and not isinstance(propSchema.value, JsonCalculatedValueSchema)
+	return _CompiledProp(
+		schema=propSchema,
+		isStatic=isStatic,
+		hasValue=isStatic and propSchema.value is not None,
+		requires=propSchema.requires,
+		hates=frozenset(propSchema.hates),
+		requiresMsg=REQUIRES_PROPERTY_TO_BE_SET_MSG.format(str(propSchema.requires)),
+		hatesMsg=INCOMPATIBLE_PROPERTY_MSG.format(str(propSchema.hates)),
+	)
+
+
+def _hasValueForParent(cProp: _CompiledProp, parent: JsonObject) -> bool:
+	if cProp.isStatic:
+		return cProp.hasValue
+	return cProp.schema.getValueSchemaForParent(parent) is not None
+
+
+@schemaCompiler(JsonObjectSchema.typeName)
+def compileObject(schema: JsonObjectSchema) -> CompiledValidatorFunc:
+	schema.finish()
+	compiledProps: dict[str, _CompiledProp] = {name: _compileProp(p) for name, p in schema.propertiesDict.items()}
+	anythingProp = _compileProp(schema.anythingProp) if schema.anythingProp is not None else None
+	# optional properties can never be reported as missing, so we only need to check mandatory ones:
+	mandatoryProps: list[tuple[str, _CompiledProp]] = [(name, cProp) for name, cProp in compiledProps.items() if cProp.schema.mandatory]
+
+	def validate(data: JsonData, errorsIO: list[GeneralError]) -> None:
+		if not isinstance(data, JsonObject):
+			errorsIO.append(wrongTypeError(schema, data))
+			return
+
+		props = data.data
+		validatedProps: set[str] = set()
+		for name, prop in props.items():
+			if name in validatedProps:
+				msg = DUPLICATE_PROPERTY_MSG.format(name)
+				errorsIO.append(SemanticsError(msg, prop.key.span))
+			else:
+				validatedProps.add(name)
+
+			cProp = compiledProps.get(name, anythingProp)
+			if cProp is None or not _hasValueForParent(cProp, data):
+				msg = UNKNOWN_PROPERTY_MSG.format(name)
+				errorsIO.append(SemanticsError(msg, prop.key.span))
+				continue
+
+			if cProp.requires and any(p not in props for p in cProp.requires):
+				errorsIO.append(SemanticsError(cProp.requiresMsg, prop.key.span, style='warning'))
+
+			if cProp.hates and any(p in props for p in cProp.hates):
+				errorsIO.append(SemanticsError(cProp.hatesMsg, prop.key.span, style='warning'))
+
+			if cProp.schema.deprecated:
+				msg = DEPRECATED_PROPERTY_MSG.format(prop.key.data)
+				errorsIO.append(SemanticsError(msg, prop.key.span, style='warning'))
+
+			validateJson(prop.value, errorsIO)
+
+		for name, cProp in mandatoryProps:
+			if name in validatedProps:
+				continue
+			if cProp.requires and all(p not in props for p in cProp.requires):
+				continue
+			if cProp.hates and any(p in props for p in cProp.hates):
+				continue
+			if _hasValueForParent(cProp, data):
+				msg = MISSING_MANDATORY_PROPERTY_MSG.format(name)
+				end = data.span.end
+				start = Position(end.line, end.column - 1, end.index - 1)
+				errorsIO.append(SemanticsError(msg, Span(start, end)))
+	return validate
+
+
 class TypeCheckerFunc(Protocol):
 	def __call__(self, data: JsonData, schema: JsonSchema) -> bool:
 		pass
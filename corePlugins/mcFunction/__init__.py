@@ -1,6 +1,7 @@
 from typing import Type
 
 from base.gui.styler import CatStyler
+from base.model.applicationSettings import SettingsAspect
 from base.model.documents import DocumentTypeDescription, ParsedDocument
 from base.model.parsing.contextProvider import ContextProvider
 from base.model.parsing.parser import ParserBase
@@ -21,6 +22,7 @@ class McFunctionPlugin(PluginBase):
 	def initPlugin(self) -> None:
 		from .argumentContextsImpl import initPlugin as initArgumentContexts
 		initArgumentContexts()
+		from . import formatter
 
 	def dependencies(self) -> set[str]:
 		return set()
@@ -42,6 +44,10 @@ class McFunctionPlugin(PluginBase):
 			# ParsedArgument: CommandCtxProvider,
 		}
 
+	def settingsAspects(self) -> list[Type[SettingsAspect]]:
+		from .settings import McFunctionSettings
+		return [McFunctionSettings]
+
 	def documentTypes(self) -> list[DocumentTypeDescription]:
 		return [DocumentTypeDescription(
 			type=ParsedDocument,
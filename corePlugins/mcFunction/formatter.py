@@ -0,0 +1,187 @@
+"""
+A formatter for mcfunction files. Every command is written again from its parsed arguments, which removes redundant
+whitespace and joins line continuations. Argument types can register an ArgumentNormalizer to also normalize the text of
+their arguments (e.g. `~0` -> `~`). Each formatted command is parsed again and kept as it was, if it does not result in
+the same command anymore: every argument must have the same schema and the same meaning as before (see ArgumentMeaning).
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Callable, Hashable, Optional
+
+from base.model.applicationSettings import getApplicationSettings
+from base.model.formatting import FormatOptions, formatter
+from base.model.parsing.parser import parse
+from base.model.parsing.tree import Node
+from cat.utils.collections_ import AddToDictDecorator
+from . import MC_FUNCTION_ID
+from .command import ArgumentSchema, CommandPart, MCFunction, MCFunctionSchema, ParsedArgument, ParsedCommand
+from .settings import McFunctionSettings
+
+_NL: bytes = b'\n'
+_LINE_CONTINUATION: bytes = b' \\\n'
+_EXECUTE: bytes = b'execute'
+
+
+@dataclass(frozen=True)
+class McFunctionFormatRules:
+	normalizeCoordinates: bool = True
+	normalizeTargetSelectors: bool = True
+	normalizeNbtQuotes: bool = True
+	wrapLongExecuteCommands: bool = False
+	"""line continuations require Minecraft 1.20.2 or newer"""
+
+	@classmethod
+	def fromSettings(cls) -> McFunctionFormatRules:
+		settings = getApplicationSettings().aspects.get(McFunctionSettings)
+		return cls(
+			normalizeCoordinates=settings.formatNormalizeCoordinates,
+			normalizeTargetSelectors=settings.formatNormalizeTargetSelectors,
+			normalizeNbtQuotes=settings.formatNormalizeNbtQuotes,
+			wrapLongExecuteCommands=settings.formatWrapLongExecuteCommands,
+		)
+
+
+ArgumentNormalizer = Callable[[ParsedArgument, McFunctionFormatRules], Optional[bytes]]
+"""(argument, rules) -> normalizedText. Returns None, if the text of the argument should be kept as it is."""
+
+_argumentNormalizers: dict[str, ArgumentNormalizer] = {}
+argumentNormalizer = AddToDictDecorator(_argumentNormalizers)
+"""registers an ArgumentNormalizer for an argument type, e.g. `@argumentNormalizer(MINECRAFT_VEC3.name)`"""
+
+
+def normalizeArgument(argument: ParsedArgument, rules: McFunctionFormatRules) -> bytes:
+	schema = argument.schema
+	if isinstance(schema, ArgumentSchema) and (normalizer := _argumentNormalizers.get(schema.typeName)) is not None:
+		if (normalized := normalizer(argument, rules)) is not None:
+			return normalized
+	return argument.content
+
+
+ArgumentMeaning = Callable[[ParsedArgument], Optional[Hashable]]
+"""
+argument -> a value that is equal for two arguments if, and only if, they mean the same (e.g. `~0` and `~`). Returns None,
+if the content of the argument has to be compared. Argument types with an ArgumentNormalizer need one.
+"""
+
+_argumentMeanings: dict[str, ArgumentMeaning] = {}
+argumentMeaning = AddToDictDecorator(_argumentMeanings)
+"""registers an ArgumentMeaning for an argument type, e.g. `@argumentMeaning(MINECRAFT_VEC3.name)`"""
+
+
+def getArgumentMeaning(argument: CommandPart) -> Hashable:
+	schema = argument.schema
+	if isinstance(schema, ArgumentSchema) and (meaning := _argumentMeanings.get(schema.typeName)) is not None:
+		if (result := meaning(argument)) is not None:
+			return result
+	return argument.content
+
+
+def _arguments(command: ParsedCommand) -> list[CommandPart]:
+	result = []
+	arg = command.next
+	while arg is not None:
+		result.append(arg)
+		arg = arg.next
+	return result
+
+
+@dataclass
+class McFunctionFormatter:
+	text: bytes
+	schema: Optional[MCFunctionSchema]
+	options: FormatOptions
+	rules: McFunctionFormatRules
+	_parts: list[bytes] = field(default_factory=list, init=False)
+
+	def _raw(self, node: CommandPart) -> bytes:
+		""":return: the original text of node, including a leading '$' of template commands."""
+		text = self.text
+		lineStart = text.rfind(_NL, 0, node.span.start.index) + 1
+		return text[lineStart:node.span.end.index].strip()
+
+	def _formatArguments(self, command: ParsedCommand) -> Optional[list[tuple[ParsedArgument, bytes]]]:
+		arguments: list[tuple[ParsedArgument, bytes]] = []
+		arg = command.next
+		while arg is not None:
+			if arg.schema is None:
+				return None  # trailing data that could not be parsed.
+			arguments.append((arg, normalizeArgument(arg, self.rules)))
+			arg = arg.next
+		if arguments and command.content.startswith(b'/'):
+			arguments[0] = (arguments[0][0], b'/' + arguments[0][1])
+		return arguments
+
+	def _wrapExecute(self, command: ParsedCommand, arguments: list[tuple[ParsedArgument, bytes]]) -> bytes:
+		"""puts every subcommand of an execute command on its own line."""
+		subcommands = {id(kw) for kw in command.schema.next.keywords.values()}
+		indent = self.options.indent
+		parts = [arguments[0][1]]
+		for arg, text in arguments[1:]:
+			parts += (_LINE_CONTINUATION + indent if id(arg.schema) in subcommands else b' ', text)
+		return b''.join(parts)
+
+	def _isSameCommand(self, command: ParsedCommand, formatted: bytes) -> bool:
+		tree, errors, _ = parse(formatted, filePath=None, language=MC_FUNCTION_ID, schema=self.schema)
+		if tree is None or any(error.style == 'error' for error in errors):
+			return False
+		children = tree.children
+		if len(children) != 1 or not isinstance(newCommand := next(iter(children)), ParsedCommand):
+			return False
+		oldArguments = _arguments(command)
+		newArguments = _arguments(newCommand)
+		return len(oldArguments) == len(newArguments) and all(
+			old.schema is new.schema and getArgumentMeaning(old) == getArgumentMeaning(new)
+			for old, new in zip(oldArguments, newArguments)
+		)
+
+	def formatCommand(self, command: ParsedCommand) -> bytes:
+		raw = self._raw(command)
+		if command.isTemplateCommand or command.schema is None:
+			return raw  # the arguments of templates are only known once the macro is expanded.
+		arguments = self._formatArguments(command)
+		if not arguments:
+			return raw
+		formatted = b' '.join(text for _, text in arguments)
+		if self.rules.wrapLongExecuteCommands and command.name == _EXECUTE and len(formatted) > self.options.lineWidth:
+			formatted = self._wrapExecute(command, arguments)
+		if formatted != raw and not self._isSameCommand(command, formatted):
+			return raw
+		return formatted
+
+	def format(self, root: MCFunction) -> bytes:
+		parts = self._parts
+		parts.clear()
+		prevEnd: Optional[int] = None
+		for child in root.children:
+			start = child.span.start.index
+			if prevEnd is not None:
+				# keep at most one empty line between commands:
+				parts.append(_NL + _NL if self.text.count(_NL, prevEnd, start) > 1 else _NL)
+			if isinstance(child, ParsedCommand):
+				parts.append(self.formatCommand(child))
+			else:
+				parts.append(self._raw(child))
+			prevEnd = child.span.end.index
+		if parts:
+			parts.append(_NL)
+		return b''.join(parts)
+
+
+@formatter(MC_FUNCTION_ID)
+def formatMcFunction(tree: Node, text: bytes, options: FormatOptions) -> bytes:
+	assert isinstance(tree, MCFunction)
+	return McFunctionFormatter(text, tree.schema, options, McFunctionFormatRules.fromSettings()).format(tree)
+
+
+__all__ = [
+	'McFunctionFormatRules',
+	'ArgumentNormalizer',
+	'argumentNormalizer',
+	'normalizeArgument',
+	'ArgumentMeaning',
+	'argumentMeaning',
+	'getArgumentMeaning',
+	'McFunctionFormatter',
+	'formatMcFunction',
+]
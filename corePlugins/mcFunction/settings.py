@@ -0,0 +1,59 @@
+from dataclasses import dataclass, field
+
+from cat.GUI import propertyDecorators as pd
+from cat.Serializable.serializableDataclasses import catMeta
+from base.model.applicationSettings import SettingsAspect
+from base.model.aspect import AspectType
+
+MC_FUNCTION_ASPECT_TYPE = AspectType('dpe:mc_function')
+
+
+@dataclass()
+class McFunctionSettings(SettingsAspect):
+	@classmethod
+	def getAspectType(cls) -> AspectType:
+		return MC_FUNCTION_ASPECT_TYPE
+
+	formatNormalizeCoordinates: bool = field(
+		default=True,
+		metadata=catMeta(
+			kwargs=dict(
+				label='Format: Normalize Coordinates',
+				tip="When formatting a function, write coordinates like `~0 ~0.0 ^0` as `~ ~ ^`.",
+			),
+			decorators=[pd.ToggleSwitch()]
+		)
+	)
+
+	formatNormalizeTargetSelectors: bool = field(
+		default=True,
+		metadata=catMeta(
+			kwargs=dict(
+				label='Format: Normalize Target Selectors',
+				tip="When formatting a function, remove all whitespace and empty brackets from target selectors, e.g. `@e[ type = pig ]` becomes `@e[type=pig]`.",
+			),
+			decorators=[pd.ToggleSwitch()]
+		)
+	)
+
+	formatNormalizeNbtQuotes: bool = field(
+		default=True,
+		metadata=catMeta(
+			kwargs=dict(
+				label='Format: Normalize SNBT Quotes',
+				tip="When formatting a function, quote strings in SNBT with double quotes, unless single quotes need fewer escapes.",
+			),
+			decorators=[pd.ToggleSwitch()]
+		)
+	)
+
+	formatWrapLongExecuteCommands: bool = field(
+		default=False,
+		metadata=catMeta(
+			kwargs=dict(
+				label='Format: Wrap long execute Commands',
+				tip="When formatting a function, split `execute` commands that are longer than the line width over multiple lines using a `\\` at the end of each line. Requires Minecraft 1.20.2 or newer.",
+			),
+			decorators=[pd.ToggleSwitch()]
+		)
+	)
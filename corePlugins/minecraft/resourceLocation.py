@@ -11,12 +11,13 @@ from cat.utils import Deprecated
 from base.model.parsing.bytesUtils import bytesToStr
 from base.model.parsing.contextProvider import AddContextFunc, ContextProvider, Match, Context, Suggestions, AddContextToDictDecorator
 from base.model.parsing.tree import Schema, Node
-from base.model.pathUtils import FilePath, FilePathTpl
-from base.model.project.project import Root
+from base.model.pathUtils import ArchiveFilePool, FilePath, FilePathTpl
+from base.model.project.project import Root, indexSnapshot
+from base.model.project.references import addReference
 from base.model.session import getSession
 from base.model.utils import Span, Position, GeneralError, SemanticsError, MDStr, LanguageId
 from corePlugins.minecraft_data.fullData import getCurrentFullMcData, FullMCData
-from corePlugins.minecraft_data.resourceLocation import isNamespaceValid, ResourceLocation, RESOURCE_LOCATION_PATTERN
+from corePlugins.minecraft_data.resourceLocation import isNamespaceValid, isPathValid, ResourceLocation, RESOURCE_LOCATION_PATTERN
 from base.model.messages import *
 
 RESOURCE_LOCATION_ID = LanguageId('minecraft:resource_location')
@@ -88,6 +89,12 @@ class MetaInfo:
 	def documentation(self) -> MDStr:
 		return MDStr('')
 
+	def extractDocumentation(self, pool: ArchiveFilePool) -> None:
+		"""
+		called once while the file is indexed, so documentation can be extracted without reopening the file later.
+		"""
+		pass
+
 
 class ResourceLocationCtxProvider(ContextProvider[ResourceLocationNode]):
 
@@ -156,6 +163,7 @@ class ResourceLocationContext(Context[ResourceLocationNode], ABC):
 				pointsToFile = False
 		object.__setattr__(node, 'pointsToFile', pointsToFile)
 		object.__setattr__(node, 'isValid', isValid)
+		addReference(ResourceLocation(node.namespace, node.path, node.isTag))
 		if not isValid:
 			if node.isTag:
 				errorsIO.append(SemanticsError(UNKNOWN_MSG.format(f'{self.name} tag', node.asString), node.span, style='warning'))
@@ -165,28 +173,44 @@ class ResourceLocationContext(Context[ResourceLocationNode], ABC):
 	def getSuggestions(self, node: ResourceLocationNode, pos: Position, replaceCtx: str) -> Suggestions:
 		if not self.checkCorrectNodeType(node, ResourceLocationNode):
 			return []
-		locations: list[ResourceLocation] = []
-
-		if node.schema.allowTags:
-			for dp in getSession().project.allRoots:
-				for tags in self.tagsFromDP(dp):
-					locations.extend(tags)
-
-		if not node.schema.onlyTags:
-			for dp in getSession().project.allRoots:
-				for values in self.valuesFromDP(dp):
-					locations.extend(values)
-			if mcValues := self.valuesFromMC(getCurrentFullMcData()):
-				locations.extend(mcValues)
+		tree = self._getCompletionTree(node.schema.allowTags, node.schema.onlyTags)
 
 		if node.schema.onlyTags:
 			node = replace(node, isTag=True)
 
-		result = choicesFromResourceLocations(node.asString, locations)
+		result = choicesFromAutoCompletionTree(tree, node.asString)
 		if node.schema.onlyTags:
 			result = [s.removeprefix('#') for s in result]
 		return result
 
+	def _getCompletionTree(self, allowTags: bool, onlyTags: bool) -> AutoCompletionTree:
+		project = getSession().project
+		mcData = getCurrentFullMcData()
+		key = (self.name, allowTags, onlyTags)
+		locations: list[ResourceLocation] = []
+		with indexSnapshot():
+			# the generations change whenever a new version of any index is published, so the tree is only rebuilt after a change.
+			# they are read within the snapshot, so they describe the same versions that the tree is built from:
+			generations = project.indexGenerations
+			if (cached := _COMPLETION_TREES.get(key)) is not None and cached[0] == generations and cached[1] is mcData:
+				return cached[2]
+
+			if allowTags:
+				for dp in project.allRoots:
+					for tags in self.tagsFromDP(dp):
+						locations.extend(tags)
+
+			if not onlyTags:
+				for dp in project.allRoots:
+					for values in self.valuesFromDP(dp):
+						locations.extend(values)
+				if mcValues := self.valuesFromMC(mcData):
+					locations.extend(mcValues)
+
+		tree = autoCompletionTreeForResourceLocations(locations)
+		_COMPLETION_TREES[key] = (generations, mcData, tree)
+		return tree
+
 	def getDocumentation(self, node: ResourceLocationNode, pos: Position) -> MDStr:
 		if not self.checkCorrectNodeType(node, ResourceLocationNode):
 			return MDStr('')
@@ -225,6 +249,9 @@ class ResourceLocationContext(Context[ResourceLocationNode], ABC):
 					return
 
 
+_COMPLETION_TREES: dict[tuple[str, bool, bool], tuple[tuple[int, ...], FullMCData, AutoCompletionTree]] = {}
+"""(context name, allowTags, onlyTags) -> (index generations, mc data, tree)"""
+
 __resourceLocationContexts: dict[str, ResourceLocationContext] = {}
 _addResourceLocationContext = AddContextToDictDecorator[ResourceLocationContext](__resourceLocationContexts)
 
@@ -273,4 +300,5 @@ __all__ = [
 	'getAllKnownResourceLocationContexts',
 	'containsResourceLocation',
 	'isNamespaceValid',
+	'isPathValid',
 ]
@@ -7,6 +7,7 @@ from typing import ClassVar, Optional
 from base.model.parsing.bytesUtils import strToBytes
 from cat.utils.collections_ import FrozenDict
 from base.modules import loadAllModules, FolderAndFileFilter
+from .nbtShapes import NBTShapes
 from .resourceLocation import ResourceLocation
 
 
@@ -38,6 +39,7 @@ class CustomMCData:
 
 	slots: FrozenDict[bytes, Optional[int]]
 	gamerules: FrozenDict[bytes, Gamerule]
+	nbtShapes: NBTShapes
 
 	EMPTY: ClassVar[CustomMCData]
 
@@ -55,6 +57,7 @@ CustomMCData.EMPTY = CustomMCData(
 	damageTypes=frozenset(),
 	slots=FrozenDict(),
 	gamerules=FrozenDict(),
+	nbtShapes=NBTShapes.EMPTY,
 )
 
 
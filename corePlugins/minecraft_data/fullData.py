@@ -1,11 +1,13 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Mapping, Optional, ClassVar
+from typing import Iterable, Mapping, Optional, ClassVar
 
 from cat.utils import last
+from base.model.memoryUsage import MemoryRoot, memoryProvider
 from cat.utils.collections_ import FrozenDict
 from .customData import CustomMCData, Gamerule
 from .mcdAdapter import MCData, BlockStateType
+from .nbtShapes import NBTShapes
 from .resourceLocation import ResourceLocation
 
 
@@ -35,6 +37,7 @@ class FullMCData:
 	slots: FrozenDict[bytes, Optional[int]]
 	blockStates: FrozenDict[ResourceLocation, list[BlockStateType]]
 	gamerules: FrozenDict[bytes, Gamerule]
+	nbtShapes: NBTShapes
 
 	def getBlockStates(self, blockID: ResourceLocation) -> list[BlockStateType]:
 		arguments = self.blockStates.get(blockID)
@@ -80,6 +83,7 @@ def buildFullMCData(name: str, mcData: Optional[MCData], cuData: Optional[Custom
 		slots=cuData.slots,
 		blockStates=mcData.blockStates,
 		gamerules=cuData.gamerules,
+		nbtShapes=cuData.nbtShapes,
 	)
 
 
@@ -124,3 +128,9 @@ def getLatestFullMcData() -> FullMCData:
 def getCurrentFullMcData() -> FullMCData:
 	"""The currently selected FullMCData"""
 	return _CURRENT_MC_VERSION
+
+
+@memoryProvider('minecraftData')
+def _fullMcDatas() -> Iterable[MemoryRoot]:
+	for name, data in _ALL_MC_VERSIONS.items():
+		yield MemoryRoot(name, data)
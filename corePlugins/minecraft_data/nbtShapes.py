@@ -0,0 +1,177 @@
+"""
+Known NBT shapes of entities and block entities, i.e. which keys their compounds contain and which tag types these have.
+This is used to validate and complete NBT paths. The shapes are deliberately incomplete; they only cover what is
+commonly accessed by data packs. Compounds whose keys are not all listed must be open (isOpen=True), so unlisted keys are
+not reported as unknown.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import ClassVar, Mapping, Optional, Sequence
+
+from cat.utils.collections_ import FrozenDict
+from .resourceLocation import ResourceLocation
+
+NBT_SHAPE_TYPES: frozenset[str] = frozenset({
+	'byte', 'short', 'int', 'long', 'float', 'double', 'string',
+	'list', 'compound', 'byte_array', 'int_array', 'long_array',
+	'any',
+})
+
+_ELEMENT_TYPES: dict[str, str] = {
+	'byte_array': 'byte',
+	'int_array': 'int',
+	'long_array': 'long',
+}
+
+
+@dataclass(frozen=True)
+class NBTShape:
+	type: str
+	"""one of NBT_SHAPE_TYPES"""
+	description: str = ''
+	keys: FrozenDict[str, NBTShape] = field(default_factory=FrozenDict)
+	"""for compounds only"""
+	element: Optional[NBTShape] = None
+	"""for lists and arrays only"""
+	isOpen: bool = False
+	"""for compounds only: whether keys that are not listed are allowed too (e.g. the tag of an item stack)"""
+
+	def __post_init__(self):
+		assert self.type in NBT_SHAPE_TYPES, self.type
+
+	@property
+	def isCompound(self) -> bool:
+		return self.type == 'compound'
+
+	@property
+	def isListLike(self) -> bool:
+		return self.type == 'list' or self.type in _ELEMENT_TYPES
+
+	@property
+	def isAny(self) -> bool:
+		return self.type == 'any'
+
+	def getKey(self, key: str) -> Optional[NBTShape]:
+		""":return: the shape of key, ANY_SHAPE if it is unknown, but allowed, or None if it is not allowed."""
+		if self.type == 'any':
+			return ANY_SHAPE
+		if (shape := self.keys.get(key)) is not None:
+			return shape
+		return ANY_SHAPE if self.isOpen else None
+
+	def getElement(self) -> NBTShape:
+		if self.element is not None:
+			return self.element
+		if (elementType := _ELEMENT_TYPES.get(self.type)) is not None:
+			return NBTShape(elementType)
+		return ANY_SHAPE
+
+
+ANY_SHAPE = NBTShape('any')
+
+
+def tag(type_: str, description: str = '') -> NBTShape:
+	return NBTShape(type_, description)
+
+
+def listOf(element: NBTShape, description: str = '') -> NBTShape:
+	return NBTShape('list', description, element=element)
+
+
+def compound(keys: Mapping[str, NBTShape], *, bases: Sequence[NBTShape] = (), description: str = '', isOpen: bool = False) -> NBTShape:
+	"""creates a compound shape with all keys of bases and keys. keys override keys of the bases."""
+	allKeys: dict[str, NBTShape] = {}
+	for base in bases:
+		allKeys.update(base.keys)
+		isOpen = isOpen or base.isOpen
+	allKeys.update(keys)
+	return NBTShape('compound', description, keys=FrozenDict(allKeys), isOpen=isOpen)
+
+
+def openCompound(description: str = '') -> NBTShape:
+	return NBTShape('compound', description, isOpen=True)
+
+
+def mergeShapes(shape1: NBTShape, shape2: NBTShape) -> NBTShape:
+	"""creates a shape that allows everything either of the two shapes allow."""
+	if shape1 is shape2:
+		return shape1
+	if shape1.type != shape2.type:
+		return ANY_SHAPE
+	if shape1.isCompound:
+		keys = dict(shape1.keys)
+		for key, shape in shape2.keys.items():
+			keys[key] = mergeShapes(keys[key], shape) if key in keys else shape
+		return NBTShape('compound', shape1.description, keys=FrozenDict(keys), isOpen=shape1.isOpen or shape2.isOpen)
+	if shape1.element is not None and shape2.element is not None:
+		return NBTShape(shape1.type, shape1.description, element=mergeShapes(shape1.element, shape2.element))
+	return shape1 if shape1.element is None else shape2
+
+
+def _mergeAll(shapes: Sequence[NBTShape]) -> NBTShape:
+	if not shapes:
+		return ANY_SHAPE
+	result = shapes[0]
+	for shape in shapes[1:]:
+		result = mergeShapes(result, shape)
+	return result
+
+
+@dataclass(frozen=True)
+class NBTShapes:
+	entities: FrozenDict[ResourceLocation, NBTShape]
+	blockEntities: FrozenDict[ResourceLocation, NBTShape]
+	anyEntity: NBTShape
+	"""used, if the entity type is not known. It contains the keys of all entities."""
+	anyBlockEntity: NBTShape
+	"""used, if the block is not known. It contains the keys of all block entities."""
+
+	def getEntityShape(self, entityType: Optional[ResourceLocation]) -> NBTShape:
+		if entityType is None:
+			return self.anyEntity
+		return self.entities.get(entityType, self.anyEntity)
+
+	def getBlockEntityShape(self, blockId: Optional[ResourceLocation]) -> NBTShape:
+		if blockId is None:
+			return self.anyBlockEntity
+		return self.blockEntities.get(blockId, self.anyBlockEntity)
+
+	def extended(
+			self,
+			entities: Mapping[ResourceLocation, NBTShape] = FrozenDict(),
+			blockEntities: Mapping[ResourceLocation, NBTShape] = FrozenDict(),
+	) -> NBTShapes:
+		"""creates new NBTShapes that contain all shapes of self plus the given ones."""
+		return buildNBTShapes(
+			FrozenDict({**self.entities, **entities}),
+			FrozenDict({**self.blockEntities, **blockEntities}),
+		)
+
+	EMPTY: ClassVar[NBTShapes]
+
+
+def buildNBTShapes(entities: Mapping[ResourceLocation, NBTShape], blockEntities: Mapping[ResourceLocation, NBTShape]) -> NBTShapes:
+	return NBTShapes(
+		entities=FrozenDict(entities),
+		blockEntities=FrozenDict(blockEntities),
+		anyEntity=_mergeAll(list(entities.values())),
+		anyBlockEntity=_mergeAll(list(blockEntities.values())),
+	)
+
+
+NBTShapes.EMPTY = buildNBTShapes(FrozenDict(), FrozenDict())
+
+
+__all__ = [
+	'NBT_SHAPE_TYPES',
+	'NBTShape',
+	'ANY_SHAPE',
+	'tag',
+	'listOf',
+	'compound',
+	'openCompound',
+	'mergeShapes',
+	'NBTShapes',
+	'buildNBTShapes',
+]
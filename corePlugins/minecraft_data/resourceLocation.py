@@ -131,9 +131,16 @@ def isNamespaceValid(namespace: str) -> bool:
 	return re.fullmatch(pattern, namespace) is not None
 
 
+def isPathValid(path: str) -> bool:
+	"""the path must not be empty and must not contain empty, '.' or '..' segments."""
+	pattern = r'[0-9a-z_.-]+(?:/[0-9a-z_.-]+)*'
+	return re.fullmatch(pattern, path) is not None and not any(segment in ('.', '..') for segment in path.split('/'))
+
+
 __all__ = [
 	'RESOURCE_LOCATION_NO_TAG_PATTERN',
 	'RESOURCE_LOCATION_PATTERN',
 	'ResourceLocation',
 	'isNamespaceValid',
+	'isPathValid',
 ]
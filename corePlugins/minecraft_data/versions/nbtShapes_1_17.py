@@ -0,0 +1,352 @@
+"""
+NBT shapes of entities and block entities for Minecraft version 1.17 and up.
+compiled from the Minecraft wiki (only the most commonly used keys). Therefore, ENTITY and BLOCK_ENTITY are open, and
+so are all compounds based on them. Only compounds that list all of their keys are closed.
+"""
+from corePlugins.minecraft_data.nbtShapes import NBTShapes, buildNBTShapes, compound, listOf, openCompound, tag
+from corePlugins.minecraft_data.resourceLocation import ResourceLocation
+
+
+def _rl(name: str) -> ResourceLocation:
+	return ResourceLocation.fromString(name)
+
+
+_BYTE = tag('byte')
+_SHORT = tag('short')
+_INT = tag('int')
+_LONG = tag('long')
+_FLOAT = tag('float')
+_DOUBLE = tag('double')
+_STRING = tag('string')
+_UUID = tag('int_array', "The UUID, stored as four ints.")
+
+ITEM_STACK = compound({
+	'id': tag('string', "The resource location of the item."),
+	'Count': tag('byte', "Number of items stacked in this inventory slot."),
+	'Slot': tag('byte', "The inventory slot the item is in."),
+	'tag': openCompound("Additional information about the item."),
+})
+
+_ITEMS = listOf(ITEM_STACK, "The items in this container.")
+
+_EFFECT = compound({
+	'Id': _BYTE,
+	'Amplifier': _BYTE,
+	'Duration': _INT,
+	'Ambient': _BYTE,
+	'ShowParticles': _BYTE,
+	'ShowIcon': _BYTE,
+}, isOpen=True)  # e.g. HiddenEffect, FactorCalculationData
+
+_ATTRIBUTE = compound({
+	'Name': _STRING,
+	'Base': _DOUBLE,
+	'Modifiers': listOf(compound({
+		'Amount': _DOUBLE,
+		'Name': _STRING,
+		'Operation': _INT,
+		'UUID': _UUID,
+	})),
+})
+
+ENTITY = compound({
+	'Air': tag('short', "How much air the entity has, in ticks."),
+	'CustomName': tag('string', "The custom name JSON text component of this entity."),
+	'CustomNameVisible': _BYTE,
+	'FallDistance': _FLOAT,
+	'Fire': _SHORT,
+	'Glowing': _BYTE,
+	'HasVisualFire': _BYTE,
+	'id': _STRING,
+	'Invulnerable': _BYTE,
+	'Motion': listOf(_DOUBLE, "The velocity of the entity [dX, dY, dZ]."),
+	'NoGravity': _BYTE,
+	'OnGround': _BYTE,
+	'Passengers': listOf(openCompound(), "The entities that are riding this entity."),
+	'PortalCooldown': _INT,
+	'Pos': listOf(_DOUBLE, "The position of the entity [X, Y, Z]."),
+	'Rotation': listOf(_FLOAT, "The rotation of the entity [yaw, pitch]."),
+	'Silent': _BYTE,
+	'Tags': listOf(_STRING, "The scoreboard tags of this entity."),
+	'TicksFrozen': _INT,
+	'UUID': _UUID,
+}, isOpen=True)
+
+MOB = compound({
+	'AbsorptionAmount': _FLOAT,
+	'ActiveEffects': listOf(_EFFECT),
+	'ArmorDropChances': listOf(_FLOAT),
+	'ArmorItems': listOf(ITEM_STACK, "The armor items [feet, legs, chest, head]."),
+	'Attributes': listOf(_ATTRIBUTE),
+	'Brain': openCompound(),
+	'CanPickUpLoot': _BYTE,
+	'DeathLootTable': _STRING,
+	'DeathLootTableSeed': _LONG,
+	'DeathTime': _SHORT,
+	'FallFlying': _BYTE,
+	'HandDropChances': listOf(_FLOAT),
+	'HandItems': listOf(ITEM_STACK, "The items in the hands [main hand, off hand]."),
+	'Health': tag('float', "The health of the mob."),
+	'HurtByTimestamp': _INT,
+	'HurtTime': _SHORT,
+	'LeftHanded': _BYTE,
+	'Leash': openCompound(),
+	'NoAI': _BYTE,
+	'PersistenceRequired': _BYTE,
+	'Team': _STRING,
+}, bases=[ENTITY])
+
+_BREEDABLE = compound({
+	'Age': _INT,
+	'ForcedAge': _INT,
+	'InLove': _INT,
+	'LoveCause': _UUID,
+}, bases=[MOB])
+
+_TAMEABLE = compound({
+	'Owner': _UUID,
+	'Sitting': _BYTE,
+}, bases=[_BREEDABLE])
+
+_ZOMBIE = compound({
+	'CanBreakDoors': _BYTE,
+	'DrownedConversionTime': _INT,
+	'InWaterTime': _INT,
+	'IsBaby': _BYTE,
+}, bases=[MOB])
+
+_HORSE = compound({
+	'Bred': _BYTE,
+	'EatingHaystack': _BYTE,
+	'Owner': _UUID,
+	'SaddleItem': ITEM_STACK,
+	'Tame': _BYTE,
+	'Temper': _INT,
+}, bases=[_BREEDABLE])
+
+_PROJECTILE = compound({
+	'HasBeenShot': _BYTE,
+	'LeftOwner': _BYTE,
+	'Owner': _UUID,
+}, bases=[ENTITY])
+
+_ARROW = compound({
+	'crit': _BYTE,
+	'damage': _DOUBLE,
+	'inGround': _BYTE,
+	'life': _SHORT,
+	'pickup': _BYTE,
+	'PierceLevel': _BYTE,
+	'ShotFromCrossbow': _BYTE,
+	'SoundEvent': _STRING,
+}, bases=[_PROJECTILE])
+
+_ITEM_FRAME = compound({
+	'Facing': _BYTE,
+	'Fixed': _BYTE,
+	'Invisible': _BYTE,
+	'Item': ITEM_STACK,
+	'ItemDropChance': _FLOAT,
+	'ItemRotation': _BYTE,
+}, bases=[ENTITY])
+
+PLAYER = compound({
+	'abilities': compound({
+		'flying': _BYTE,
+		'flySpeed': _FLOAT,
+		'instabuild': _BYTE,
+		'invulnerable': _BYTE,
+		'mayBuild': _BYTE,
+		'mayfly': _BYTE,
+		'walkSpeed': _FLOAT,
+	}),
+	'DataVersion': _INT,
+	'Dimension': _STRING,
+	'EnderItems': _ITEMS,
+	'enteredNetherPosition': compound({'x': _DOUBLE, 'y': _DOUBLE, 'z': _DOUBLE}),
+	'foodExhaustionLevel': _FLOAT,
+	'foodLevel': _INT,
+	'foodSaturationLevel': _FLOAT,
+	'foodTickTimer': _INT,
+	'Inventory': listOf(ITEM_STACK, "The items in the inventory of the player."),
+	'playerGameType': _INT,
+	'previousPlayerGameType': _INT,
+	'recipeBook': openCompound(),
+	'RootVehicle': openCompound(),
+	'Score': _INT,
+	'seenCredits': _BYTE,
+	'SelectedItem': ITEM_STACK,
+	'SelectedItemSlot': _INT,
+	'ShoulderEntityLeft': openCompound(),
+	'ShoulderEntityRight': openCompound(),
+	'SleepTimer': _SHORT,
+	'SpawnAngle': _FLOAT,
+	'SpawnDimension': _STRING,
+	'SpawnForced': _BYTE,
+	'SpawnX': _INT,
+	'SpawnY': _INT,
+	'SpawnZ': _INT,
+	'XpLevel': _INT,
+	'XpP': _FLOAT,
+	'XpSeed': _INT,
+	'XpTotal': _INT,
+}, bases=[MOB])
+
+_SIMPLE_MOBS: list[str] = [
+	'bat', 'blaze', 'cave_spider', 'creeper', 'dolphin', 'elder_guardian', 'ender_dragon', 'enderman', 'endermite',
+	'evoker', 'ghast', 'giant', 'glow_squid', 'guardian', 'illusioner', 'iron_golem', 'magma_cube', 'phantom',
+	'pillager', 'ravager', 'shulker', 'silverfish', 'skeleton', 'slime', 'snow_golem', 'spider', 'squid', 'stray',
+	'vex', 'vindicator', 'witch', 'wither', 'wither_skeleton', 'cod', 'salmon', 'pufferfish', 'tropical_fish',
+]
+
+_BREEDABLE_MOBS: list[str] = [
+	'axolotl', 'bee', 'chicken', 'cow', 'fox', 'goat', 'hoglin', 'mooshroom', 'ocelot', 'panda', 'pig', 'polar_bear',
+	'rabbit', 'sheep', 'strider', 'turtle', 'villager', 'wandering_trader',
+]
+
+_ENTITIES = {
+	**{_rl(name): MOB for name in _SIMPLE_MOBS},
+	**{_rl(name): _BREEDABLE for name in _BREEDABLE_MOBS},
+	**{_rl(name): _TAMEABLE for name in ['cat', 'parrot', 'wolf']},
+	**{_rl(name): _ZOMBIE for name in ['drowned', 'husk', 'zombie', 'zombie_villager', 'zombified_piglin']},
+	**{_rl(name): _HORSE for name in ['donkey', 'horse', 'llama', 'mule', 'skeleton_horse', 'trader_llama', 'zombie_horse']},
+	**{_rl(name): _ARROW for name in ['arrow', 'spectral_arrow', 'trident']},
+	**{_rl(name): _ITEM_FRAME for name in ['glow_item_frame', 'item_frame']},
+	**{_rl(name): _PROJECTILE for name in ['egg', 'ender_pearl', 'experience_bottle', 'fireball', 'fishing_bobber', 'llama_spit', 'potion', 'small_fireball', 'snowball', 'wither_skull']},
+	_rl('player'): PLAYER,
+	_rl('armor_stand'): compound({
+		'DisabledSlots': _INT,
+		'Invisible': _BYTE,
+		'Marker': _BYTE,
+		'NoBasePlate': _BYTE,
+		'Pose': compound({part: listOf(_FLOAT) for part in ['Body', 'Head', 'LeftArm', 'LeftLeg', 'RightArm', 'RightLeg']}),
+		'ShowArms': _BYTE,
+		'Small': _BYTE,
+	}, bases=[MOB]),
+	_rl('area_effect_cloud'): compound({
+		'Age': _INT,
+		'Color': _INT,
+		'Duration': _INT,
+		'DurationOnUse': _INT,
+		'Effects': listOf(_EFFECT),
+		'Owner': _UUID,
+		'Particle': _STRING,
+		'Potion': _STRING,
+		'Radius': _FLOAT,
+		'RadiusOnUse': _FLOAT,
+		'RadiusPerTick': _FLOAT,
+		'ReapplicationDelay': _INT,
+		'WaitTime': _INT,
+	}, bases=[ENTITY]),
+	_rl('experience_orb'): compound({
+		'Age': _SHORT,
+		'Count': _INT,
+		'Health': _SHORT,
+		'Value': _SHORT,
+	}, bases=[ENTITY]),
+	_rl('falling_block'): compound({
+		'BlockState': compound({'Name': _STRING, 'Properties': openCompound()}),
+		'DropItem': _BYTE,
+		'FallHurtAmount': _FLOAT,
+		'FallHurtMax': _INT,
+		'HurtEntities': _BYTE,
+		'TileEntityData': openCompound(),
+		'Time': _INT,
+	}, bases=[ENTITY]),
+	_rl('item'): compound({
+		'Age': _SHORT,
+		'Health': _SHORT,
+		'Item': ITEM_STACK,
+		'Owner': _UUID,
+		'PickupDelay': _SHORT,
+		'Thrower': _UUID,
+	}, bases=[ENTITY]),
+	_rl('marker'): compound({
+		'data': openCompound("Arbitrary data, not used by the game."),
+	}, bases=[ENTITY]),
+	_rl('tnt'): compound({
+		'Fuse': _SHORT,
+	}, bases=[ENTITY]),
+}
+
+
+BLOCK_ENTITY = compound({
+	'id': _STRING,
+	'keepPacked': _BYTE,
+	'x': _INT,
+	'y': _INT,
+	'z': _INT,
+}, isOpen=True)
+
+_CONTAINER = compound({
+	'CustomName': _STRING,
+	'Items': _ITEMS,
+	'Lock': _STRING,
+	'LootTable': _STRING,
+	'LootTableSeed': _LONG,
+}, bases=[BLOCK_ENTITY])
+
+_FURNACE = compound({
+	'BurnTime': _SHORT,
+	'CookTime': _SHORT,
+	'CookTimeTotal': _SHORT,
+	'RecipesUsed': openCompound(),
+}, bases=[_CONTAINER])
+
+_SIGN = compound({
+	'Color': _STRING,
+	'GlowingText': _BYTE,
+	'Text1': _STRING,
+	'Text2': _STRING,
+	'Text3': _STRING,
+	'Text4': _STRING,
+}, bases=[BLOCK_ENTITY])
+
+_COMMAND_BLOCK = compound({
+	'auto': _BYTE,
+	'Command': _STRING,
+	'conditionMet': _BYTE,
+	'CustomName': _STRING,
+	'LastExecution': _LONG,
+	'LastOutput': _STRING,
+	'powered': _BYTE,
+	'SuccessCount': _INT,
+	'TrackOutput': _BYTE,
+	'UpdateLastExecution': _BYTE,
+}, bases=[BLOCK_ENTITY])
+
+_BLOCK_ENTITIES = {
+	**{_rl(name): _CONTAINER for name in ['barrel', 'chest', 'dispenser', 'dropper', 'hopper', 'shulker_box', 'trapped_chest']},
+	**{_rl(name): _FURNACE for name in ['blast_furnace', 'furnace', 'smoker']},
+	**{_rl(name): _SIGN for name in ['acacia_sign', 'birch_sign', 'crimson_sign', 'dark_oak_sign', 'jungle_sign', 'oak_sign', 'spruce_sign', 'warped_sign']},
+	**{_rl(name): _COMMAND_BLOCK for name in ['chain_command_block', 'command_block', 'repeating_command_block']},
+	_rl('beehive'): compound({
+		'Bees': listOf(compound({'EntityData': openCompound(), 'MinOccupationTicks': _INT, 'TicksInHive': _INT})),
+		'FlowerPos': compound({'X': _INT, 'Y': _INT, 'Z': _INT}),
+	}, bases=[BLOCK_ENTITY]),
+	_rl('brewing_stand'): compound({
+		'BrewTime': _SHORT,
+		'Fuel': _BYTE,
+	}, bases=[_CONTAINER]),
+	_rl('jukebox'): compound({
+		'RecordItem': ITEM_STACK,
+	}, bases=[BLOCK_ENTITY]),
+	_rl('lectern'): compound({
+		'Book': ITEM_STACK,
+		'Page': _INT,
+	}, bases=[BLOCK_ENTITY]),
+	_rl('spawner'): compound({
+		'Delay': _SHORT,
+		'MaxNearbyEntities': _SHORT,
+		'MaxSpawnDelay': _SHORT,
+		'MinSpawnDelay': _SHORT,
+		'RequiredPlayerRange': _SHORT,
+		'SpawnCount': _SHORT,
+		'SpawnData': openCompound(),
+		'SpawnPotentials': listOf(openCompound()),
+		'SpawnRange': _SHORT,
+	}, bases=[BLOCK_ENTITY]),
+}
+
+
+NBT_SHAPES_1_17: NBTShapes = buildNBTShapes(_ENTITIES, _BLOCK_ENTITIES)
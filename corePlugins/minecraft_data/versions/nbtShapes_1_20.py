@@ -0,0 +1,96 @@
+"""
+NBT shapes of entities and block entities that were added or changed in Minecraft version 1.20.
+compiled from the Minecraft wiki (only the most commonly used keys). All entity and block entity compounds are based on
+the open ENTITY and BLOCK_ENTITY compounds, see nbtShapes_1_17.
+"""
+from corePlugins.minecraft_data.nbtShapes import NBTShapes, compound, listOf, openCompound, tag
+from corePlugins.minecraft_data.resourceLocation import ResourceLocation
+from .nbtShapes_1_17 import BLOCK_ENTITY, ENTITY, ITEM_STACK, MOB, NBT_SHAPES_1_17
+
+
+def _rl(name: str) -> ResourceLocation:
+	return ResourceLocation.fromString(name)
+
+
+_BYTE = tag('byte')
+_INT = tag('int')
+_FLOAT = tag('float')
+_STRING = tag('string')
+
+_TRANSFORMATION = compound({
+	'left_rotation': listOf(_FLOAT),
+	'right_rotation': listOf(_FLOAT),
+	'scale': listOf(_FLOAT),
+	'translation': listOf(_FLOAT),
+})
+
+_DISPLAY = compound({
+	'billboard': _STRING,
+	'brightness': compound({'block': _INT, 'sky': _INT}),
+	'glow_color_override': _INT,
+	'height': _FLOAT,
+	'interpolation_duration': _INT,
+	'shadow_radius': _FLOAT,
+	'shadow_strength': _FLOAT,
+	'start_interpolation': _INT,
+	'transformation': _TRANSFORMATION,
+	'view_range': _FLOAT,
+	'width': _FLOAT,
+}, bases=[ENTITY])
+
+_SIGN_TEXT = compound({
+	'color': _STRING,
+	'has_glowing_text': _BYTE,
+	'messages': listOf(_STRING),
+	'filtered_messages': listOf(_STRING),
+})
+
+_SIGN = compound({
+	'back_text': _SIGN_TEXT,
+	'front_text': _SIGN_TEXT,
+	'is_waxed': _BYTE,
+}, bases=[BLOCK_ENTITY])
+
+_WOOD_TYPES: list[str] = ['acacia', 'bamboo', 'birch', 'cherry', 'crimson', 'dark_oak', 'jungle', 'mangrove', 'oak', 'spruce', 'warped']
+
+
+NBT_SHAPES_1_20: NBTShapes = NBT_SHAPES_1_17.extended(
+	entities={
+		**{_rl(name): MOB for name in ['allay', 'camel', 'frog', 'sniffer', 'tadpole', 'warden']},
+		_rl('block_display'): compound({
+			'block_state': compound({'Name': _STRING, 'Properties': openCompound()}),
+		}, bases=[_DISPLAY]),
+		_rl('item_display'): compound({
+			'item': ITEM_STACK,
+			'item_display': _STRING,
+		}, bases=[_DISPLAY]),
+		_rl('text_display'): compound({
+			'alignment': _STRING,
+			'background': _INT,
+			'default_background': _BYTE,
+			'line_width': _INT,
+			'see_through': _BYTE,
+			'shadow': _BYTE,
+			'text': _STRING,
+			'text_opacity': _BYTE,
+		}, bases=[_DISPLAY]),
+		_rl('interaction'): compound({
+			'attack': openCompound(),
+			'height': _FLOAT,
+			'interaction': openCompound(),
+			'response': _BYTE,
+			'width': _FLOAT,
+		}, bases=[ENTITY]),
+	},
+	blockEntities={
+		**{_rl(f'{wood}_sign'): _SIGN for wood in _WOOD_TYPES},
+		**{_rl(f'{wood}_hanging_sign'): _SIGN for wood in _WOOD_TYPES},
+		_rl('chiseled_bookshelf'): compound({
+			'Items': listOf(ITEM_STACK),
+			'last_interacted_slot': _INT,
+		}, bases=[BLOCK_ENTITY]),
+		_rl('decorated_pot'): compound({
+			'sherds': listOf(_STRING),
+		}, bases=[BLOCK_ENTITY]),
+	},
+)
@@ -7,6 +7,7 @@ from cat.utils.collections_ import FrozenDict
 from corePlugins.minecraft_data.customData import CustomMCData, Gamerule, buildGamerulesDict
 from corePlugins.minecraft_data.resourceLocation import ResourceLocation
 from base.model.parsing.bytesUtils import strToBytes
+from .nbtShapes_1_17 import NBT_SHAPES_1_17
 
 
 _VERSION_1_17_0 = CustomMCData(
@@ -348,6 +349,7 @@ _VERSION_1_17_0 = CustomMCData(
 			defaultValue='false',
 		),
 	]),
+	nbtShapes=NBT_SHAPES_1_17,
 )
 
 
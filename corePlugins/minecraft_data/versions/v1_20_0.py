@@ -8,6 +8,7 @@ from corePlugins.minecraft_data.customData import CustomMCData, Gamerule, buildG
 from corePlugins.minecraft_data.resourceLocation import ResourceLocation
 from base.model.parsing.bytesUtils import strToBytes
 from . import v1_18_0
+from .nbtShapes_1_20 import NBT_SHAPES_1_20
 
 
 _VERSION_1_18_X = v1_18_0.ALL_VERSIONS[-1]
@@ -17,6 +18,7 @@ _VERSION_1_20_0 = replace(
 	_VERSION_1_18_X, 
 	name='1.20',
 	datapackVersion='15',
+	nbtShapes=NBT_SHAPES_1_20,
 	# compiled from the Minecraft wiki:
 	predicateConditions=_VERSION_1_18_X.predicateConditions
 						- {ResourceLocation.fromString('alternative')}
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import re
+import threading
+from copy import copy
+from typing import Callable, Optional, Type
+
+from cat.utils.collections_ import OrderedDict
+from base.model.utils import Position, Span
+from .tags import *
+
+_LITERAL_TOKENS_PATTERN: re.Pattern[bytes] = re.compile(rb'"(?:[^"\\\n]|\\.)*"|\'(?:[^\'\\\n]|\\.)*\'|[\[\]{}\n]')
+_OPENING_BRACKETS = frozenset(b'[{')
+_CLOSING_BRACKETS = frozenset(b']}')
+_ORD_NEW_LINE = ord('\n')
+
+MAX_CACHED_LITERAL_LENGTH: int = 4096
+"""longer literals are rare and mostly unique, so they are not worth the memory."""
+
+
+def findSNBTLiteralEnd(text: bytes, start: int) -> int:
+	"""
+	Finds the end of the compound or list literal starting at text[start], by matching brackets outside of strings.
+	This does not check whether the literal is valid SNBT.
+	:return: the index just behind the closing bracket or -1, if the literal is not closed on the same line.
+	"""
+	if start >= len(text) or text[start] not in _OPENING_BRACKETS:
+		return -1
+	depth = 0
+	for match in _LITERAL_TOKENS_PATTERN.finditer(text, start):
+		char = text[match.start()]
+		if char in _OPENING_BRACKETS:
+			depth += 1
+		elif char in _CLOSING_BRACKETS:
+			depth -= 1
+			if depth == 0:
+				return match.end()
+		elif char == _ORD_NEW_LINE:
+			return -1
+	return -1
+
+
+def _rebaseSpan(span: Span, line: int, columnDelta: int, indexDelta: int) -> Span:
+	start = span.start
+	end = span.end
+	return Span(
+		Position(line, start.column + columnDelta, start.index + indexDelta),
+		Position(line, end.column + columnDelta, end.index + indexDelta),
+	)
+
+
+_Rebaser = Callable[[NBTTag, int, int, int], NBTTag]
+_REBASERS: dict[Type[NBTTag], _Rebaser] = {}
+
+
+def rebaseTag(tag: NBTTag, line: int, columnDelta: int, indexDelta: int) -> NBTTag:
+	"""
+	Creates a copy of a tag tree that lies on a single line, with all spans moved to line and shifted by the given deltas.
+	Leaf values are shared, because they are immutable.
+	"""
+	clone = copy(tag)
+	clone.span = _rebaseSpan(tag.span, line, columnDelta, indexDelta)
+	if (rebaser := _REBASERS.get(type(tag))) is not None:
+		clone.data = rebaser(tag, line, columnDelta, indexDelta)
+	return clone
+
+
+def _rebaseList(tag: ListTag | ArrayTag, line: int, columnDelta: int, indexDelta: int) -> list[NBTTag]:
+	return [rebaseTag(item, line, columnDelta, indexDelta) for item in tag.data]
+
+
+def _rebaseProperty(tag: NBTProperty, line: int, columnDelta: int, indexDelta: int) -> tuple[StringTag, NBTTag]:
+	return rebaseTag(tag.key, line, columnDelta, indexDelta), rebaseTag(tag.value, line, columnDelta, indexDelta)
+
+
+def _rebaseCompound(tag: CompoundTag, line: int, columnDelta: int, indexDelta: int) -> OrderedDict[str, NBTTag]:
+	return OrderedDict((key, rebaseTag(prop, line, columnDelta, indexDelta)) for key, prop in tag.data.items())
+
+
+_REBASERS.update({
+	ListTag: _rebaseList,
+	ByteArrayTag: _rebaseList,
+	IntArrayTag: _rebaseList,
+	LongArrayTag: _rebaseList,
+	NBTProperty: _rebaseProperty,
+	CompoundTag: _rebaseCompound,
+})
+
+
+class SNBTLiteralCache:
+	"""
+	A bounded LRU cache of parsed SNBT literals, keyed by their raw bytes. Function files tend to repeat the same
+	compound tags (e.g. item or entity data) over and over, so most of them need to be parsed only once.
+	Only literals that parsed without any error and lie on a single line are stored. Every lookup returns a fresh copy,
+	rebased to the position of the literal, so callers are free to modify it.
+	"""
+
+	def __init__(self, maxSize: int = 1024):
+		self.maxSize: int = maxSize
+		self._entries: dict[bytes, NBTTag] = {}  # insertion order = LRU order
+		self._lock = threading.Lock()
+		self.hits: int = 0
+		self.misses: int = 0
+
+	def get(self, literal: bytes, start: Position) -> Optional[NBTTag]:
+		with self._lock:
+			template = self._entries.pop(literal, None)
+			if template is None:
+				self.misses += 1
+				return None
+			self._entries[literal] = template
+			self.hits += 1
+		templateStart = template.span.start
+		return rebaseTag(template, start.line, start.column - templateStart.column, start.index - templateStart.index)
+
+	def put(self, literal: bytes, tag: NBTTag) -> None:
+		if len(literal) > MAX_CACHED_LITERAL_LENGTH:
+			return
+		# store a private copy, so later modifications of tag do not leak into the cache:
+		template = rebaseTag(tag, tag.span.start.line, 0, 0)
+		with self._lock:
+			self._entries.pop(literal, None)
+			self._entries[literal] = template
+			while len(self._entries) > self.maxSize:
+				del self._entries[next(iter(self._entries))]
+
+	def clear(self) -> None:
+		with self._lock:
+			self._entries.clear()
+			self.hits = 0
+			self.misses = 0
+
+	def __len__(self) -> int:
+		return len(self._entries)
+
+
+SNBT_LITERAL_CACHE = SNBTLiteralCache()
+
+
+__all__ = [
+	'MAX_CACHED_LITERAL_LENGTH',
+	'findSNBTLiteralEnd',
+	'rebaseTag',
+	'SNBTLiteralCache',
+	'SNBT_LITERAL_CACHE',
+]
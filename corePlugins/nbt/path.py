@@ -1,108 +1,51 @@
+import re
 from dataclasses import dataclass
-from typing import ClassVar, Collection, Optional
-
-from nbtlib import Compound, CompoundMatch, Int, InvalidLiteral, List, ListIndex, Parser, Path, String, tokenize
-from nbtlib.path import NamedKey, can_be_converted_to_int, extend_accessors
+from enum import Enum
+from typing import ClassVar, Collection, NamedTuple, Optional
 
+from base.model.messages import EXPECTED_MSG_RAW, TRAILING_NOT_ALLOWED_MSG
 from base.model.parsing.bytesUtils import bytesToStr
 from base.model.parsing.parser import ParserBase
 from base.model.parsing.tree import Node, Schema, _TNode
-from base.model.utils import GeneralError, LanguageId, ParsingError, Span, wrapInMarkdownCode
-
-
-class InvalidPath(ValueError):
-	"""Raised when creating an invalid nbt path."""
-
-	def __str__(self):
-		return f"{self.args[1]} at position {self.args[0][0]}"
-
-
-def parse_accessors(parser: Parser, literal: str):
-	while True:
-		try:
-			tag = parser.parse()
-		except InvalidLiteral as exc:
-			raise InvalidPath(exc.args[0], f"Invalid path. ({exc.args[1]})") from exc
-
-		if isinstance(tag, String):
-			if parser.current_token.type == "QUOTED_STRING":
-				yield NamedKey(tag[:])
-			else:
-				yield from (NamedKey(key) for key in tag.split(".") if key)
-
-		elif isinstance(tag, List):
-			if not tag:
-				yield ListIndex(index=None)
-			elif len(tag) != 1:
-				raise InvalidPath(None, "Brackets should only contain one element")
-			elif issubclass(tag.subtype, Compound):
-				yield ListIndex(index=None)
-				yield CompoundMatch(tag[0])
-			elif issubclass(tag.subtype, Int) or can_be_converted_to_int(tag[0]):
-				yield ListIndex(int(tag[0]))
-			else:
-				raise InvalidPath(
-					None, "Brackets should only contain an integer or a compound"
-				)
-
-		elif isinstance(tag, Compound):
-			yield CompoundMatch(tag)
-
-		elif parser.current_token.type == "NUMBER":
-			yield from (
-				NamedKey(key) for key in parser.current_token.value.split(".") if key
-			)
-
-		else:
-			raise InvalidPath(None, f"Invalid path element {tag}")
-
-		try:
-			nextCharPos = parser.token_span[1] - 1
-			if nextCharPos < len(literal) and literal[nextCharPos] in {' ', '\t'}:
-				break
-			parser.next()
-		except InvalidLiteral:
-			break
-
-
-def _parseNBTPathBare(sr: ParserBase, *, errorsIO: list[GeneralError]) -> Optional[Path]:
-	p1 = sr.currentPos
-
-	literal = sr.text[sr.cursor:]
-	literal = bytesToStr(literal)  # TODO utf-8-ify _parseNBTPathBare(...)!
-	parser = None
-	try:
-		parser = Parser(tokenize(literal))
-	except InvalidLiteral:
-		accessorsIter = ()
-	else:
-		accessorsIter = parse_accessors(parser, literal)
-
-	try:
-		accessors = ()
-		for accessor in accessorsIter:
-			accessors = extend_accessors(accessors, accessor)
-
-		path = Path.from_accessors(accessors)
-		if parser is not None:
-			cursor = parser.token_span[1]
-			if cursor != len(literal):
-				cursor -= 1
-			sr.cursor += cursor
-	except (InvalidLiteral, InvalidPath) as ex:
-		message = ex.args[1]
-		if ex.args[0] is None:
-			p2 = sr.currentPos
-			begin, end = p1, p2
-		else:
-			start = ex.args[0][0] + sr.cursor
-			stop = ex.args[0][1] + sr.cursor
-			begin = sr._posFromColumn(start)
-			end = sr._posFromColumn(stop)
-		errorsIO.append(ParsingError(wrapInMarkdownCode(message), Span(begin, end), style='error'))
-		return None
-
-	return path
+from base.model.utils import LanguageId, Message, Span
+from .snbtParser import SNBTParser
+from .tags import CompoundTag
+
+ROOT_MATCH_NOT_ALLOWED_MSG: Message = Message("A compound match is only allowed at the start of a path or directly after a key", 0)
+EMPTY_KEY_AFTER_DOT_MSG: Message = Message("Expected a key after `.`", 0)
+
+_TERMINATORS: bytes = b' \t\r\n'
+_ORD_DOT = ord('.')
+_ORD_OPEN_COMPOUND = ord('{')
+_ORD_OPEN_LIST = ord('[')
+_ORD_CLOSE_LIST = ord(']')
+_ORD_QUOTES = frozenset(b'"\'')
+
+_UNQUOTED_KEY_PATTERN: re.Pattern[bytes] = re.compile(rb'[^ \t\r\n."\'\[\]{}]+')
+_QUOTED_KEY_PATTERN: re.Pattern[bytes] = re.compile(rb'"((?:[^"\\\n]|\\.)*)"|\'((?:[^\'\\\n]|\\.)*)\'')
+_INDEX_PATTERN: re.Pattern[bytes] = re.compile(rb'\[(-?[0-9]+)?]')
+_ESCAPE_PATTERN: re.Pattern[bytes] = re.compile(rb'\\(.)')
+
+
+class NBTPathElementKind(Enum):
+	ROOT_MATCH = 'root_match'
+	"""`{...}` at the start of a path"""
+	KEY = 'key'
+	"""`key` or `"key"`, optionally followed by a compound match: `key{...}`"""
+	ALL_ELEMENTS = 'all_elements'
+	"""`[]`"""
+	INDEX = 'index'
+	"""`[index]`"""
+	ELEMENT_MATCH = 'element_match'
+	"""`[{...}]`"""
+
+
+class NBTPathElement(NamedTuple):
+	kind: NBTPathElementKind
+	span: Span
+	key: Optional[str] = None
+	index: Optional[int] = None
+	match: Optional[CompoundTag] = None
 
 
 SNBT_PATH_ID: LanguageId = LanguageId('SNBTPath')
@@ -121,18 +64,148 @@ class NBTPath(Node['NBTPath', NBTPathSchema]):
 		return ()
 
 	language: ClassVar[LanguageId] = SNBT_PATH_ID
-	path: Path
+	elements: tuple[NBTPathElement, ...]
 
 
 @dataclass
 class SNBTPathParser(ParserBase[NBTPath, NBTPathSchema]):
+	"""
+	Parses NBT paths the same way Minecraft does: a sequence of nodes separated by dots, that ends at the first whitespace.
+	Keys and indices are matched by regular expressions; only compound matches are handed over to the SNBTParser.
+	"""
 	ignoreTrailingChars: bool = False
 
+	def _elementSpan(self, start: int) -> Span:
+		return Span(self._posFromColumn(start), self.currentPos)
+
+	def _parseCompoundMatch(self) -> Optional[CompoundTag]:
+		parser = SNBTParser(
+			text=self.text,
+			line=self.line,
+			lineStart=self.lineStart,
+			cursor=self.cursor,
+			cursorOffset=self.cursorOffset,
+			indexMapper=self.indexMapper,
+			schema=None,
+			filePath=self.filePath,
+			ignoreTrailingChars=True,
+		)
+		tag = parser.parseCompound()
+		self.errors.extend(parser.errors)
+		if tag is None:
+			return None
+		self.cursor = parser.cursor
+		self.line = parser.line
+		self.lineStart = parser.lineStart
+		return tag
+
+	def _parseKey(self) -> Optional[str]:
+		text = self.text
+		if text[self.cursor] in _ORD_QUOTES:
+			match = _QUOTED_KEY_PATTERN.match(text, self.cursor)
+			if match is None:
+				self.errorMsg(EXPECTED_MSG_RAW, 'a closing quote', span=Span(self.currentPos))
+				return None
+			raw = match.group(1) if match.group(1) is not None else match.group(2)
+			key = bytesToStr(_ESCAPE_PATTERN.sub(rb'\1', raw) if b'\\' in raw else raw)
+		else:
+			match = _UNQUOTED_KEY_PATTERN.match(text, self.cursor)
+			if match is None:
+				self.errorMsg(EXPECTED_MSG_RAW, 'a key, `[` or `{`', span=Span(self.currentPos))
+				return None
+			key = bytesToStr(match.group(0))
+		self.cursor = match.end()
+		return key
+
+	def _parseElement(self, isFirst: bool) -> Optional[NBTPathElement]:
+		start = self.cursor
+		char = self.text[start]
+		if char == _ORD_OPEN_COMPOUND:
+			if not isFirst:
+				self.errorMsg(ROOT_MATCH_NOT_ALLOWED_MSG, span=Span(self.currentPos))
+				return None
+			match = self._parseCompoundMatch()
+			if match is None:
+				return None
+			return NBTPathElement(NBTPathElementKind.ROOT_MATCH, self._elementSpan(start), match=match)
+
+		if char == _ORD_OPEN_LIST:
+			if (indexMatch := _INDEX_PATTERN.match(self.text, start)) is not None:
+				self.cursor = indexMatch.end()
+				if (index := indexMatch.group(1)) is None:
+					return NBTPathElement(NBTPathElementKind.ALL_ELEMENTS, self._elementSpan(start))
+				return NBTPathElement(NBTPathElementKind.INDEX, self._elementSpan(start), index=int(index))
+			if self.text[start + 1:start + 2] == b'{':
+				self.cursor += 1
+				match = self._parseCompoundMatch()
+				if match is None:
+					return None
+				if not self.tryConsumeByte(_ORD_CLOSE_LIST):
+					self.errorMsg(EXPECTED_MSG_RAW, '`]`', span=Span(self.currentPos))
+					return None
+				return NBTPathElement(NBTPathElementKind.ELEMENT_MATCH, self._elementSpan(start), match=match)
+			self.errorMsg(EXPECTED_MSG_RAW, 'an index, `[]` or `[{...}]`', span=Span(self.currentPos))
+			return None
+
+		key = self._parseKey()
+		if key is None:
+			return None
+		match = None
+		if self.cursor < self.length and self.text[self.cursor] == _ORD_OPEN_COMPOUND:
+			match = self._parseCompoundMatch()
+			if match is None:
+				return None
+		return NBTPathElement(NBTPathElementKind.KEY, self._elementSpan(start), key=key, match=match)
+
+	def tryConsumeByte(self, byte: int) -> bool:
+		if self.cursor < self.length and self.text[self.cursor] == byte:
+			self.cursor += 1
+			return True
+		return False
+
+	def parseElements(self) -> Optional[tuple[NBTPathElement, ...]]:
+		text = self.text
+		length = self.length
+		elements: list[NBTPathElement] = []
+		while self.cursor < length and text[self.cursor] not in _TERMINATORS:
+			element = self._parseElement(not elements)
+			if element is None:
+				return None
+			elements.append(element)
+			if self.cursor < length:
+				char = text[self.cursor]
+				if char in _TERMINATORS or char == _ORD_OPEN_LIST or char == _ORD_OPEN_COMPOUND:
+					continue
+				if char != _ORD_DOT:
+					self.errorMsg(EXPECTED_MSG_RAW, '`.`', span=Span(self.currentPos))
+					return None
+				self.cursor += 1
+				if self.cursor >= length or text[self.cursor] in _TERMINATORS:
+					# keep the path, so keys can still be suggested after the dot:
+					self.errorMsg(EMPTY_KEY_AFTER_DOT_MSG, span=Span(self.currentPos))
+					break
+
+		if not elements:
+			self.errorMsg(EXPECTED_MSG_RAW, 'an NBT path', span=Span(self.currentPos))
+			return None
+		return tuple(elements)
+
 	def parse(self) -> Optional[NBTPath]:
 		p1 = self.currentPos
-		path: Optional[Path] = _parseNBTPathBare(self, errorsIO=self.errors)
-		if path is None:
+		elements = self.parseElements()
+		if elements is None:
 			return None
 		p2 = self.currentPos
-		return NBTPath(Span(p1, p2), self.schema, path)
-
+		if not self.ignoreTrailingChars and self.cursor < self.length:
+			self.errorMsg(TRAILING_NOT_ALLOWED_MSG, 'characters', span=Span(p2, self._posFromColumn(self.length)))
+		return NBTPath(Span(p1, p2), self.schema, elements)
+
+
+__all__ = [
+	'SNBT_PATH_ID',
+	'NBTPathElementKind',
+	'NBTPathElement',
+	'NBTPathSchema',
+	'NBTPath',
+	'SNBTPathParser',
+]
@@ -376,11 +376,20 @@ class SNBTParser(ParserBase[NBTTag, NBTTagSchema]):
 		TokenType.List: parseListTag,
 	}
 
-	def parse(self) -> Optional[NBTTag]:
-		tag = self.parseNBTTag()
+	def _syncCursor(self) -> None:
 		self.cursor = self._tokenizer.lastCursor
 		self.line = self._tokenizer.lastLine
 		self.lineStart = self._tokenizer.lastLineStart
+
+	def parseCompound(self) -> Optional[CompoundTag]:
+		"""parses a single compound tag, e.g. for compound matches in NBT paths. The cursor is left behind its closing brace."""
+		tag = self.parseCompoundTag()
+		self._syncCursor()
+		return tag
+
+	def parse(self) -> Optional[NBTTag]:
+		tag = self.parseNBTTag()
+		self._syncCursor()
 		return tag
 
 
@@ -31,6 +31,7 @@ from cat.GUI.pythonGUI import MenuItemData
 from cat.Serializable.serializableDataclasses import SerializableDataclass
 from cat.Serializable.utils import PropertyDecorator, get_args
 from cat.utils import findall, FILE_BROWSER_DISPLAY_NAME, showInFileSystem, CachedProperty
+from cat.utils.collections_ import AddToDictDecorator
 from gui.icons import icons
 
 inputBoxStyle = Style({'CatBox': Style({'background': '#FFF2CC'})})
@@ -42,6 +43,12 @@ _TR = TypeVar('_TR')
 _T2 = TypeVar('_T2')
 
 
+FileContextMenuProvider = Callable[[FilePath, 'DatapackEditorGUI'], list[MenuItemData]]
+_fileContextMenuProviders: dict[str, FileContextMenuProvider] = {}
+fileContextMenuProvider = AddToDictDecorator(_fileContextMenuProviders)
+"""registers a function that provides additional context menu entries for files, e.g. `@fileContextMenuProvider('dpe:rename_resource')`"""
+
+
 class ContextMenuEntries:
 	@classmethod
 	def separator(cls):
@@ -75,6 +82,14 @@ class ContextMenuEntries:
 		entries.extend(cls.pathItems(filePath))
 		return entries
 
+	@classmethod
+	def providedFileItems(cls, filePath: FilePath, gui: DatapackEditorGUI) -> list[MenuItemData]:
+		"""the entries of all registered fileContextMenuProviders for filePath."""
+		entries: list[MenuItemData] = []
+		for provider in _fileContextMenuProviders.values():
+			entries.extend(provider(filePath, gui))
+		return entries
+
 
 def makeTextSearcher(expr: str, searchOptions: SearchOptions) -> Callable[[str], Iterator[IndexSpan]]:
 	if searchOptions.searchMode == SearchMode.RegEx:
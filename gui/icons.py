@@ -125,6 +125,7 @@ class _Icons(CatIcons):
 	)
 
 	spellCheck:       QIcon = iconGetter('fa5s.spell-check')
+	format:           QIcon = iconGetter('fa5s.align-left')
 	error:            QIcon = iconGetter('fa5s.exclamation-circle')
 	errorColored:     QIcon = iconGetter('fa5s.exclamation-circle', options=[dict(color='red')])
 	warning:          QIcon = iconGetter('fa5s.exclamation-triangle')
@@ -11,6 +11,7 @@ from cat.utils.profiling import ProfiledAction, TimedAction
 from gui.datapackEditorGUI import DatapackEditorGUI
 from base.model.documents import Document
 from base.model.session import getSession
+from base.model.tracing import TRACER, formatSlowestFiles
 
 
 class ProfileParsingDialog(CatFramelessWindowMixin, QDialog):
@@ -61,4 +62,14 @@ class ProfileParsingDialog(CatFramelessWindowMixin, QDialog):
 					for _ in range(self._repetitions):
 						self._selectedDocument.validate()
 
+		gui.title("Tracing:")
+		with gui.hLayout():
+			TRACER.enabled = gui.toggleLeft(TRACER.enabled, 'enabled')
+			gui.label(f'{TRACER.spanCount} spans recorded')
+			if gui.button('Clear'):
+				TRACER.clear()
+			if gui.button('Slowest Files'):
+				summary = formatSlowestFiles()
+				gui.askUserInput("Slowest Files", summary, lambda g, v: g.codeField(summary))
+
 		gui.addVSpacer(0, SizePolicy.Expanding)
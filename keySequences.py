@@ -22,6 +22,10 @@ class KeySequences:
 		# windows does not have a standard key sequence for 'Save As':
 		return QKeySequence('Ctrl+Shift+S') if utils.PLATFORM_IS_WINDOWS else QKeySequence(QKeySequence.SaveAs)
 
+	@CachedProperty
+	def FORMAT_DOCUMENT(self) -> QKeySequence:
+		return QKeySequence('Shift+Alt+F')
+
 	@CachedProperty
 	def CLOSE_DOCUMENT(self) -> QKeySequence:
 		return QKeySequence('Ctrl+W') if utils.PLATFORM_IS_WINDOWS else QKeySequence(QKeySequence.Close)
@@ -20,8 +20,11 @@ from gui.profileParsingDialog import ProfileParsingDialog
 from base.model import theme
 from keySequences import KEY_SEQUENCES
 from base.model.session import getSession, saveSessionToFile, GLOBAL_SIGNALS
+from base.model.formatting import canFormat, formatDocument
+from base.model.tracing import TRACER
 from base.model.documents import Document, DocumentTypeDescription, createNewDocument, getDocumentTypes, getAllFileExtensionFilters, getDocumentTypeForDocument
 from base.gui.checkAllDialog import CheckAllDialog
+from base.gui.formatAllDialog import FormatAllDialog
 from base.gui.searchAllDialog import SearchAllDialog
 from base.gui.spotlightSearch import SpotlightSearchGui
 from gui.datapackEditorGUI import DatapackEditorGUI
@@ -49,6 +52,7 @@ dpeIcons = _DpeIcons()
 
 
 ALL_FILES_FILTER: FileExtensionFilter = ('All files', '*')
+TRACE_FILES_FILTER: FileExtensionFilter = ('Chrome Trace', '.json')
 
 
 def frange(a: float, b: float, jump: float, *, includeLAst: bool = False):
@@ -109,6 +113,7 @@ class MainWindow(CatFramelessWindowMixin, QMainWindow):  # QtWidgets.QWidget):
 
 		#GUI
 		self.checkAllDialog = CheckAllDialog(self)
+		self.formatAllDialog = FormatAllDialog(self)
 		self.searchAllDialog = SearchAllDialog(self)
 		self.settingsDialog = SettingsDialog(self, GUICls=DatapackEditorGUI)
 		self.profileParsingDialog = ProfileParsingDialog(self)
@@ -243,6 +248,10 @@ class MainWindow(CatFramelessWindowMixin, QMainWindow):  # QtWidgets.QWidget):
 				if button(icon=icons.redo, tip='Redo', margins=btnMargins, hSizePolicy=SizePolicy.Fixed.value, enabled=bool(document), windowShortcut=QKeySequence.Redo):
 					document.undoRedoStack.redoOnce()
 
+			if button(icon=icons.format, tip='Format Document', **btnKwArgs, enabled=bool(document) and canFormat(document), windowShortcut=KEY_SEQUENCES.FORMAT_DOCUMENT):
+				if not formatDocument(document):
+					gui.showInformationDialog("Cannot format the document.", "Please fix all syntax errors first.")
+
 	def projectMenu(self, gui: DatapackEditorGUI):
 		hasOpenedProject = getSession().hasOpenedProject
 		with gui.popupMenu() as menu:
@@ -285,6 +294,9 @@ class MainWindow(CatFramelessWindowMixin, QMainWindow):  # QtWidgets.QWidget):
 			if button(icon=icons.spellCheck, tip='Check all Files', **btnKwArgs, enabled=True):
 				self.checkAllDialog.show()
 
+			if button(icon=icons.format, tip='Format all Files', **btnKwArgs, enabled=True):
+				self.formatAllDialog.show()
+
 			if applicationSettings.debugging.isDeveloperMode:
 				if button(icon=icons.color, tip='Reload Color Scheme', **btnKwArgs, enabled=True):
 					theme.reloadAllColorSchemes()
@@ -319,8 +331,13 @@ class MainWindow(CatFramelessWindowMixin, QMainWindow):  # QtWidgets.QWidget):
 		def setDebugPaintEvent(checked):
 			catWidgetMixins.DO_DEBUG_PAINT_EVENT = checked
 
+		def setTracingEnabled(checked):
+			TRACER.enabled = checked
+
 		with gui.popupMenu(atMousePosition=False) as popup:
 			popup.addAction('Profile Parsing', self.profileParsingDialog.show, icon=icons.stopwatch)
+			popup.addToggle('tracing Enabled', TRACER.enabled, setTracingEnabled)
+			popup.addAction('export Trace...', lambda: self._exportTraceDialog(gui))
 			popup.addAction('profiling Enabled', setProfilingEnabled, icon=icons.stopwatch, checkable=True, checked=pythonGUI.PROFILING_ENABLED)
 			popup.addToggle('layout info as tool tip', pythonGUI.ADD_LAYOUT_INFO_AS_TOOL_TIP, setLayoutInfoAsToolTip)
 			popup.addToggle('debug layout', Widgets.DEBUG_LAYOUT, setDebugLayout)
@@ -328,6 +345,15 @@ class MainWindow(CatFramelessWindowMixin, QMainWindow):  # QtWidgets.QWidget):
 
 	# Dialogs:
 
+	def _exportTraceDialog(self, gui: DatapackEditorGUI) -> None:
+		filePath = gui.showFileDialog(os.path.join(self._lastOpenPath, 'trace.json'), [TRACE_FILES_FILTER, ALL_FILES_FILTER], selectedFilter=TRACE_FILES_FILTER, style='save')
+		if not filePath:
+			return
+		try:
+			TRACER.exportChromeTrace(filePath)
+		except OSError as e:
+			getSession().showAndLogError(e, "Cannot export trace")
+
 	def _showSettingsDialog(self, gui: DatapackEditorGUI) -> None:
 		oldStyle = applicationSettings.appearance.applicationStyle
 